@@ -23,6 +23,7 @@
           ];
 
           shellHook = ''
+            export PATH="$PWD/bin:$PATH"
             echo "🛸 Agent Knowledge System - Development Environment"
             echo ""
             echo "Available commands:"
@@ -30,6 +31,7 @@
             echo "  invoke stats        - Show repository statistics"
             echo "  invoke build-docs   - Generate HTML documentation"
             echo "  invoke --list       - List all available tasks"
+            echo "  agents-md --help    - Same tools, one fast in-process CLI"
             echo ""
             echo "✅ All dependencies provided by Nix"
           '';
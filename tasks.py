@@ -13,14 +13,26 @@ import sys
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent
-
+# Make tools/ importable so tasks can share the registry loader in-process.
+sys.path.insert(0, str(PROJECT_ROOT / "tools"))
 
 
 @task
-def validate(c):
-    """Validate all data YAML files."""
+def validate(c, format="text", changed=False, since=""):
+    """Validate all data YAML files.
+    
+    Args:
+        format: Output format (text or json)
+        changed: Only check entities affected by uncommitted changes
+        since: Only check entities affected by changes since this git revision
+    """
     print("🔍 Validating data files...")
-    result = c.run("python3 tools/validate_data.py", warn=True)
+    cmd = f"python3 tools/validate_data.py --format {format}"
+    if since:
+        cmd += f" --since {since}"
+    elif changed:
+        cmd += " --changed"
+    result = c.run(cmd, warn=True)
     
     if result.ok:
         print("\n✅ All validations passed!")
@@ -43,9 +55,12 @@ def clean(c):
     c.run("find . -type d -name __pycache__ -exec rm -rf {} + 2>/dev/null || true")
     c.run("find . -type f -name '*.pyc' -delete 2>/dev/null || true")
     
-    # Remove backup files
+    # Remove parsed-registry snapshot
+    c.run("rm -rf .agents-md/cache")
+    
+    # Remove legacy in-tree backup files (backups now live in .agents-md/objects)
     c.run("find agents -name '*.bak' -delete 2>/dev/null || true")
-    print("✅ Removed backup files")
+    print("✅ Removed legacy backup files")
     
     print("✅ Removed Python caches")
 
@@ -67,130 +82,252 @@ def create_agent(c, template, name, domain=""):
 
 
 @task
-def regenerate(c, agent, domain=""):
-    """Regenerate an agent from its template.
+def regenerate(c, agent, domain="", force=False, dry_run=False):
+    """Regenerate an agent from its template if its inputs changed.
     
     Args:
         agent: Agent name (e.g., rust-backend)
         domain: Optional domain specialization
+        force: Rebuild even if up to date
+        dry_run: Only report whether the agent would change
     """
     cmd = f"python3 tools/regenerate_agent.py {agent}"
     if domain:
         cmd += f" --domain {domain}"
+    if force:
+        cmd += " --force"
+    if dry_run:
+        cmd += " --dry-run"
     
     c.run(cmd)
 
 
 @task
-def update_version(c, agent, version, changes):
-    """Update version history for an agent.
+def update_version(c, agent="", version="", changes="", batch=""):
+    """Update version history for an agent, or for many with --batch.
     
     Args:
         agent: Agent name (e.g., python-backend)
         version: New version (e.g., 1.2.0)
         changes: Description of changes
+        batch: YAML/JSON file listing {agent, version, changes} updates
+    """
+    if batch:
+        c.run(f'python3 tools/update_version.py --batch "{batch}"')
+    else:
+        c.run(f'python3 tools/update_version.py {agent} {version} "{changes}"')
+
+
+@task(name="versions-layout")
+def versions_layout(c, command="status"):
+    """Show or switch the version history layout (status, shard, unshard)."""
+    c.run(f"python3 tools/versions_layout.py {command}")
+
+
+@task(name="export-sqlite")
+def export_sqlite(c, output="", force=False):
+    """Export the registry to SQLite with full-text search (incremental).
+    
+    Args:
+        output: Database path (default: .agents-md/registry.sqlite)
+        force: Rebuild from scratch
     """
-    c.run(f'python3 tools/update_version.py {agent} {version} "{changes}"')
+    cmd = "python3 tools/export_sqlite.py"
+    if output:
+        cmd += f' --output "{output}"'
+    if force:
+        cmd += " --force"
+    
+    c.run(cmd)
+
+
+@task
+def pack(c, output=""):
+    """Pack all agents into a memory-mappable bundle (.agents-md/agents.pack)."""
+    cmd = "python3 tools/pack_agents.py"
+    if output:
+        cmd += f' --output "{output}"'
+    
+    c.run(cmd)
+
+
+@task
+def serve(c, host="127.0.0.1", port=8420, poll=False):
+    """Serve the registry API, raw markdown and dist/ over HTTP."""
+    cmd = f"python3 tools/serve.py --host {host} --port {port}"
+    if poll:
+        cmd += " --poll"
+    
+    c.run(cmd)
+
+
+@task
+def drift(c, agent="", sections=False, min_similarity=""):
+    """Report section-level drift of agents from their parent templates.
+    
+    Args:
+        agent: Only this agent (default: all)
+        sections: List the added, removed and modified sections
+        min_similarity: Fail if any agent scores below this (0-1)
+    """
+    cmd = f"python3 tools/drift.py {agent}".rstrip()
+    if sections:
+        cmd += " --sections"
+    if min_similarity:
+        cmd += f" --min-similarity {min_similarity}"
+    
+    c.run(cmd)
+
+
+@task
+def dedup_report(c, top=20, threshold=0.8, locations=False):
+    """Report near-duplicate paragraphs in agents/, templates/ and knowledge/, by bytes duplicated."""
+    cmd = f"python3 tools/dedup_report.py --top {top} --threshold {threshold}"
+    if locations:
+        cmd += " --locations"
+    
+    c.run(cmd)
+
+
+@task
+def bench(c, agents="100,1000", repeat=3, update_baseline=False):
+    """Benchmark the tools on synthetic registries; fail on regressions against the baseline."""
+    cmd = f"python3 tools/bench.py --agents {agents} --repeat {repeat}"
+    if update_baseline:
+        cmd += " --update-baseline"
+    
+    c.run(cmd)
+
+
+@task
+def synth(c, output, agents=1000):
+    """Generate a synthetic registry (with a copy of tools/) for manual testing."""
+    c.run(f'python3 tools/synth_registry.py "{output}" --agents {agents}')
+
+
+@task
+def restore(c, agent, at=""):
+    """Restore an agent from the backup store.
+    
+    Args:
+        agent: Agent name (e.g., python-backend)
+        at: Backup timestamp or hash prefix (default: newest)
+    """
+    cmd = f"python3 tools/backups.py restore {agent}"
+    if at:
+        cmd += f" --at {at}"
+    
+    c.run(cmd)
+
+
+@task
+def backups(c, agent=""):
+    """List backups in the content-addressed backup store."""
+    c.run(f"python3 tools/backups.py list {agent}".rstrip())
+
+
+@task
+def gc(c, keep=10, max_age=""):
+    """Prune old backups and delete unreferenced blobs.
+    
+    Args:
+        keep: Backups kept per agent
+        max_age: Drop backups older than this many days
+    """
+    cmd = f"python3 tools/backups.py gc --keep {keep}"
+    if max_age:
+        cmd += f" --max-age {max_age}"
+    
+    c.run(cmd)
+
+
+@task(iterable=["can", "cannot", "without", "tool", "domain"])
+def find(c, can=None, cannot=None, without=None, tool=None, domain=None):
+    """Find agents by capability (flags may be repeated).
+    
+    Args:
+        can: Agent lists this under can_do
+        cannot: Agent lists this under cannot_do
+        without: Agent does NOT list this under can_do
+        tool: Agent lists this under tools_required
+        domain: Agent lists this under domain_expertise
+    """
+    from capability_index import load_index
+    
+    index = load_index()
+    matches = index.query(can or (), cannot or (), without or (), tool or (), domain or ())
+    for agent_id in matches:
+        print(agent_id)
+    print(f"\n🔍 {len(matches)} of {len(index.agent_ids)} agents match")
+
+
+@task(name="compose-swarm", iterable=["capability", "use_case"])
+def compose_swarm(c, capability=None, use_case=None, exact=False):
+    """Compose the smallest swarm covering the required capabilities.
+    
+    Args:
+        capability: Required can_do capability (repeatable)
+        use_case: Use case from swarms.yaml (repeatable)
+        exact: Use branch-and-bound for a proven minimum
+    """
+    cmd = "python3 tools/compose_swarm.py " + " ".join(capability or [])
+    for name in use_case or []:
+        cmd += f" --use-case {name}"
+    if exact:
+        cmd += " --exact"
+    
+    c.run(cmd)
 
 
 @task
 def stats(c):
     """Show repository statistics and metrics."""
-    import yaml
-    from pathlib import Path
-    from rich.console import Console
-    from rich.table import Table
-    from rich.panel import Panel
-    
-    console = Console()
-    PROJECT_ROOT = Path(".")
-    
-    # Load data
-    with open(PROJECT_ROOT / "data" / "lineage.yaml") as f:
-        lineage = yaml.safe_load(f)
-    with open(PROJECT_ROOT / "data" / "swarms.yaml") as f:
-        swarms_data = yaml.safe_load(f)
-    with open(PROJECT_ROOT / "data" / "versions.yaml") as f:
-        versions = yaml.safe_load(f)
-    
-    # Header
-    console.print("\n[bold cyan]🤖 Agent Knowledge System Statistics[/bold cyan]\n", justify="center")
-    
-    # Overview stats
-    overview = Table(show_header=False, box=None)
-    overview.add_column("Metric", style="cyan")
-    overview.add_column("Value", justify="right", style="green bold")
-    
-    n_templates = len(lineage["templates"])
-    n_agents = len(lineage["agents"])
-    n_knowledge = len(list(Path("knowledge").glob("*.md")))
-    n_swarms = len(swarms_data["swarms"])
-    
-    overview.add_row("📋 Templates", str(n_templates))
-    overview.add_row("🤖 Agents", str(n_agents))
-    overview.add_row("📚 Knowledge Docs", str(n_knowledge))
-    overview.add_row("🌐 Swarms", str(n_swarms))
-    
-    console.print(Panel(overview, title="[bold]Overview[/bold]", border_style="cyan"))
-    
-    # Agents by category
-    agents_table = Table(title="[bold]Agents by Category[/bold]", show_lines=True)
-    agents_table.add_column("Agent", style="cyan")
-    agents_table.add_column("Template", style="yellow")
-    agents_table.add_column("Version", justify="center", style="green")
-    
-    for agent in lineage["agents"]:
-        agent_id = agent["id"]
-        parent = agent["lineage"]["parent_template"]
-        ver = versions["agents"].get(agent_id, {}).get("current_version", "N/A")
-        agents_table.add_row(agent_id, parent, ver)
-    
-    console.print("\n", agents_table)
-    
-    # Swarms
-    swarms_table = Table(title="[bold]Pre-defined Swarms[/bold]", show_lines=True)
-    swarms_table.add_column("Swarm", style="cyan")
-    swarms_table.add_column("Agents", style="yellow")
-    swarms_table.add_column("Use Cases", style="magenta")
-    
-    for swarm in swarms_data["swarms"]:
-        name = swarm["name"]
-        agents = ", ".join(swarm["agents"])
-        use_cases = ", ".join(swarm["use_cases"][:2])  # First 2
-        swarms_table.add_row(name, agents, use_cases)
-    
-    console.print("\n", swarms_table)
-    console.print()
-
-
-@task
-def build_docs(c):
-    """Generate static HTML documentation site."""
+    import stats as repo_stats
+    
+    repo_stats.print_stats()
+
+
+@task
+def build_docs(c, force=False):
+    """Generate static HTML documentation site.
+    
+    Args:
+        force: Re-render every page, not just those whose inputs changed
+    """
     print("📚 Building documentation site...")
-    c.run("python3 tools/build_docs.py")
+    c.run(f"python3 tools/build_docs.py{' --force' if force else ''}")
 
 @task(name="regenerate-all")
-def regenerate_all(c):
-    """Regenerate ALL agents using metadata from lineage.yaml."""
-    import yaml
-    from pathlib import Path
+def regenerate_all(c, jobs=0, force=False, dry_run=False):
+    """Regenerate ALL out-of-date agents using metadata from lineage.yaml.
+    
+    Args:
+        jobs: Worker threads (default: CPU count)
+        force: Rebuild every agent even if up to date
+        dry_run: Only list agents that would change
+    """
+    import regenerate_agent
     
-    PROJECT_ROOT = Path(".")
     print("🔄 Starting batch regeneration of ALL agents...")
+    failed = regenerate_agent.regenerate_all(jobs=int(jobs) or None, force=force, dry_run=dry_run)
     
-    with open(PROJECT_ROOT / "data" / "lineage.yaml") as f:
-        lineage = yaml.safe_load(f)
-        
-    for agent in lineage.get("agents", []):
-        agent_id = agent["id"]
-        # Get domain from generation_parameters, fallback to metadata domain
-        gen_params = agent.get("generation_parameters", {})
-        domain = gen_params.get("domain") or agent.get("metadata", {}).get("domain")
-        
-        cmd = f"python3 tools/regenerate_agent.py {agent_id}"
-        if domain:
-            cmd += f" --domain {domain}"
-            
-        c.run(cmd)
-        
+    if failed:
+        print("\n❌ Batch regeneration finished with errors.")
+        sys.exit(1)
     print("\n✅ Batch regeneration complete!")
+
+
+@task
+def watch(c, poll=False, debounce=0.2, no_regenerate=False, no_docs=False):
+    """Watch data/templates/agents/knowledge and rebuild incrementally on change.
+    
+    Args:
+        poll: Use the polling backend instead of inotify
+        debounce: Quiet period in seconds before a batch is processed
+        no_regenerate: Only validate (and rebuild docs)
+        no_docs: Do not rebuild the documentation site
+    """
+    import watch as watcher
+    
+    watcher.watch(poll=poll, debounce=float(debounce),
+                  regenerate=not no_regenerate, docs=not no_docs)
@@ -0,0 +1,26 @@
+import backups
+
+
+def test_gc_keeps_newest_backup_within_the_same_second(tmp_path, monkeypatch):
+    store = tmp_path / ".agents-md"
+    monkeypatch.setattr(backups, "STORE_DIR", store)
+    monkeypatch.setattr(backups, "OBJECTS_DIR", store / "objects")
+    monkeypatch.setattr(backups, "INDEX_FILE", store / "backups.jsonl")
+    monkeypatch.setattr(backups, "LOCK_FILE", store / "backups.lock")
+    monkeypatch.setattr(backups, "datetime", _FrozenDatetime)
+
+    agent = tmp_path / "AGENTS.demo.md"
+    for content in ("first", "second", "third"):
+        agent.write_text(content)
+        backups.backup_file("demo", agent)
+
+    assert backups.gc(keep=2) == (1, 1)
+    newest = backups.find_backup("demo")
+    assert backups.read_object(newest["hash"]) == b"third"
+    assert [backups.read_object(e["hash"]) for e in backups.list_backups("demo")] == [b"second", b"third"]
+
+
+class _FrozenDatetime(backups.datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 1, 1, 12, 0, 0)
@@ -0,0 +1,44 @@
+import subprocess
+
+import yaml
+
+from synth_registry import generate
+from validate_data import changed_scope, validate
+
+
+def _git(root, *args):
+    subprocess.run(["git", "-C", str(root), *args], check=True, capture_output=True)
+
+
+def _commit(root):
+    _git(root, "add", "-A")
+    _git(root, "-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-qm", "snapshot")
+
+
+def _keys(errors):
+    return sorted((e["file"], e["path"], e["message"], e["severity"]) for e in errors)
+
+
+def test_changed_matches_full_run_after_template_deletion(tmp_path):
+    generate(tmp_path, agents=40, versions=2, tools=False)
+    lineage_path = tmp_path / "data" / "lineage.yaml"
+    versions_path = tmp_path / "data" / "versions.yaml"
+    lineage = yaml.safe_load(lineage_path.read_text())
+    versions = yaml.safe_load(versions_path.read_text())
+
+    # An agent whose history names a template it is no longer derived from.
+    removed = lineage["templates"][0]["id"]
+    other = next(a for a in lineage["agents"] if a["lineage"]["parent_template"] != removed)
+    versions["agents"][other["id"]]["versions"][0]["template_version"] = f"{removed}@1.0"
+    versions_path.write_text(yaml.safe_dump(versions, sort_keys=False))
+    _git(tmp_path, "init", "-q")
+    _commit(tmp_path)
+    assert not [e for e in validate(tmp_path) if e["severity"] == "error"]
+
+    lineage["templates"] = [t for t in lineage["templates"] if t["id"] != removed]
+    lineage_path.write_text(yaml.safe_dump(lineage, sort_keys=False))
+
+    full = validate(tmp_path)
+    scoped = validate(tmp_path, scope=changed_scope("HEAD", tmp_path))
+    assert any(e["file"] == "versions.yaml" and removed in e["message"] for e in full)
+    assert _keys(scoped) == _keys(full)
@@ -0,0 +1,29 @@
+import yaml
+
+from registry import NO_CACHE_ENV
+from synth_registry import generate
+from validate_data import RESULTS_NAME, validate
+
+
+def _keys(errors):
+    return sorted((e["file"], e["line"], e["path"], e["message"], e["severity"]) for e in errors)
+
+
+def test_cached_results_match_a_fresh_run_after_edits(tmp_path, monkeypatch):
+    generate(tmp_path, agents=40, versions=2, tools=False)
+    assert not [e for e in validate(tmp_path) if e["severity"] == "error"]
+    assert (tmp_path / ".agents-md" / "cache" / RESULTS_NAME).exists()
+
+    lineage_path = tmp_path / "data" / "lineage.yaml"
+    lineage = yaml.safe_load(lineage_path.read_text())
+    lineage["agents"][3]["lineage"]["derivation_type"] = "invented"
+    lineage_path.write_text(yaml.safe_dump(lineage, sort_keys=False))
+    with open(tmp_path / lineage["agents"][5]["path"], "a") as f:
+        f.write("\n#### Skipped a level\n")
+
+    cached = validate(tmp_path)
+    assert any("invented" in e["message"] for e in cached)
+    assert any("Skipped a level" in e["message"] for e in cached)
+    assert _keys(validate(tmp_path)) == _keys(cached)
+    monkeypatch.setenv(NO_CACHE_ENV, "1")
+    assert _keys(validate(tmp_path)) == _keys(cached)
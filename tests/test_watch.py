@@ -0,0 +1,70 @@
+import time
+
+import yaml
+
+import regenerate_agent
+from synth_registry import generate
+from watch import Session
+
+
+def _batch(session, *paths):
+    session.handle(set(paths), time.perf_counter())
+
+
+def test_errors_hold_back_only_the_agents_they_concern(tmp_path, monkeypatch):
+    generate(tmp_path, agents=40, versions=2, tools=False)
+    calls = []
+    monkeypatch.setattr(regenerate_agent, "regenerate_all",
+                        lambda jobs=None, agent_ids=None: calls.append(set(agent_ids)))
+    session = Session(tmp_path, docs=False)
+    session._remember_writes = lambda agent_ids: None
+
+    lineage_path = tmp_path / "data" / "lineage.yaml"
+    lineage = yaml.safe_load(lineage_path.read_text())
+    template = lineage["templates"][0]
+    children = [a for a in lineage["agents"] if a["lineage"]["parent_template"] == template["id"]]
+    assert len(children) >= 2
+    broken = children[0]
+
+    # The template changes and one child's lineage entry gains an error.
+    with open(tmp_path / template["path"], "a") as f:
+        f.write("\nAnother line.\n")
+    broken["lineage"]["derivation_type"] = "invented"
+    lineage_path.write_text(yaml.safe_dump(lineage, sort_keys=False))
+    _batch(session, template["path"], "data/lineage.yaml")
+    assert calls == [{a["id"] for a in children[1:]}]
+    assert session.pending_agents == {broken["id"]}
+
+    # An unrelated batch still reports the held-back agent's error.
+    _batch(session, "knowledge/unrelated.md")
+    assert len(calls) == 1 and session.pending_agents == {broken["id"]}
+
+    # Once the entry is fixed the held-back agent is regenerated.
+    broken["lineage"]["derivation_type"] = "specialization"
+    lineage_path.write_text(yaml.safe_dump(lineage, sort_keys=False))
+    _batch(session, "data/lineage.yaml")
+    assert calls[-1] == {broken["id"]}
+    assert not session.pending_agents
+
+
+def test_unparseable_lineage_carries_the_batch_forward(tmp_path, monkeypatch):
+    generate(tmp_path, agents=40, versions=2, tools=False)
+    calls = []
+    monkeypatch.setattr(regenerate_agent, "regenerate_all",
+                        lambda jobs=None, agent_ids=None: calls.append(set(agent_ids)))
+    session = Session(tmp_path, docs=False)
+    session._remember_writes = lambda agent_ids: None
+
+    lineage_path = tmp_path / "data" / "lineage.yaml"
+    good = lineage_path.read_text()
+    template = yaml.safe_load(good)["templates"][0]
+    with open(tmp_path / template["path"], "a") as f:
+        f.write("\nAnother line.\n")
+    lineage_path.write_text(good + "agents: [\n")
+    _batch(session, template["path"], "data/lineage.yaml")
+    assert not calls and template["path"] in session.pending_paths
+
+    lineage_path.write_text(good)
+    _batch(session, "data/lineage.yaml")
+    children = {a.id for a in session._lineage_model().children_of(template["id"])}
+    assert calls == [children] and not session.pending_paths
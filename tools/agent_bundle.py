@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Reader for the packed agent bundle written by pack_agents.py.
+
+The bundle is mmap'ed once; looking up an agent is a hash-table probe in the
+mapped index, and its prompt is returned as a memoryview slice of the
+mapping, so nothing is read, parsed or copied until it is used. Only the
+standard library is needed.
+
+Layout (little-endian):
+
+    header   magic, format, count, slots, offsets, SHA-256 of the index
+    slots    u32 per slot: entry number + 1 (0 = empty), linear probing on crc32(id)
+    entries  per agent: id offset/length, body offset/length,
+             metadata offset/length, SHA-256 of body, SHA-256 of metadata
+    strings  agent ids (UTF-8)
+    data     agent bodies and metadata (compact JSON)
+
+The index (slots, entries, strings) is checked against the header digest on
+open; a body or metadata blob is checked against its digest the first time
+it is read (verify=False skips that).
+
+Usage:
+    from agent_bundle import AgentBundle
+
+    with AgentBundle() as bundle:
+        prompt = bundle.text("python-backend")
+        meta = bundle.metadata("python-backend")
+
+    python tools/agent_bundle.py get python-backend
+    python tools/agent_bundle.py verify
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+DEFAULT_BUNDLE = Path(__file__).parent.parent / ".agents-md" / "agents.pack"
+
+MAGIC = b"AGNTPACK"
+# Bump when the layout changes.
+FORMAT_VERSION = 1
+# magic, format, count, slots, entries offset, strings offset, data offset, index digest
+HEADER = struct.Struct("<8sIIIQQQ32s")
+SLOT = struct.Struct("<I")
+# id offset, id length, body offset, body length, meta offset, meta length, body/meta digests
+ENTRY = struct.Struct("<QIQQQQ32s32s")
+
+
+class BundleError(ValueError):
+    """The bundle is missing, truncated, corrupt or of another format."""
+
+
+def slot_of(key, slots):
+    """Home slot of an encoded agent id; slots is a power of two."""
+    return zlib.crc32(key) & (slots - 1)
+
+
+class AgentBundle:
+    """Read-only, memory-mapped view of a packed agent bundle.
+
+    Memoryviews returned by body() keep the mapping alive; release them
+    before close().
+    """
+
+    __slots__ = ("path", "_file", "_map", "_view", "count", "slots", "_entries", "_verified")
+
+    def __init__(self, path=None):
+        self.path = Path(path or DEFAULT_BUNDLE)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise BundleError(f"{self.path} is empty") from None
+        self._view = memoryview(self._map)
+        self._verified = set()
+        try:
+            self._check_header()
+        except BundleError:
+            self.close()
+            raise
+
+    def _check_header(self):
+        if len(self._map) < HEADER.size:
+            raise BundleError(f"{self.path} is truncated")
+        magic, fmt, count, slots, entries, strings, data, digest = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise BundleError(f"{self.path} is not an agent bundle")
+        if fmt != FORMAT_VERSION:
+            raise BundleError(f"{self.path} has format {fmt}, expected {FORMAT_VERSION}; re-pack it")
+        if not (HEADER.size <= entries <= strings <= data <= len(self._map)) \
+                or entries - HEADER.size != slots * SLOT.size or strings - entries != count * ENTRY.size:
+            raise BundleError(f"{self.path} has an inconsistent header")
+        if hashlib.sha256(self._view[HEADER.size:data]).digest() != digest:
+            raise BundleError(f"{self.path}: index checksum mismatch")
+        self.count, self.slots, self._entries = count, slots, entries
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, agent_id):
+        return self._find(agent_id) is not None
+
+    def _entry(self, n):
+        return ENTRY.unpack_from(self._map, self._entries + n * ENTRY.size)
+
+    def _find(self, agent_id):
+        key = agent_id.encode("utf-8")
+        slot = slot_of(key, self.slots)
+        for _ in range(self.slots):
+            n = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)[0]
+            if not n:
+                return None
+            entry = self._entry(n - 1)
+            if self._map[entry[0]:entry[0] + entry[1]] == key:
+                return n - 1, entry
+            slot = (slot + 1) & (self.slots - 1)
+        return None
+
+    def _blob(self, agent_id, which, verify):
+        found = self._find(agent_id)
+        if found is None:
+            raise KeyError(agent_id)
+        n, entry = found
+        if which == "body":
+            offset, length, digest = entry[2], entry[3], entry[6]
+        else:
+            offset, length, digest = entry[4], entry[5], entry[7]
+        if offset + length > len(self._map):
+            raise BundleError(f"{self.path}: {which} of '{agent_id}' is out of range")
+        blob = self._view[offset:offset + length]
+        if verify and (n, which) not in self._verified:
+            if hashlib.sha256(blob).digest() != digest:
+                raise BundleError(f"{self.path}: {which} of '{agent_id}' fails its checksum")
+            self._verified.add((n, which))
+        return blob
+
+    def body(self, agent_id, verify=True):
+        """Zero-copy memoryview of an agent's markdown; KeyError if unknown."""
+        return self._blob(agent_id, "body", verify)
+
+    def text(self, agent_id, verify=True):
+        """An agent's markdown as str."""
+        with self.body(agent_id, verify) as blob:
+            return str(blob, "utf-8")
+
+    def metadata(self, agent_id, verify=True):
+        """Capability and version metadata of an agent as a dict."""
+        with self._blob(agent_id, "meta", verify) as blob:
+            return json.loads(str(blob, "utf-8"))
+
+    def body_hash(self, agent_id):
+        """Hex SHA-256 of an agent's markdown, as recorded at pack time."""
+        found = self._find(agent_id)
+        if found is None:
+            raise KeyError(agent_id)
+        return found[1][6].hex()
+
+    def ids(self):
+        """Agent ids in pack order."""
+        out = []
+        for n in range(self.count):
+            entry = self._entry(n)
+            out.append(str(self._map[entry[0]:entry[0] + entry[1]], "utf-8"))
+        return out
+
+    def verify(self):
+        """Check every body and metadata blob; return ids that fail."""
+        bad = []
+        for agent_id in self.ids():
+            try:
+                self._blob(agent_id, "body", True).release()
+                self._blob(agent_id, "meta", True).release()
+            except BundleError:
+                bad.append(agent_id)
+        return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read a packed agent bundle")
+    parser.add_argument("--bundle", help=f"Bundle path (default: {DEFAULT_BUNDLE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    get = sub.add_parser("get", help="Print an agent's markdown")
+    get.add_argument("agent_id")
+    get.add_argument("--metadata", action="store_true", help="Print its metadata as JSON instead")
+    sub.add_parser("verify", help="Check every checksum in the bundle")
+    args = parser.parse_args()
+
+    try:
+        with AgentBundle(args.bundle) as bundle:
+            if args.command == "verify":
+                bad = bundle.verify()
+                for agent_id in bad:
+                    print(f"❌ {agent_id}: checksum mismatch")
+                if not bad:
+                    print(f"✅ {len(bundle)} agents verified in {bundle.path}")
+                return 1 if bad else 0
+            if args.metadata:
+                print(json.dumps(bundle.metadata(args.agent_id), indent=2))
+            else:
+                sys.stdout.write(bundle.text(args.agent_id))
+    except KeyError as e:
+        print(f"❌ Agent {e} not found in bundle")
+        return 1
+    except (OSError, BundleError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+agents-md: one entry point for every registry tool.
+
+    agents-md <command> [args...]
+
+Each command runs the tool's own main() in this process, with the tool's
+usual arguments, so there is no second interpreter start as with the
+`invoke` tasks that shell out. Nothing but this module is imported until a
+command is chosen, and the tools import PyYAML, jinja2 and rich only when a
+command actually needs them (e.g. `find` answers from the cached capability
+index, and `build-docs` only loads jinja2 if a page has to be re-rendered).
+
+bin/agents-md is the launcher; `nix develop` puts it on PATH.
+
+Usage:
+    agents-md --help
+    agents-md find --can api_design --tool pytest
+    agents-md validate --changed
+"""
+
+import importlib
+import sys
+
+# command: (module in tools/, summary)
+COMMANDS = {
+    "validate": ("validate_data", "Validate data files (--changed, --since REV, --format json)"),
+    "stats": ("stats", "Show repository statistics"),
+    "find": ("capability_index", "Query agents by capability (--can, --cannot, --without, --tool, --domain)"),
+    "compose-swarm": ("compose_swarm", "Smallest agent set covering required capabilities"),
+    "create-agent": ("create_agent", "Create an agent from a template"),
+    "regenerate": ("regenerate_agent", "Regenerate agents from templates (NAME or --all)"),
+    "update-version": ("update_version", "Add version history entries"),
+    "outline": ("outline", "Print the heading outline of markdown files"),
+    "drift": ("drift", "Section-level drift of agents from their parent templates"),
+    "dedup-report": ("dedup_report", "Near-duplicate paragraphs across agents, templates and knowledge"),
+    "versions-layout": ("versions_layout", "Show or switch flat/sharded version history"),
+    "backups": ("backups", "List, restore or prune agent backups"),
+    "build-docs": ("build_docs", "Generate the HTML docs (incremental)"),
+    "watch": ("watch", "Revalidate, regenerate and rebuild docs on change"),
+    "export-sqlite": ("export_sqlite", "Export the registry to SQLite with full-text search"),
+    "query": ("registry_db", "Query the SQLite export (search, agent)"),
+    "pack": ("pack_agents", "Pack agents into a memory-mappable bundle"),
+    "bundle": ("agent_bundle", "Read or verify the packed bundle (get, verify)"),
+    "serve": ("serve", "Serve the registry API and docs over HTTP"),
+    "synth": ("synth_registry", "Generate a synthetic registry at any scale"),
+    "bench": ("bench", "Benchmark the tools on synthetic registries"),
+    "remove-emojis": ("remove_emojis", "Strip or check for emoji in markdown"),
+}
+
+
+def usage():
+    width = max(map(len, COMMANDS))
+    lines = ["usage: agents-md <command> [args...]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ["", "Run `agents-md <command> --help` for a command's options."]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print(usage())
+        return 0
+    name, args = argv[0], argv[1:]
+    if name not in COMMANDS:
+        import difflib
+
+        close = difflib.get_close_matches(name, COMMANDS, n=1)
+        hint = f" Did you mean '{close[0]}'?" if close else ""
+        print(f"❌ Unknown command '{name}'.{hint} Run `agents-md --help`.", file=sys.stderr)
+        return 2
+
+    module = importlib.import_module(COMMANDS[name][0])
+    # The tools parse sys.argv; argparse then reports "usage: agents-md <command> ...".
+    sys.argv = [f"agents-md {name}", *args]
+    return module.main() or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, deduplicated backup store for agent files.
+
+Backups live under .agents-md/ instead of next to the agents:
+
+    .agents-md/objects/<2 hex>/<62 hex>   zlib-compressed blob, keyed by SHA-256
+    .agents-md/backups.jsonl              index: one {agent, timestamp, hash} per line
+
+Identical content is stored once no matter how many times it is backed up.
+
+Usage:
+    python tools/backups.py list [agent]
+    python tools/backups.py restore <agent> [--at TIMESTAMP|HASH]
+    python tools/backups.py gc [--keep N] [--max-age DAYS]
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from registry import atomic_write, content_hash, state_dir
+
+PROJECT_ROOT = Path(__file__).parent.parent
+STORE_DIR = state_dir(PROJECT_ROOT)
+OBJECTS_DIR = STORE_DIR / "objects"
+INDEX_FILE = STORE_DIR / "backups.jsonl"
+LOCK_FILE = STORE_DIR / "backups.lock"
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+DEFAULT_KEEP = 10
+
+_index_lock = threading.Lock()
+
+
+@contextmanager
+def store_lock():
+    """Hold an exclusive lock on the store, across threads and processes."""
+    with _index_lock:
+        STORE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(LOCK_FILE, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def object_path(digest):
+    """Return the blob path for a content hash."""
+    return OBJECTS_DIR / digest[:2] / digest[2:]
+
+
+def store_object(data):
+    """Store bytes as a compressed blob if not already present. Returns the hash."""
+    digest = content_hash(data)
+    path = object_path(digest)
+    if not path.exists():
+        atomic_write(path, zlib.compress(data))
+    return digest
+
+
+def read_object(digest):
+    """Return the decompressed bytes for a hash, verifying integrity."""
+    data = zlib.decompress(object_path(digest).read_bytes())
+    if content_hash(data) != digest:
+        raise ValueError(f"Backup object {digest} is corrupt")
+    return data
+
+
+def load_index():
+    """Return all index entries, oldest first."""
+    if not INDEX_FILE.exists():
+        return []
+    entries = []
+    with open(INDEX_FILE) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+def backup_file(agent_name, path):
+    """Back up an agent file into the store. Returns the index entry."""
+    data = Path(path).read_bytes()
+    # The blob and its index entry go in together, so gc never sees one without the other.
+    with store_lock():
+        entry = {
+            "agent": agent_name,
+            "timestamp": datetime.now().strftime(TIMESTAMP_FORMAT),
+            "hash": store_object(data),
+        }
+        with open(INDEX_FILE, "a") as f:
+            f.write(json.dumps(entry, sort_keys=True) + "\n")
+    return entry
+
+
+def list_backups(agent_name=None):
+    """Return index entries, optionally for one agent, oldest first."""
+    return [e for e in load_index() if agent_name is None or e["agent"] == agent_name]
+
+
+def find_backup(agent_name, at=None):
+    """Find the newest backup of an agent matching a timestamp or hash prefix."""
+    candidates = list_backups(agent_name)
+    if at:
+        candidates = [e for e in candidates if e["timestamp"] == at or e["hash"].startswith(at)]
+    if not candidates:
+        suffix = f" matching '{at}'" if at else ""
+        raise ValueError(f"No backup of '{agent_name}'{suffix}")
+    return candidates[-1]
+
+
+def restore(agent_name, at=None):
+    """Restore an agent file from the store.
+
+    The current file is backed up first, so a restore can itself be undone.
+    Returns the restored entry.
+    """
+    entry = find_backup(agent_name, at)
+    data = read_object(entry["hash"])
+    agent_path = PROJECT_ROOT / "agents" / f"AGENTS.{agent_name}.md"
+    if agent_path.exists():
+        backup_file(agent_name, agent_path)
+    atomic_write(agent_path, data)
+    return entry
+
+
+def gc(keep=DEFAULT_KEEP, max_age_days=None):
+    """Apply the retention policy and delete unreferenced blobs.
+
+    For each agent the newest `keep` entries are retained; if max_age_days is
+    given, entries older than that are dropped too. The newest entry of every
+    agent is always kept. Returns (entries_removed, objects_removed).
+    """
+    cutoff = None
+    if max_age_days is not None:
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime(TIMESTAMP_FORMAT)
+
+    with store_lock():
+        entries = load_index()
+        by_agent = {}
+        for position, entry in enumerate(entries):
+            by_agent.setdefault(entry["agent"], []).append(position)
+
+        keep_positions = set()
+        for positions in by_agent.values():
+            for rank, position in enumerate(reversed(positions)):
+                timestamp = entries[position]["timestamp"]
+                if rank == 0 or (rank < keep and (cutoff is None or timestamp >= cutoff)):
+                    keep_positions.add(position)
+        # Index order is backup order; timestamps only have second resolution.
+        kept = [entry for position, entry in enumerate(entries) if position in keep_positions]
+
+        if len(kept) != len(entries):
+            atomic_write(INDEX_FILE, "".join(json.dumps(e, sort_keys=True) + "\n" for e in kept))
+
+        referenced = {e["hash"] for e in kept}
+        removed_objects = 0
+        if OBJECTS_DIR.exists():
+            for path in OBJECTS_DIR.glob("??/*"):
+                if path.parent.name + path.name not in referenced:
+                    path.unlink()
+                    removed_objects += 1
+            for directory in OBJECTS_DIR.iterdir():
+                if directory.is_dir() and not any(directory.iterdir()):
+                    directory.rmdir()
+    return len(entries) - len(kept), removed_objects
+
+
+def store_size():
+    """Return (object count, compressed bytes) of the object store."""
+    if not OBJECTS_DIR.exists():
+        return 0, 0
+    sizes = [p.stat().st_size for p in OBJECTS_DIR.glob("??/*")]
+    return len(sizes), sum(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage agent backups")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_list = sub.add_parser("list", help="List backups")
+    p_list.add_argument("agent_name", nargs="?", help="Only show this agent")
+
+    p_restore = sub.add_parser("restore", help="Restore an agent from a backup")
+    p_restore.add_argument("agent_name", help="Agent ID (e.g., python-backend)")
+    p_restore.add_argument("--at", help="Backup timestamp or hash prefix (default: newest)")
+
+    p_gc = sub.add_parser("gc", help="Apply retention policy and drop unreferenced blobs")
+    p_gc.add_argument("--keep", type=int, default=DEFAULT_KEEP, help=f"Backups kept per agent (default: {DEFAULT_KEEP})")
+    p_gc.add_argument("--max-age", type=float, help="Drop backups older than this many days")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        entries = list_backups(args.agent_name)
+        for entry in entries:
+            print(f"{entry['timestamp']}  {entry['hash'][:12]}  {entry['agent']}")
+        count, size = store_size()
+        print(f"\n📦 {len(entries)} backups, {count} unique objects ({size / 1024:.1f} KiB)")
+    elif args.command == "restore":
+        try:
+            entry = restore(args.agent_name, args.at)
+        except (ValueError, OSError) as e:
+            print(f"❌ Error: {e}")
+            return 1
+        print(f"✅ Restored {args.agent_name} from {entry['timestamp']} ({entry['hash'][:12]})")
+    elif args.command == "gc":
+        entries_removed, objects_removed = gc(args.keep, args.max_age)
+        print(f"🧹 Removed {entries_removed} index entries and {objects_removed} objects")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
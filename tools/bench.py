@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Benchmark the tools against synthetic registries and catch regressions.
+
+For each scale a registry is generated with synth_registry.py (tools/ is
+copied into it), then every case is run there as a subprocess --repeat
+times. Wall time, CPU time and peak RSS are taken from the process itself
+(wait4), so a case that uses a worker pool is measured including its
+workers. Results are written as JSON; if a baseline exists the best time
+and peak RSS of every case are compared with it and the run fails when
+either grew by more than the tolerance.
+
+Timings only compare on the same machine, so the baseline lives in
+.agents-md/bench/ by default; record one with --update-baseline.
+
+Usage:
+    python tools/bench.py [--agents 100,1000] [--repeat 3] [--case validate ...]
+    python tools/bench.py --agents 10000 --update-baseline
+    python tools/bench.py --baseline path/to/baseline.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from registry import PROJECT_ROOT, atomic_write, state_dir
+from synth_registry import generate
+
+BENCH_DIR = state_dir(PROJECT_ROOT) / "bench"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+BATCH_FILE = "bench-batch.json"
+# Differences below these never count as regressions (timer and allocator noise).
+MIN_SECONDS = 0.05
+MIN_RSS_MB = 5.0
+
+
+@dataclass(slots=True, frozen=True)
+class Case:
+    name: str
+    argv: tuple
+    restore: tuple = ()   # files put back to their pre-benchmark bytes before every run
+    ok: tuple = (0,)      # exit codes that count as success
+
+
+CASES = (
+    Case("validate", ("validate_data.py",)),
+    Case("find", ("capability_index.py", "--can", "can_1", "--tool", "tool_1")),
+    Case("update-version", ("update_version.py", "--batch", BATCH_FILE), restore=("data/versions.yaml",)),
+    Case("regenerate-all", ("regenerate_agent.py", "--all", "--force")),
+    Case("remove-emojis", ("remove_emojis.py", "--check", "agents", "templates", "knowledge"), ok=(0, 1)),
+    Case("build-docs", ("build_docs.py", "--force")),
+    Case("build-docs-noop", ("build_docs.py",)),
+    Case("export-sqlite", ("export_sqlite.py", "--force")),
+    Case("pack", ("pack_agents.py",)),
+)
+
+
+def write_batch(root, agent_ids, size=100):
+    """The update-version workload: one new entry for each of the first agents."""
+    batch = [{"agent": agent_id, "version": "9.0.0", "changes": "Benchmark update"}
+             for agent_id in agent_ids[:size]]
+    (root / BATCH_FILE).write_text(json.dumps(batch))
+
+
+def run_once(root, case, log):
+    """Run a case once; return (wall seconds, cpu seconds, peak RSS in MB)."""
+    with open(log, "wb") as out:
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, f"tools/{case.argv[0]}", *case.argv[1:]],
+                                   cwd=root, stdout=out, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode not in case.ok:
+        tail = log.read_text(errors="replace").splitlines()[-20:]
+        raise RuntimeError(f"{case.name} exited with {process.returncode}:\n" + "\n".join(tail))
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    rss = usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+    return wall, usage.ru_utime + usage.ru_stime, rss
+
+
+def run_scale(agents, cases, repeat, workdir):
+    """Generate a registry of the given size and run every case on it."""
+    root = Path(workdir) / f"registry-{agents}"
+    summary = generate(root, agents)
+    subprocess.run([sys.executable, "-m", "compileall", "-q", "tools"], cwd=root, check=True)
+    write_batch(root, sorted(p.name[len("AGENTS."):-len(".md")] for p in (root / "agents").glob("*.md")))
+    print(f"🧪 {agents} agents, {summary['templates']} templates, {summary['versions']} versions, "
+          f"{summary['knowledge']} knowledge docs")
+
+    results = {}
+    for case in cases:
+        saved = {path: (root / path).read_bytes() for path in case.restore}
+        runs = []
+        for _ in range(repeat):
+            for path, data in saved.items():
+                (root / path).write_bytes(data)
+            runs.append(run_once(root, case, root / f"bench-{case.name}.log"))
+        walls = sorted(r[0] for r in runs)
+        results[case.name] = {
+            "best": round(walls[0], 4),
+            "median": round(walls[len(walls) // 2], 4),
+            "first": round(runs[0][0], 4),
+            "cpu": round(min(r[1] for r in runs), 4),
+            "max_rss_mb": round(max(r[2] for r in runs), 1),
+        }
+        r = results[case.name]
+        print(f"   {case.name:<16} best {r['best']:.3f}s  median {r['median']:.3f}s  "
+              f"first {r['first']:.3f}s  rss {r['max_rss_mb']:.0f} MB")
+    return {"registry": summary, "cases": results}
+
+
+def compare(results, baseline, tolerance):
+    """Return regression messages for results against a baseline."""
+    regressions = []
+    for scale, current in results["scales"].items():
+        before = baseline.get("scales", {}).get(scale)
+        if not before:
+            continue
+        for name, now in current["cases"].items():
+            then = before["cases"].get(name)
+            if not then:
+                continue
+            for key, unit, floor in (("best", "s", MIN_SECONDS), ("max_rss_mb", " MB", MIN_RSS_MB)):
+                if now[key] > then[key] * (1 + tolerance) and now[key] - then[key] > floor:
+                    regressions.append(f"{name} @ {scale} agents: {key} {then[key]}{unit} -> {now[key]}{unit} "
+                                       f"(+{(now[key] / then[key] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tools on synthetic registries")
+    parser.add_argument("--agents", default="100,1000", help="Comma-separated registry sizes (default: 100,1000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (default: 3)")
+    parser.add_argument("--case", action="append", choices=[c.name for c in CASES], help="Only run these cases")
+    parser.add_argument("--output", help=f"Results file (default: {BENCH_DIR}/results-<time>.json)")
+    parser.add_argument("--baseline", help=f"Baseline to compare with (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed growth before failing (default: 0.25)")
+    parser.add_argument("--update-baseline", action="store_true", help="Save these results as the baseline")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated registries")
+    args = parser.parse_args()
+
+    cases = [c for c in CASES if not args.case or c.name in args.case]
+    try:
+        scales = [int(n) for n in args.agents.split(",")]
+    except ValueError:
+        parser.error("--agents takes comma-separated integers")
+
+    workdir = tempfile.mkdtemp(prefix="agents-md-bench-")
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "scales": {},
+    }
+    try:
+        for agents in scales:
+            results["scales"][str(agents)] = run_scale(agents, cases, args.repeat, workdir)
+    except (OSError, RuntimeError, subprocess.CalledProcessError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    finally:
+        if args.keep:
+            print(f"📁 Registries kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = Path(args.output or BENCH_DIR / f"results-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    payload = json.dumps(results, indent=2) + "\n"
+    atomic_write(output, payload)
+    print(f"📄 Results written to {output}")
+
+    baseline_path = Path(args.baseline or DEFAULT_BASELINE)
+    if args.update_baseline:
+        atomic_write(baseline_path, payload)
+        print(f"📌 Baseline saved to {baseline_path}")
+        return 0
+    try:
+        baseline = json.loads(baseline_path.read_text())
+    except FileNotFoundError:
+        print("💡 No baseline yet; record one with --update-baseline")
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: cannot read baseline {baseline_path}: {e}")
+        return 1
+
+    regressions = compare(results, baseline, args.tolerance)
+    for message in regressions:
+        print(f"❌ Regression: {message}")
+    if regressions:
+        return 1
+    print(f"✅ No regressions against {baseline_path} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
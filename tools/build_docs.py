@@ -2,193 +2,284 @@
 """
 Generate static HTML documentation site for the Agent Knowledge System.
 
+The site has an index page plus one page per agent, template, swarm and
+knowledge document. Templates are compiled once per process by a shared
+jinja2 Environment whose bytecode is cached under .agents-md/cache/jinja/.
+A page manifest (.agents-md/docs-manifest.json) records the hash of each
+page's inputs (its render context and the templates) and of the file written,
+so only pages whose inputs changed are re-rendered. Rendering is CPU-bound
+Python, so large batches are spread over worker processes; a handful of
+pages renders inline. Pages whose source disappeared are removed.
+
+Output is reproducible: the same inputs give byte-identical files. No wall
+clock time is used (set SOURCE_DATE_EPOCH to stamp the index with a build
+date), the stylesheet is emitted as assets/style.<hash>.css, every file gets
+precompressed .gz (and, if the brotli package is installed, .br) siblings,
+and dist/asset-manifest.json lists each file with its SHA-256 for deploys.
+
+Every page has a search box backed by the sharded index from search_index.py.
+
 Usage:
-    python tools/build_docs.py
+    python tools/build_docs.py [--jobs N] [--force]
 """
 
-import yaml
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, is_dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from jinja2 import Template
-from datetime import datetime
+
+import profiling
+from models import LazyEntries, load_model
+from search_index import SCRIPT as SEARCH_SCRIPT, SEARCH_DIR, build_index
+from registry import atomic_write, cache_dir, content_hash, state_dir
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz siblings are written
+    brotli = None
 
 PROJECT_ROOT = Path(__file__).parent.parent
 DIST_DIR = PROJECT_ROOT / "dist"
+MANIFEST_FILE = state_dir(PROJECT_ROOT) / "docs-manifest.json"
+
+# Bump whenever page output changes for the same context and templates.
+DOCS_VERSION = "3"
+
+# Fewer stale pages than this render inline; starting workers would cost more.
+PARALLEL_MIN_PAGES = 64
+
+ASSET_DIR = "assets"
+ASSET_MANIFEST = "asset-manifest.json"
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+STYLESHEET = """\
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
+    font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
+    line-height: 1.6;
+    color: #333;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    min-height: 100vh;
+    padding: 2rem;
+}
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+    background: white;
+    border-radius: 16px;
+    box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+    padding: 3rem;
+}
+header {
+    text-align: center;
+    margin-bottom: 3rem;
+}
+h1 {
+    font-size: 3rem;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    margin-bottom: 0.5rem;
+}
+.subtitle {
+    color: #666;
+    font-size: 1.2rem;
+}
+.stats {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+    gap: 1.5rem;
+    margin-bottom: 3rem;
+}
+.stat-card {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    padding: 2rem;
+    border-radius: 12px;
+    text-align: center;
+}
+.stat-value {
+    font-size: 3rem;
+    font-weight: bold;
+}
+.stat-label {
+    font-size: 1rem;
+    opacity: 0.9;
+    margin-top: 0.5rem;
+}
+.section {
+    margin-bottom: 3rem;
+}
+h2 {
+    color: #764ba2;
+    margin-bottom: 1.5rem;
+    font-size: 2rem;
+}
+.agent-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
+    gap: 1.5rem;
+}
+.agent-card {
+    border: 2px solid #e0e0e0;
+    border-radius: 12px;
+    padding: 1.5rem;
+    transition: all 0.3s ease;
+}
+.agent-card:hover {
+    border-color: #764ba2;
+    box-shadow: 0 8px 16px rgba(118, 75, 162, 0.2);
+    transform: translateY(-4px);
+}
+.agent-name {
+    font-size: 1.3rem;
+    font-weight: bold;
+    color: #764ba2;
+    margin-bottom: 0.5rem;
+}
+.agent-meta {
+    font-size: 0.9rem;
+    color: #666;
+    margin-bottom: 0.5rem;
+}
+.agent-version {
+    display: inline-block;
+    background: #667eea;
+    color: white;
+    padding: 0.25rem 0.75rem;
+    border-radius: 20px;
+    font-size: 0.85rem;
+    margin-top: 0.5rem;
+}
+.capabilities {
+    margin-top: 1rem;
+}
+.badge {
+    display: inline-block;
+    background: #f0f0f0;
+    padding: 0.25rem 0.75rem;
+    border-radius: 20px;
+    font-size: 0.8rem;
+    margin: 0.25rem;
+    color: #555;
+}
+.badge.can { background: #d4edda; color: #155724; }
+.badge.cannot { background: #f8d7da; color: #721c24; }
+.swarm-card {
+    background: #f8f9fa;
+    border-left: 4px solid #764ba2;
+    padding: 1.5rem;
+    border-radius: 8px;
+    margin-bottom: 1.5rem;
+}
+.swarm-name {
+    font-weight: bold;
+    font-size: 1.2rem;
+    color: #764ba2;
+    margin-bottom: 0.5rem;
+}
+footer {
+    text-align: center;
+    margin-top: 3rem;
+    padding-top: 2rem;
+    border-top: 2px solid #e0e0e0;
+    color: #666;
+}
+.nav { margin-bottom: 2rem; }
+.search { margin-bottom: 2rem; }
+.search input {
+    width: 100%;
+    padding: 0.75rem 1rem;
+    border: 2px solid #e0e0e0;
+    border-radius: 12px;
+    font-size: 1rem;
+}
+.search input:focus { outline: none; border-color: #764ba2; }
+.search ul { list-style: none; margin-top: 0.5rem; }
+.search li { padding: 0.25rem 0; }
+.search li a { color: #764ba2; text-decoration: none; margin-right: 0.5rem; }
+.nav a, .agent-card a, .swarm-name a { color: #764ba2; text-decoration: none; }
+.source {
+    background: #f8f9fa;
+    border-radius: 8px;
+    padding: 1.5rem;
+    overflow-x: auto;
+    white-space: pre-wrap;
+    font-size: 0.9rem;
+}
+table { border-collapse: collapse; width: 100%; }
+td, th { text-align: left; padding: 0.5rem; border-bottom: 1px solid #e0e0e0; }
+"""
 
 
-HTML_TEMPLATE = """<!DOCTYPE html>
+TEMPLATES = {
+    "base.html": """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Agent Knowledge System</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 2rem;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 16px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            padding: 3rem;
-        }
-        header {
-            text-align: center;
-            margin-bottom: 3rem;
-        }
-        h1 {
-            font-size: 3rem;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin-bottom: 0.5rem;
-        }
-        .subtitle {
-            color: #666;
-            font-size: 1.2rem;
-        }
-        .stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 1.5rem;
-            margin-bottom: 3rem;
-        }
-        .stat-card {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 2rem;
-            border-radius: 12px;
-            text-align: center;
-        }
-        .stat-value {
-            font-size: 3rem;
-            font-weight: bold;
-        }
-        .stat-label {
-            font-size: 1rem;
-            opacity: 0.9;
-            margin-top: 0.5rem;
-        }
-        .section {
-            margin-bottom: 3rem;
-        }
-        h2 {
-            color: #764ba2;
-            margin-bottom: 1.5rem;
-            font-size: 2rem;
-        }
-        .agent-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-            gap: 1.5rem;
-        }
-        .agent-card {
-            border: 2px solid #e0e0e0;
-            border-radius: 12px;
-            padding: 1.5rem;
-            transition: all 0.3s ease;
-        }
-        .agent-card:hover {
-            border-color: #764ba2;
-            box-shadow: 0 8px 16px rgba(118, 75, 162, 0.2);
-            transform: translateY(-4px);
-        }
-        .agent-name {
-            font-size: 1.3rem;
-            font-weight: bold;
-            color: #764ba2;
-            margin-bottom: 0.5rem;
-        }
-        .agent-meta {
-            font-size: 0.9rem;
-            color: #666;
-            margin-bottom: 0.5rem;
-        }
-        .agent-version {
-            display: inline-block;
-            background: #667eea;
-            color: white;
-            padding: 0.25rem 0.75rem;
-            border-radius: 20px;
-            font-size: 0.85rem;
-            margin-top: 0.5rem;
-        }
-        .capabilities {
-            margin-top: 1rem;
-        }
-        .badge {
-            display: inline-block;
-            background: #f0f0f0;
-            padding: 0.25rem 0.75rem;
-            border-radius: 20px;
-            font-size: 0.8rem;
-            margin: 0.25rem;
-            color: #555;
-        }
-        .badge.can { background: #d4edda; color: #155724; }
-        .badge.cannot { background: #f8d7da; color: #721c24; }
-        .swarm-card {
-            background: #f8f9fa;
-            border-left: 4px solid #764ba2;
-            padding: 1.5rem;
-            border-radius: 8px;
-            margin-bottom: 1.5rem;
-        }
-        .swarm-name {
-            font-weight: bold;
-            font-size: 1.2rem;
-            color: #764ba2;
-            margin-bottom: 0.5rem;
-        }
-        footer {
-            text-align: center;
-            margin-top: 3rem;
-            padding-top: 2rem;
-            border-top: 2px solid #e0e0e0;
-            color: #666;
-        }
-    </style>
+    <title>{% block title %}Agent Knowledge System{% endblock %}</title>
+    <link rel="stylesheet" href="{{ root }}{{ assets["style.css"] }}">
 </head>
 <body>
     <div class="container">
+        {% block header %}
+        <nav class="nav"><a href="{{ root }}index.html">← Agent Knowledge System</a></nav>
+        {% endblock %}
+        <form id="search" class="search" role="search" data-root="{{ root }}">
+            <input type="search" placeholder="Search agents, capabilities, templates, knowledge..." aria-label="Search">
+            <ul id="search-results"></ul>
+        </form>
+        {% block content %}{% endblock %}
+        <footer>
+            <p>Built with the Agent Knowledge System</p>
+            <p>BSD 3-Clause License © 2025 Enqack</p>
+        </footer>
+    </div>
+    <script src="{{ root }}{{ assets["search.js"] }}" defer></script>
+</body>
+</html>
+""",
+    "index.html": """{% extends "base.html" %}
+{% block header %}
         <header>
             <h1>🤖 Agent Knowledge System</h1>
             <p class="subtitle">Production-Ready AI Agent Registry</p>
-            <p style="color: #888;">Generated: {{ generated_at }}</p>
+            {% if generated_at %}<p style="color: #888;">Generated: {{ generated_at }}</p>{% endif %}
         </header>
-        
+{% endblock %}
+{% block content %}
         <div class="stats">
             <div class="stat-card">
-                <div class="stat-value">{{ n_agents }}</div>
+                <div class="stat-value">{{ agents|length }}</div>
                 <div class="stat-label">Agents</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value">{{ n_templates }}</div>
+                <div class="stat-value">{{ templates|length }}</div>
                 <div class="stat-label">Templates</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value">{{ n_knowledge }}</div>
+                <div class="stat-value">{{ knowledge|length }}</div>
                 <div class="stat-label">Knowledge Docs</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value">{{ n_swarms }}</div>
+                <div class="stat-value">{{ swarms|length }}</div>
                 <div class="stat-label">Swarms</div>
             </div>
         </div>
-        
+
         <section class="section">
             <h2>🤖 Agents</h2>
             <div class="agent-grid">
                 {% for agent in agents %}
                 <div class="agent-card">
-                    <div class="agent-name">{{ agent.id }}</div>
+                    <div class="agent-name"><a href="{{ agent.url }}">{{ agent.id }}</a></div>
                     <div class="agent-meta">Based on: {{ agent.parent }}</div>
                     <div class="agent-meta">Type: {{ agent.derivation_type }}</div>
                     <div class="agent-version">v{{ agent.version }}</div>
@@ -197,103 +288,481 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                         {% for cap in agent.can_do[:3] %}
                         <span class="badge can">{{ cap }}</span>
                         {% endfor %}
+                        {% if agent.can_do|length > 3 %}<a class="badge" href="{{ agent.url }}">+{{ agent.can_do|length - 3 }} more</a>{% endif %}
                     </div>
                 </div>
                 {% endfor %}
             </div>
         </section>
-        
+
+        <section class="section">
+            <h2>📐 Templates</h2>
+            <div class="agent-grid">
+                {% for template in templates %}
+                <div class="agent-card">
+                    <div class="agent-name"><a href="{{ template.url }}">{{ template.id }}</a></div>
+                    <div class="agent-meta">{{ template.description }}</div>
+                </div>
+                {% endfor %}
+            </div>
+        </section>
+
         <section class="section">
             <h2>🌐 Swarms</h2>
             {% for swarm in swarms %}
             <div class="swarm-card">
-                <div class="swarm-name">{{ swarm.name }}</div>
+                <div class="swarm-name"><a href="{{ swarm.url }}">{{ swarm.name }}</a></div>
                 <p>{{ swarm.description }}</p>
-                <p><strong>Team:</strong> {{ swarm.agents }}</p>
-                <p><strong>Use Cases:</strong> {{ swarm.use_cases }}</p>
+                <p><strong>Team:</strong> {{ swarm.agents|join(", ") }}</p>
+                <p><strong>Use Cases:</strong> {{ swarm.use_cases|join(", ") }}</p>
             </div>
             {% endfor %}
         </section>
-        
-        <footer>
-            <p>Built with the Agent Knowledge System</p>
-            <p>BSD 3-Clause License © 2025 Enqack</p>
-        </footer>
-    </div>
-</body>
-</html>
-"""
 
+        <section class="section">
+            <h2>📖 Knowledge</h2>
+            <ul>
+                {% for doc in knowledge %}
+                <li><a href="{{ doc.url }}">{{ doc.title }}</a></li>
+                {% endfor %}
+            </ul>
+        </section>
+{% endblock %}
+""",
+    "agent.html": """{% extends "base.html" %}
+{% block title %}{{ agent.id }} · Agent Knowledge System{% endblock %}
+{% block content %}
+        <h1>{{ agent.id }}</h1>
+        <p class="agent-meta">Based on: <a href="{{ root }}templates/{{ agent.parent }}.html">{{ agent.parent }}</a> · Type: {{ agent.derivation_type }}</p>
+        <div class="agent-version">v{{ agent.version }}</div>
+
+        <section class="section capabilities">
+            <h2>Capabilities</h2>
+            {% for cap in agent.can_do %}<span class="badge can">{{ cap }}</span>{% endfor %}
+            {% for cap in agent.cannot_do %}<span class="badge cannot">{{ cap }}</span>{% endfor %}
+            {% if agent.tools_required %}<p><strong>Tools:</strong> {{ agent.tools_required|join(", ") }}</p>{% endif %}
+        </section>
 
-def load_yaml(filename):
-    """Load a YAML file from data directory."""
-    with open(PROJECT_ROOT / "data" / filename) as f:
-        return yaml.safe_load(f)
+        {% if agent.swarms %}
+        <section class="section">
+            <h2>Swarms</h2>
+            {% for name in agent.swarms %}<a class="badge" href="{{ root }}swarms/{{ name }}.html">{{ name }}</a>{% endfor %}
+        </section>
+        {% endif %}
 
+        {% if agent.history %}
+        <section class="section">
+            <h2>Version History</h2>
+            <table>
+                <tr><th>Version</th><th>Date</th><th>Changes</th></tr>
+                {% for entry in agent.history %}
+                <tr><td>{{ entry.version }}</td><td>{{ entry.date }}</td><td>{{ entry.changes }}</td></tr>
+                {% endfor %}
+            </table>
+        </section>
+        {% endif %}
+
+        <section class="section">
+            <h2>Definition</h2>
+            <pre class="source">{{ agent.source }}</pre>
+        </section>
+{% endblock %}
+""",
+    "template.html": """{% extends "base.html" %}
+{% block title %}{{ template.id }} · Agent Knowledge System{% endblock %}
+{% block content %}
+        <h1>{{ template.id }}</h1>
+        <p class="agent-meta">{{ template.description }} · Category: {{ template.category }}</p>
+
+        {% if template.children %}
+        <section class="section">
+            <h2>Derived Agents</h2>
+            {% for agent_id in template.children %}<a class="badge" href="{{ root }}agents/{{ agent_id }}.html">{{ agent_id }}</a>{% endfor %}
+        </section>
+        {% endif %}
+
+        <section class="section">
+            <h2>Template</h2>
+            <pre class="source">{{ template.source }}</pre>
+        </section>
+{% endblock %}
+""",
+    "swarm.html": """{% extends "base.html" %}
+{% block title %}{{ swarm.name }} · Agent Knowledge System{% endblock %}
+{% block content %}
+        <h1>{{ swarm.name }}</h1>
+        <p>{{ swarm.description }}</p>
+
+        <section class="section">
+            <h2>Team</h2>
+            {% if swarm.orchestrator %}<p><strong>Orchestrator:</strong> {{ swarm.orchestrator }}</p>{% endif %}
+            {% for agent_id in swarm.agents %}<a class="badge" href="{{ root }}agents/{{ agent_id }}.html">{{ agent_id }}</a>{% endfor %}
+        </section>
+
+        <section class="section">
+            <h2>Use Cases</h2>
+            {% for use_case in swarm.use_cases %}<span class="badge">{{ use_case }}</span>{% endfor %}
+        </section>
+{% endblock %}
+""",
+    "knowledge.html": """{% extends "base.html" %}
+{% block title %}{{ doc.title }} · Agent Knowledge System{% endblock %}
+{% block content %}
+        <h1>{{ doc.title }}</h1>
+        <pre class="source">{{ doc.source }}</pre>
+{% endblock %}
+""",
+}
+
+TEMPLATES_HASH = content_hash(json.dumps(TEMPLATES, sort_keys=True))
+
+
+
+_environments = {}
+_environments_lock = threading.Lock()
+
+
+def get_environment(root=None):
+    """Return the shared jinja2 Environment, creating it on first use.
+
+    jinja2 is only imported here, so a build where every page is up to date
+    never loads it.
+    """
+    root = Path(root or PROJECT_ROOT)
+    with _environments_lock:
+        return _environments.get(root) or _create_environment(root)
+
+
+def _create_environment(root):
+    from jinja2 import DictLoader, Environment, FileSystemBytecodeCache
+
+    bytecode_dir = cache_dir(root) / "jinja"
+    bytecode_dir.mkdir(parents=True, exist_ok=True)
+    env = Environment(
+        loader=DictLoader(TEMPLATES),
+        autoescape=True,
+        bytecode_cache=FileSystemBytecodeCache(str(bytecode_dir)),
+    )
+    _environments[root] = env
+    return env
+
+
+def _read(path):
+    try:
+        return path.read_text()
+    except OSError:
+        return ""
+
+
+def _title(path):
+    """First markdown heading of a file, or its name."""
+    for line in _read(path).splitlines():
+        if line.startswith("#"):
+            return line.lstrip("#").strip()
+    return path.stem.replace("-", " ").title()
+
+
+def build_timestamp():
+    """Build date from SOURCE_DATE_EPOCH, or None so output never depends on the clock."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not epoch:
+        return None
+    return datetime.fromtimestamp(int(epoch), tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def collect_pages(model, assets, root=None):
+    """Return [(output path relative to dist/, template name, context)] for every page."""
+    root = Path(root or PROJECT_ROOT)
+    pages = []
 
-def build_site():
-    """Generate the static HTML site."""
-    print("📚 Generating documentation site...")
-    
-    # Load data
-    lineage = load_yaml("lineage.yaml")
-    capabilities = load_yaml("capabilities.yaml")
-    swarms_data = load_yaml("swarms.yaml")
-    versions = load_yaml("versions.yaml")
-    
-    # Prepare agent data
     agents = []
-    for agent in lineage["agents"]:
-        agent_id = agent["id"]
-        caps = capabilities["agents"].get(agent_id, {})
-        version_info = versions["agents"].get(agent_id, {})
-        
-        agents.append({
-            "id": agent_id,
-            "parent": agent["lineage"]["parent_template"],
-            "derivation_type": agent["lineage"]["derivation_type"],
-            "version": version_info.get("current_version", "1.0.0"),
-            "can_do": caps.get("can_do", []),
-            "cannot_do": caps.get("cannot_do", []),
-        })
-    
-    # Prepare swarm data
+    for agent in model.agents.values():
+        caps = model.capabilities.get(agent.id)
+        history = model.versions.get(agent.id)
+        context = {
+            "id": agent.id,
+            "url": f"agents/{agent.id}.html",
+            "parent": agent.parent_template,
+            "derivation_type": agent.derivation_type,
+            "version": model.current_version(agent.id, "1.0.0"),
+            "can_do": caps.can_do if caps else (),
+            "cannot_do": caps.cannot_do if caps else (),
+            "tools_required": caps.tools_required if caps else (),
+        }
+        agents.append(context)
+        pages.append((context["url"], "agent.html", {"agent": {
+            **context,
+            "swarms": [swarm.name for swarm in model.swarms_with(agent.id)],
+            "history": history.entries if history else (),
+            "source": _read(root / agent.path),
+        }}))
+
+    templates = []
+    for template in model.templates.values():
+        context = {
+            "id": template.id,
+            "url": f"templates/{template.id}.html",
+            "description": template.description,
+            "category": template.category,
+        }
+        templates.append(context)
+        pages.append((context["url"], "template.html", {"template": {
+            **context,
+            "children": [agent.id for agent in model.children_of(template.id)],
+            "source": _read(root / template.path),
+        }}))
+
     swarms = []
-    for swarm in swarms_data["swarms"]:
-        swarms.append({
-            "name": swarm["name"],
-            "description": swarm["description"],
-            "agents": ", ".join(swarm["agents"]),
-            "use_cases": ", ".join(swarm["use_cases"]),
-        })
-   
-    # Stats
-    n_agents = len(lineage["agents"])
-    n_templates = len(lineage["templates"])
-    n_knowledge = len(list((PROJECT_ROOT / "knowledge").glob("*.md")))
-    n_swarms = len(swarms_data["swarms"])
-    
-    # Render template
-    template = Template(HTML_TEMPLATE)
-    html = template.render(
-        generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        n_agents=n_agents,
-        n_templates=n_templates,
-        n_knowledge=n_knowledge,
-        n_swarms=n_swarms,
-        agents=agents,
-        swarms=swarms,
-    )
-    
-    # Write output
-    DIST_DIR.mkdir(exist_ok=True)
+    for swarm in model.swarms.values():
+        context = {
+            "name": swarm.name,
+            "url": f"swarms/{swarm.name}.html",
+            "description": swarm.description,
+            "orchestrator": swarm.orchestrator,
+            "agents": swarm.agents,
+            "use_cases": swarm.use_cases,
+        }
+        swarms.append(context)
+        pages.append((context["url"], "swarm.html", {"swarm": context}))
+
+    knowledge = []
+    knowledge_dir = root / "knowledge"
+    for path in sorted(knowledge_dir.rglob("*.md")):
+        rel = path.relative_to(knowledge_dir).with_suffix(".html").as_posix()
+        context = {"title": _title(path), "url": f"knowledge/{rel}"}
+        knowledge.append(context)
+        pages.append((context["url"], "knowledge.html", {"doc": {**context, "source": _read(path)}}))
+
+    pages.append(("index.html", "index.html", {
+        "agents": agents,
+        "templates": templates,
+        "swarms": swarms,
+        "knowledge": knowledge,
+        "generated_at": build_timestamp(),
+    }))
+
+    for rel, _, context in pages:
+        context["root"] = "../" * rel.count("/")
+        context["assets"] = assets
+    return pages
+
+
+def _json_default(value):
+    """Serialize model objects for page keys; sharded history is keyed by its file hash."""
+    if isinstance(value, LazyEntries):
+        return value.digest()
+    if is_dataclass(value):
+        return astuple(value)
+    return list(value)
+
+
+def page_key(template_name, context):
+    """Hash of everything a page is rendered from."""
+    return content_hash(json.dumps(
+        [DOCS_VERSION, TEMPLATES_HASH, template_name, context], sort_keys=True, default=_json_default
+    ))
+
+
+def compressed(data):
+    """Return {suffix: bytes} of deterministic precompressed variants."""
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return variants
+
+
+def write_output(path, data):
+    """Write a dist file and its compressed siblings, leaving identical files untouched."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    atomic_write(path, data)
+    for suffix, blob in compressed(data).items():
+        atomic_write(path.with_name(path.name + suffix), blob)
+    return True
+
+
+def remove_output(path):
+    """Delete a dist file and its compressed siblings. Returns True if it existed."""
+    for sibling in [path.with_name(path.name + s) for s in COMPRESSED_SUFFIXES]:
+        if sibling.exists():
+            sibling.unlink()
+    try:
+        path.unlink()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def emit_assets():
+    """Write content-hashed static assets and drop superseded ones.
+
+    Returns {logical name: path relative to dist/}.
+    """
+    assets = {}
+    for name, text in (("style.css", STYLESHEET), ("search.js", SEARCH_SCRIPT)):
+        data = text.encode("utf-8")
+        stem, suffix = name.rsplit(".", 1)
+        rel = f"{ASSET_DIR}/{stem}.{content_hash(data)[:12]}.{suffix}"
+        write_output(DIST_DIR / rel, data)
+        assets[name] = rel
+
+    current = {DIST_DIR / rel for rel in assets.values()}
+    for path in (DIST_DIR / ASSET_DIR).glob("*"):
+        if path.suffix not in COMPRESSED_SUFFIXES and path not in current:
+            remove_output(path)
+    return assets
+
+
+def search_document(rel, template_name, context):
+    """Return (url, title, kind, weighted fields) for a page, or None if not searchable."""
+    if template_name == "agent.html":
+        agent = context["agent"]
+        keywords = [agent["parent"], *agent["can_do"], *agent["tools_required"], *agent["swarms"]]
+        return rel, agent["id"], "agent", {
+            "title": agent["id"], "keywords": " ".join(keywords), "body": agent["source"],
+        }
+    if template_name == "template.html":
+        template = context["template"]
+        return rel, template["id"], "template", {
+            "title": template["id"],
+            "keywords": f"{template['description']} {template['category']}",
+            "body": template["source"],
+        }
+    if template_name == "swarm.html":
+        swarm = context["swarm"]
+        keywords = [swarm["description"], *swarm["use_cases"], *swarm["agents"]]
+        return rel, swarm["name"], "swarm", {
+            "title": swarm["name"], "keywords": " ".join(keywords), "body": "",
+        }
+    if template_name == "knowledge.html":
+        doc = context["doc"]
+        return rel, doc["title"], "knowledge", {
+            "title": doc["title"], "keywords": "", "body": doc["source"],
+        }
+    return None
+
+
+def emit_search_index(pages):
+    """Write the search index files and drop superseded ones.
+
+    Returns {path relative to dist/: content hash}.
+    """
+    documents = [doc for doc in (search_document(*page) for page in pages) if doc]
+    files = build_index(documents)
+    for rel, data in files.items():
+        write_output(DIST_DIR / rel, data)
+    for path in (DIST_DIR / SEARCH_DIR).glob("*.json"):
+        if path.relative_to(DIST_DIR).as_posix() not in files:
+            remove_output(path)
+    return {rel: content_hash(data) for rel, data in files.items()}
+
+
+def write_asset_manifest(assets, entries, extra):
+    """Write dist/asset-manifest.json: logical asset names and the hash of every file."""
+    files = {rel: entry["output_hash"] for rel, entry in entries.items()}
+    files.update(extra)
+    for rel in assets.values():
+        files[rel] = content_hash((DIST_DIR / rel).read_bytes())
+    payload = {"assets": assets, "files": dict(sorted(files.items()))}
+    write_output(DIST_DIR / ASSET_MANIFEST, json.dumps(payload, indent=2, sort_keys=True) + "\n")
+
+
+def load_manifest():
+    """Load the docs page manifest, or an empty one if absent or unreadable."""
+    try:
+        with open(MANIFEST_FILE) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("pages", {}) if isinstance(manifest, dict) else {}
+
+
+def save_manifest(entries):
+    """Atomically write the docs page manifest."""
+    payload = json.dumps({"pages": entries}, indent=2, sort_keys=True) + "\n"
+    atomic_write(MANIFEST_FILE, payload)
+
+
+def render_page(page):
+    """Render and write one (rel, template name, context) page; returns (rel, output hash)."""
+    rel, template_name, context = page
+    with profiling.span("render", page=rel):
+        html = get_environment().get_template(template_name).render(**context)
+    with profiling.span("write", page=rel):
+        write_output(DIST_DIR / rel, html)
+    return rel, content_hash(html)
+
+
+def build_site(jobs=None, force=False):
+    """Generate the static HTML site, re-rendering only pages whose inputs changed.
+
+    Returns a dict of page counts: rendered, fresh and removed.
+    """
+    started = time.perf_counter()
+    print("📚 Generating documentation site...")
+
+    with profiling.span("load"):
+        model = load_model()
+        assets = emit_assets()
+        pages = collect_pages(model, assets)
+        manifest = {} if force else load_manifest()
+
+    entries, keys, stale = {}, {}, []
+    with profiling.span("lookup", pages=len(pages)):
+        for page in pages:
+            rel, template_name, context = page
+            key = page_key(template_name, context)
+            entry = manifest.get(rel)
+            if entry and entry.get("key") == key and (DIST_DIR / rel).exists():
+                entries[rel] = entry
+            else:
+                keys[rel] = key
+                stale.append(page)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(stale) < PARALLEL_MIN_PAGES:
+        # Inline, so a profile of the render phase covers the rendering itself.
+        results = list(map(render_page, stale))
+    else:
+        chunksize = max(1, min(256, len(stale) // (jobs * 4)))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(render_page, stale, chunksize=chunksize))
+
+    for rel, output_hash in results:
+        entries[rel] = {"key": keys[rel], "output_hash": output_hash}
+    rendered = len(results)
+    removed = 0
+    for rel in sorted(set(load_manifest()) - set(entries)):
+        removed += remove_output(DIST_DIR / rel)
+    with profiling.span("write", what="manifests"):
+        if force or rendered or removed:
+            save_manifest(entries)
+        search_files = emit_search_index(pages)
+        write_asset_manifest(assets, entries, search_files)
+
+    elapsed = time.perf_counter() - started
     output_file = DIST_DIR / "index.html"
-    with open(output_file, "w") as f:
-        f.write(html)
-    
     print(f"✅ Documentation site generated: {output_file}")
+    print(f"⏱️  {rendered} pages rendered, {len(pages) - rendered} up to date, "
+          f"{removed} removed in {elapsed:.3f}s")
     print(f"💡 Open in browser: file://{output_file.absolute()}")
+    return {"rendered": rendered, "fresh": len(pages) - rendered, "removed": removed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the static documentation site")
+    parser.add_argument("--jobs", type=int, default=0, help="Render processes for large batches (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render every page")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.configure(args)
+    build_site(args.jobs or None, args.force)
 
 
 if __name__ == "__main__":
-    build_site()
+    main()
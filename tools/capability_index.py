@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Inverted capability index and agent query CLI.
+
+Every value in capabilities.yaml (can_do, cannot_do, tools_required,
+domain_expertise) maps to a bitset of the agents that list it, stored as a
+Python int with bit i set for agent i. Boolean queries are then a handful of
+integer AND/AND-NOT operations. The index is cached under .agents-md/cache/
+keyed by the content hash of capabilities.yaml.
+
+Usage:
+    python tools/capability_index.py --can async_io --cannot ui_design --tool pytest
+    python tools/capability_index.py --can api_design --without ui_design --json
+    python tools/capability_index.py --bench 10000
+
+Flags map to capability fields:
+    --can X       X is in can_do
+    --cannot X    X is in cannot_do (the agent declares it out of scope)
+    --without X   X is NOT in can_do
+    --tool X      X is in tools_required
+    --domain X    X is in domain_expertise
+"""
+
+import argparse
+import json
+import pickle
+import random
+import sys
+import time
+from pathlib import Path
+
+import profiling
+from registry import PROJECT_ROOT, atomic_write, cache_dir, file_digest, load_yaml
+
+FIELDS = ("can_do", "cannot_do", "tools_required", "domain_expertise")
+
+# Bump when the pickled layout changes.
+INDEX_VERSION = 1
+
+
+class CapabilityIndex:
+    """Capability value -> agent bitset postings for each capability field."""
+
+    __slots__ = ("agent_ids", "positions", "postings", "all_mask")
+
+    def __init__(self, agent_ids, postings):
+        self.agent_ids = agent_ids
+        self.positions = {agent_id: i for i, agent_id in enumerate(agent_ids)}
+        self.postings = postings
+        self.all_mask = (1 << len(agent_ids)) - 1
+
+    @classmethod
+    def build(cls, capabilities):
+        """Build from the raw capabilities.yaml "agents" mapping."""
+        agent_ids = []
+        postings = {field: {} for field in FIELDS}
+        for i, (agent_id, caps) in enumerate(capabilities.items()):
+            agent_ids.append(sys.intern(str(agent_id)))
+            if not isinstance(caps, dict):
+                continue
+            bit = 1 << i
+            for field in FIELDS:
+                values = caps.get(field)
+                if not isinstance(values, list):
+                    continue
+                field_postings = postings[field]
+                for value in values:
+                    value = sys.intern(str(value))
+                    field_postings[value] = field_postings.get(value, 0) | bit
+        return cls(agent_ids, postings)
+
+    def bitset(self, field, value):
+        """Return the bitset of agents listing value under field."""
+        return self.postings[field].get(value, 0)
+
+    def query_mask(self, can=(), cannot=(), without=(), tools=(), domains=()):
+        """Return the bitset of agents matching every condition."""
+        mask = self.all_mask
+        for value in can:
+            mask &= self.postings["can_do"].get(value, 0)
+        for value in cannot:
+            mask &= self.postings["cannot_do"].get(value, 0)
+        for value in tools:
+            mask &= self.postings["tools_required"].get(value, 0)
+        for value in domains:
+            mask &= self.postings["domain_expertise"].get(value, 0)
+        for value in without:
+            mask &= ~self.postings["can_do"].get(value, 0)
+        return mask
+
+    def agents_in(self, mask):
+        """Decode a bitset into agent IDs, in registry order."""
+        ids = self.agent_ids
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(ids[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def query(self, can=(), cannot=(), without=(), tools=(), domains=()):
+        """Return agent IDs matching every condition."""
+        return self.agents_in(self.query_mask(can, cannot, without, tools, domains))
+
+    def mask_of(self, agent_ids):
+        """Return the bitset for a collection of agent IDs (unknown IDs ignored)."""
+        mask = 0
+        for agent_id in agent_ids:
+            if agent_id in self.positions:
+                mask |= 1 << self.positions[agent_id]
+        return mask
+
+
+def load_index(root=None):
+    """Load the capability index, rebuilding the cached copy if the data changed."""
+    root = Path(root or PROJECT_ROOT)
+    # Hashing the file is enough to find the cached index; nothing is parsed on a hit.
+    key = file_digest("capabilities.yaml", root)
+    cache_file = cache_dir(root) / "capability-index.pickle"
+    try:
+        with open(cache_file, "rb") as f:
+            stored = pickle.load(f)
+        if stored.get("version") == INDEX_VERSION and stored.get("key") == key:
+            return CapabilityIndex(stored["agent_ids"], stored["postings"])
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError):
+        pass
+
+    capabilities = load_yaml("capabilities.yaml", root).get("agents") or {}
+    index = CapabilityIndex.build(capabilities)
+    payload = {"version": INDEX_VERSION, "key": key,
+               "agent_ids": index.agent_ids, "postings": index.postings}
+    try:
+        atomic_write(cache_file, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        pass
+    return index
+
+
+def synthetic_capabilities(n_agents, n_values=500, per_field=6, seed=0):
+    """Generate a capabilities mapping with n_agents random agents."""
+    rng = random.Random(seed)
+    vocab = {field: [f"{field}_{i}" for i in range(n_values)] for field in FIELDS}
+    return {
+        f"agent-{i:05d}": {field: rng.sample(vocab[field], per_field) for field in FIELDS}
+        for i in range(n_agents)
+    }
+
+
+def bench(n_agents, n_queries=10000):
+    """Time random three-term queries against a synthetic registry."""
+    t0 = time.perf_counter()
+    index = CapabilityIndex.build(synthetic_capabilities(n_agents))
+    build_s = time.perf_counter() - t0
+
+    rng = random.Random(1)
+    can = list(index.postings["can_do"])
+    cannot = list(index.postings["cannot_do"])
+    tools = list(index.postings["tools_required"])
+    queries = [([rng.choice(can)], [rng.choice(cannot)], [rng.choice(tools)]) for _ in range(n_queries)]
+
+    t0 = time.perf_counter()
+    for c, nc, tl in queries:
+        index.query(can=c, cannot=nc, tools=tl)
+    per_query_us = (time.perf_counter() - t0) / n_queries * 1e6
+
+    print(f"📊 {n_agents} agents: index built in {build_s * 1000:.1f} ms, "
+          f"{per_query_us:.2f} µs/query over {n_queries} queries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query agents by capability")
+    parser.add_argument("--can", action="append", default=[], help="Required can_do entry")
+    parser.add_argument("--cannot", action="append", default=[], help="Required cannot_do entry")
+    parser.add_argument("--without", action="append", default=[], help="can_do entry the agent must NOT have")
+    parser.add_argument("--tool", action="append", default=[], help="Required tools_required entry")
+    parser.add_argument("--domain", action="append", default=[], help="Required domain_expertise entry")
+    parser.add_argument("--json", action="store_true", help="Print matching agent IDs as JSON")
+    parser.add_argument("--bench", type=int, metavar="N", help="Benchmark against N synthetic agents")
+    profiling.add_arguments(parser)
+
+    args = parser.parse_args()
+    profiling.configure(args)
+    if args.bench:
+        bench(args.bench)
+        return 0
+
+    with profiling.span("load", what="capability index"):
+        index = load_index()
+    t0 = time.perf_counter()
+    with profiling.span("lookup"):
+        matches = index.query(args.can, args.cannot, args.without, args.tool, args.domain)
+    elapsed_us = (time.perf_counter() - t0) * 1e6
+
+    if args.json:
+        print(json.dumps(matches))
+        return 0
+    for agent_id in matches:
+        print(agent_id)
+    print(f"\n🔍 {len(matches)} of {len(index.agent_ids)} agents match ({elapsed_us:.0f} µs)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
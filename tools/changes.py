@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Map changed files to the registry entities they affect.
+
+Used by `validate_data.py --changed/--since` (and anything else that wants
+to do only the work a change requires). Changed paths come from git; data
+file changes are diffed entity by entity against the old revision, and the
+result is expanded through the lineage/swarm reference graph:
+
+    history shard data/versions/<agent>.yaml -> that agent
+    template  -> agents derived from it or whose version history names it,
+                 swarms it orchestrates
+    agent     -> swarms that include it (also when it was removed or renamed)
+
+Usage:
+    from changes import git_changed_paths, affected_scope
+
+    paths = git_changed_paths("origin/main")
+    scope = affected_scope(paths, old_data=lambda f: load_at_revision(f, "origin/main"))
+"""
+
+import subprocess
+from pathlib import Path
+
+import yaml
+
+from models import load_model
+from registry import DATA_FILES, PROJECT_ROOT, VERSIONS_SHARD_DIR, load_history, load_yaml, parse_yaml
+
+SCOPE_KINDS = ("agent", "template", "swarm")
+
+
+def empty_scope():
+    """Return a scope with nothing in it."""
+    return {kind: set() for kind in SCOPE_KINDS}
+
+
+def _git(root, *args):
+    result = subprocess.run(
+        ["git", "-C", str(root), *args],
+        capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def git_changed_paths(rev="HEAD", root=None):
+    """Return repo-relative paths changed since rev, including uncommitted and untracked files.
+
+    Renames contribute both the old and the new path.
+    """
+    root = Path(root or PROJECT_ROOT)
+    paths = set()
+    for line in _git(root, "diff", "--name-status", "-M", "--relative", rev).splitlines():
+        parts = line.split("\t")
+        paths.update(parts[1:])
+    for line in _git(root, "ls-files", "--others", "--exclude-standard").splitlines():
+        paths.add(line)
+    return paths
+
+
+def load_at_revision(filename, rev, root=None):
+    """Parse a data file as it was at rev; None if it did not exist or does not parse."""
+    root = Path(root or PROJECT_ROOT)
+    try:
+        text = _git(root, "show", f"{rev}:./data/{filename}")
+        return parse_yaml(text)
+    except (RuntimeError, yaml.YAMLError):
+        return None
+
+
+def _keyed(items, key):
+    """Index a YAML list of mappings by a field."""
+    out = {}
+    for item in items or ():
+        if isinstance(item, dict) and isinstance(item.get(key), str):
+            out[item[key]] = item
+    return out
+
+
+def _diff_keys(old, new):
+    """Return keys added, removed or changed between two dicts."""
+    return {k for k in old.keys() | new.keys() if old.get(k) != new.get(k)}
+
+
+def _section(data, key):
+    value = data.get(key) if isinstance(data, dict) else None
+    return value if value is not None else {}
+
+
+def diff_data_file(filename, old, new):
+    """Return the scope of entities that differ between two versions of a data file."""
+    scope = empty_scope()
+    full = old is None or not isinstance(new, dict)
+    old = old if isinstance(old, dict) else {}
+    new = new if isinstance(new, dict) else {}
+
+    if filename == "lineage.yaml":
+        for kind, section in (("template", "templates"), ("agent", "agents")):
+            a, b = _keyed(_section(old, section), "id"), _keyed(_section(new, section), "id")
+            scope[kind] |= (set(a) | set(b)) if full else _diff_keys(a, b)
+    elif filename in ("capabilities.yaml", "versions.yaml"):
+        a, b = _section(old, "agents"), _section(new, "agents")
+        if isinstance(a, dict) and isinstance(b, dict):
+            scope["agent"] |= (set(a) | set(b)) if full else _diff_keys(a, b)
+    elif filename == "swarms.yaml":
+        a, b = _keyed(_section(old, "swarms"), "name"), _keyed(_section(new, "swarms"), "name")
+        scope["swarm"] |= (set(a) | set(b)) if full else _diff_keys(a, b)
+        old_matrix, new_matrix = _section(old, "compatibility_matrix"), _section(new, "compatibility_matrix")
+        for group in ("compatible", "conflicting"):
+            before = {tuple(p) for p in _section(old_matrix, group) if isinstance(p, list)}
+            after = {tuple(p) for p in _section(new_matrix, group) if isinstance(p, list)}
+            for pair in before ^ after:
+                scope["agent"].update(v for v in pair if isinstance(v, str))
+    return scope
+
+
+def history_references(template_ids, root=None):
+    """Return ids of agents whose version entries name one of template_ids in template_version."""
+    versions = load_yaml("versions.yaml", root)
+    agents = _section(versions, "agents")
+    found = set()
+    if not isinstance(agents, dict):
+        return found
+    for agent_id, head in agents.items():
+        entries = [head, *load_history(agent_id, root)]
+        for entry in entries:
+            value = entry.get("template_version") if isinstance(entry, dict) else None
+            if isinstance(value, str) and value.partition("@")[0] in template_ids:
+                found.add(agent_id)
+                break
+    return found
+
+
+def expand_scope(scope, model):
+    """Close a scope over the template -> agent and agent -> swarm references."""
+    for template_id in list(scope["template"]):
+        for agent in model.children_of(template_id):
+            scope["agent"].add(agent.id)
+        for swarm in model.swarms.values():
+            if swarm.orchestrator == template_id:
+                scope["swarm"].add(swarm.name)
+    if scope["template"]:
+        scope["agent"] |= history_references(scope["template"], model.root)
+    for agent_id in list(scope["agent"]):
+        for swarm in model.swarms_with(agent_id):
+            scope["swarm"].add(swarm.name)
+    return scope
+
+
+def affected_scope(paths, old_data=None, root=None):
+    """Return (scope, data files changed) for a set of changed paths.
+
+    old_data(filename) returns the parsed previous version of a data file (or
+    None if unknown); without it, a changed data file puts all its entities
+    in scope.
+    """
+    root = Path(root or PROJECT_ROOT)
+    scope = empty_scope()
+    changed_data = set()
+    data_paths = {f"data/{filename}": filename for filename in DATA_FILES.values()}
+    shard_prefix = f"data/{VERSIONS_SHARD_DIR}/"
+
+    for path in paths:
+        if path in data_paths:
+            changed_data.add(data_paths[path])
+        elif path.startswith(shard_prefix) and path.endswith(".yaml"):
+            scope["agent"].add(path[len(shard_prefix):-len(".yaml")])
+
+    for filename in changed_data:
+        try:
+            new = load_yaml(filename, root)
+        except (OSError, yaml.YAMLError):
+            new = None
+        old = old_data(filename) if old_data else None
+        for kind, ids in diff_data_file(filename, old, new).items():
+            scope[kind] |= ids
+
+    try:
+        model = load_model(root)
+    except (OSError, yaml.YAMLError):
+        # A data file does not parse; the validator reports that on its own.
+        return scope, changed_data
+
+    by_path = {t.path: ("template", t.id) for t in model.templates.values()}
+    by_path.update({a.path: ("agent", a.id) for a in model.agents.values()})
+    for path in paths:
+        hit = by_path.get(path)
+        if hit:
+            scope[hit[0]].add(hit[1])
+
+    return expand_scope(scope, model), changed_data
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Compose a minimal swarm covering a set of required capabilities.
+
+Required capabilities are can_do values from capabilities.yaml; a use case from
+swarms.yaml stands for every capability the agents of its swarms can do. An
+agent never counts as covering something it also lists under cannot_do, and
+pairs listed under compatibility_matrix.conflicting are never picked together.
+
+Two solvers work on bitsets over the required capabilities:
+    greedy  repeatedly picks the agent covering the most uncovered capabilities
+    exact   branch-and-bound seeded with the greedy answer; returns a proven
+            minimum unless --max-nodes is exhausted
+
+Usage:
+    python tools/compose_swarm.py api_design ui_design [--use-case NAME] [--exact] [--json]
+    python tools/compose_swarm.py --bench 5000 --caps 300
+"""
+
+import argparse
+import json
+import random
+import time
+
+import yaml
+
+from capability_index import CapabilityIndex, load_index, synthetic_capabilities
+from models import load_model
+
+DEFAULT_MAX_NODES = 200_000
+
+
+def use_case_capabilities(model, use_case):
+    """Return the capabilities provided by the swarms that list a use case."""
+    swarms = [s for s in model.swarms.values() if use_case in s.use_cases]
+    if not swarms:
+        raise ValueError(f"Use case '{use_case}' not found in swarms.yaml")
+    required = []
+    for swarm in swarms:
+        for agent_id in swarm.agents:
+            caps = model.capabilities.get(agent_id)
+            for cap in caps.can_do if caps else ():
+                if cap not in required:
+                    required.append(cap)
+    return required
+
+
+def cover_masks(index, required):
+    """Return {agent position: bitset of required capabilities it covers}."""
+    masks = {}
+    for bit, cap in enumerate(required):
+        providers = index.bitset("can_do", cap) & ~index.bitset("cannot_do", cap)
+        while providers:
+            low = providers & -providers
+            pos = low.bit_length() - 1
+            masks[pos] = masks.get(pos, 0) | (1 << bit)
+            providers ^= low
+    return masks
+
+
+def conflict_masks(index, conflicting):
+    """Return {agent position: bitset of agent positions it conflicts with}."""
+    conflicts = {}
+    for pair in conflicting:
+        positions = [index.positions[a] for a in pair if a in index.positions]
+        for pos in positions:
+            for other in positions:
+                if other != pos:
+                    conflicts[pos] = conflicts.get(pos, 0) | (1 << other)
+    return conflicts
+
+
+def solve_greedy(masks, conflicts, target):
+    """Greedy set cover. Returns (chosen positions, uncovered bitset)."""
+    uncovered = target
+    chosen = []
+    blocked = 0
+    candidates = dict(masks)
+    while uncovered:
+        best, best_gain = None, 0
+        for pos, mask in candidates.items():
+            if blocked >> pos & 1:
+                continue
+            gain = (mask & uncovered).bit_count()
+            if gain > best_gain or (gain == best_gain and gain and pos < best):
+                best, best_gain = pos, gain
+        if best is None:
+            break
+        chosen.append(best)
+        uncovered &= ~candidates.pop(best)
+        blocked |= conflicts.get(best, 0)
+    return chosen, uncovered
+
+
+def solve_exact(masks, conflicts, target, max_nodes=DEFAULT_MAX_NODES):
+    """Branch-and-bound minimum cover.
+
+    Returns (chosen positions, uncovered bitset, proven optimal).
+    """
+    greedy, greedy_left = solve_greedy(masks, conflicts, target)
+    coverable = 0
+    for mask in masks.values():
+        coverable |= mask
+    target &= coverable
+    if greedy_left & target:
+        # Conflicts made greedy miss something coverable; search without a bound.
+        best = [None]
+    else:
+        best = [list(greedy)]
+
+    # Candidates covering each capability bit, largest cover first. Agents with
+    # an identical mask and no conflicts are interchangeable; keep the first.
+    seen = set()
+    providers = {}
+    for pos in sorted(masks, key=lambda p: (-masks[p].bit_count(), p)):
+        mask = masks[pos]
+        if pos not in conflicts:
+            if mask in seen:
+                continue
+            seen.add(mask)
+        m = mask
+        while m:
+            low = m & -m
+            providers.setdefault(low, []).append(pos)
+            m ^= low
+    max_cover = max((m.bit_count() for m in masks.values()), default=1)
+
+    nodes = [0]
+    exhausted = [False]
+
+    def search(uncovered, chosen, blocked):
+        if nodes[0] >= max_nodes:
+            exhausted[0] = True
+            return
+        nodes[0] += 1
+        if not uncovered:
+            if best[0] is None or len(chosen) < len(best[0]):
+                best[0] = list(chosen)
+            return
+        lower_bound = len(chosen) + -(-uncovered.bit_count() // max_cover)
+        if best[0] is not None and lower_bound >= len(best[0]):
+            return
+        low = uncovered & -uncovered
+        for pos in providers.get(low, ()):
+            if blocked >> pos & 1:
+                continue
+            chosen.append(pos)
+            search(uncovered & ~masks[pos], chosen, blocked | conflicts.get(pos, 0))
+            chosen.pop()
+
+    search(target, [], 0)
+    if best[0] is None:
+        return greedy, greedy_left, False
+    return best[0], 0, not exhausted[0]
+
+
+def compose(required, exact=False, index=None, conflicting=None, max_nodes=DEFAULT_MAX_NODES):
+    """Compose a swarm covering the required capabilities.
+
+    Returns a dict with the chosen agents, each agent's contribution, any
+    uncovered capabilities and whether the answer is proven minimal.
+    """
+    if index is None:
+        index = load_index()
+    if conflicting is None:
+        conflicting = load_model(sections=("swarms",)).conflicting
+
+    required = list(dict.fromkeys(required))
+    target = (1 << len(required)) - 1
+    masks = cover_masks(index, required)
+    conflicts = conflict_masks(index, conflicting)
+
+    if exact:
+        chosen, _, optimal = solve_exact(masks, conflicts, target, max_nodes)
+    else:
+        chosen, _ = solve_greedy(masks, conflicts, target)
+        optimal = None
+
+    covered_by = {}
+    for pos in chosen:
+        caps = [cap for bit, cap in enumerate(required) if masks[pos] >> bit & 1]
+        covered_by[index.agent_ids[pos]] = caps
+    covered = 0
+    for pos in chosen:
+        covered |= masks[pos]
+    uncovered_caps = [cap for bit, cap in enumerate(required) if not covered >> bit & 1]
+    return {
+        "agents": list(covered_by),
+        "covers": covered_by,
+        "uncovered": uncovered_caps,
+        "optimal": optimal,
+    }
+
+
+def bench(n_agents, n_caps, seed=0):
+    """Time greedy and exact composition against a synthetic registry."""
+    index = CapabilityIndex.build(synthetic_capabilities(n_agents, n_values=max(n_caps * 2, 500)))
+    rng = random.Random(seed)
+    vocab = sorted(index.postings["can_do"])
+    required = rng.sample(vocab, min(n_caps, len(vocab)))
+    agents = index.agent_ids
+    conflicting = [rng.sample(agents, 2) for _ in range(n_agents // 10)]
+
+    for exact in (False, True):
+        t0 = time.perf_counter()
+        result = compose(required, exact=exact, index=index, conflicting=conflicting, max_nodes=50_000)
+        elapsed = time.perf_counter() - t0
+        mode = "exact " if exact else "greedy"
+        proof = "" if not exact else (" (optimal)" if result["optimal"] else " (node limit hit)")
+        print(f"📊 {mode} {n_agents} agents × {len(required)} capabilities: "
+              f"{len(result['agents'])} agents, {len(result['uncovered'])} uncovered "
+              f"in {elapsed * 1000:.1f} ms{proof}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compose a minimal swarm covering capabilities")
+    parser.add_argument("capabilities", nargs="*", help="Required can_do capabilities")
+    parser.add_argument("--use-case", action="append", default=[], help="Use case from swarms.yaml")
+    parser.add_argument("--exact", action="store_true", help="Branch-and-bound for a proven minimum")
+    parser.add_argument("--max-nodes", type=int, default=DEFAULT_MAX_NODES, help="Search node limit for --exact")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    parser.add_argument("--bench", type=int, metavar="N", help="Benchmark against N synthetic agents")
+    parser.add_argument("--caps", type=int, default=200, help="Required capabilities for --bench")
+
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.bench, args.caps)
+        return 0
+
+    required = list(args.capabilities)
+    try:
+        model = load_model(sections=("capabilities", "swarms"))
+        for use_case in args.use_case:
+            required.extend(use_case_capabilities(model, use_case))
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    if not required:
+        parser.error("give at least one capability or --use-case")
+
+    try:
+        result = compose(required, exact=args.exact, max_nodes=args.max_nodes)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 1 if result["uncovered"] else 0
+
+    for agent_id, caps in result["covers"].items():
+        print(f"  🤖 {agent_id}: {', '.join(caps)}")
+    if result["uncovered"]:
+        print(f"\n❌ Uncovered: {', '.join(result['uncovered'])}")
+        return 1
+    proof = {True: " (proven minimal)", False: " (search limit reached)", None: ""}[result["optimal"]]
+    print(f"\n✅ {len(result['agents'])} agents cover {len(dict.fromkeys(required))} capabilities{proof}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
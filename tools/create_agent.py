@@ -10,26 +10,19 @@ Example:
 """
 
 import argparse
-import yaml
 from pathlib import Path
 from datetime import datetime
 
-PROJECT_ROOT = Path(__file__).parent.parent
+import yaml
 
+from models import load_model
 
-def load_lineage():
-    """Load the lineage.yaml file."""
-    with open(PROJECT_ROOT / "data" / "lineage.yaml") as f:
-        return yaml.safe_load(f)
+PROJECT_ROOT = Path(__file__).parent.parent
 
 
 def find_template(template_id):
     """Find template path by ID."""
-    lineage = load_lineage()
-    for template in lineage["templates"]:
-        if template["id"] == template_id:
-            return PROJECT_ROOT / template["path"]
-    raise ValueError(f"Template '{template_id}' not found")
+    return load_model(sections=("lineage",)).template_path(template_id)
 
 
 def create_agent(template_id, agent_name, domain=None):
@@ -67,8 +60,13 @@ def main():
     parser.add_argument("--domain", help="Domain specialization")
     
     args = parser.parse_args()
-    create_agent(args.template_id, args.agent_name, args.domain)
+    try:
+        create_agent(args.template_id, args.agent_name, args.domain)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Find near-duplicate paragraphs across agents, templates and knowledge docs.
+
+Every markdown file is split into blocks at blank lines (fenced code stays
+one block). Each block becomes a set of word shingles, and blocks whose
+normalised text is identical are grouped before anything else, so a
+paragraph copied into a thousand agents is sketched once. The remaining
+unique blocks get a MinHash signature and are bucketed with LSH banding:
+only blocks sharing a band bucket are compared, and each bucket is merged
+against its first member, so the work grows linearly with the number of
+blocks instead of with the number of pairs.
+
+Clusters are ranked by bytes duplicated: their total size minus the largest
+copy, i.e. what would be saved by keeping one copy (ideally in knowledge/)
+and including it everywhere else.
+
+Signatures use one-permutation hashing: each shingle is hashed once into
+one of SIGNATURE_SIZE bins, and empty bins are filled from their neighbour
+(rotation densification). That keeps sketching a pure-Python loop over the
+shingles rather than one loop per hash function.
+
+Usage:
+    python tools/dedup_report.py [PATH ...] [--threshold 0.8] [--top 20] [--locations]
+    python tools/dedup_report.py --format json
+"""
+
+import argparse
+import json
+import operator
+import re
+import sys
+import time
+from pathlib import Path
+
+import profiling
+from registry import PROJECT_ROOT
+
+DEFAULT_PATHS = ("agents", "templates", "knowledge")
+
+SHINGLE_WORDS = 5
+SIGNATURE_SIZE = 64
+BANDS = 16
+ROWS = SIGNATURE_SIZE // BANDS
+
+WORD_RE = re.compile(r"\w+")
+FENCE_RE = re.compile(r" {0,3}(`{3,}|~{3,})")
+
+_MASK = (1 << 64) - 1
+_BIN_BITS = SIGNATURE_SIZE.bit_length() - 1
+_EMPTY = 1 << 64
+# Densified bins are offset past any real value so they never collide with one.
+_OFFSET = 1 << (64 - _BIN_BITS)
+
+
+def split_blocks(text):
+    """Yield (first line, text) for each blank-line separated block of a document."""
+    block, start, fence = [], 0, None
+    for number, line in enumerate(text.splitlines(), 1):
+        match = FENCE_RE.match(line)
+        if match:
+            marker = match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+        if not line.strip() and fence is None:
+            if block:
+                yield start, "\n".join(block)
+                block = []
+            continue
+        if not block:
+            start = number
+        block.append(line)
+    if block:
+        yield start, "\n".join(block)
+
+
+def shingles(token_ids, k=SHINGLE_WORDS):
+    """Return the set of 64-bit hashes of a block's k-word shingles."""
+    if len(token_ids) <= k:
+        return {hash(tuple(token_ids)) & _MASK}
+    # Tuples of ints hash the same in every process, unlike str.
+    return {hash(s) & _MASK for s in zip(*(token_ids[i:] for i in range(k)))}
+
+
+def signature(hashes):
+    """Return the densified one-permutation MinHash signature of a shingle set."""
+    mins = [_EMPTY] * SIGNATURE_SIZE
+    low = SIGNATURE_SIZE - 1
+    for h in hashes:
+        b = h & low
+        v = h >> _BIN_BITS
+        if v < mins[b]:
+            mins[b] = v
+    if _EMPTY not in mins:
+        return tuple(mins)
+    # Fill each empty bin from the next non-empty one, wrapping around.
+    sig = [0] * SIGNATURE_SIZE
+    carry, distance = None, 0
+    for i in range(2 * SIGNATURE_SIZE - 1, -1, -1):
+        v = mins[i % SIGNATURE_SIZE]
+        if v != _EMPTY:
+            carry, distance = v, 0
+        else:
+            distance += 1
+        if i < SIGNATURE_SIZE:
+            sig[i] = carry + distance * _OFFSET
+    return tuple(sig)
+
+
+def estimate_similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(map(operator.eq, a, b)) / SIGNATURE_SIZE
+
+
+def find_markdown(paths, root):
+    """Return sorted markdown files under paths, relative to root where possible."""
+    files = set()
+    for name in paths:
+        path = Path(name) if Path(name).is_absolute() else root / name
+        if path.is_file():
+            files.add(path)
+        elif path.is_dir():
+            files.update(path.rglob("*.md"))
+        else:
+            print(f"Skipping non-existent path: {name}", file=sys.stderr)
+    return sorted(files)
+
+
+def _display(path, root):
+    try:
+        return str(path.relative_to(root))
+    except ValueError:
+        return str(path)
+
+
+class _UnionFind:
+    __slots__ = ("parent",)
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def dedup_report(paths=DEFAULT_PATHS, threshold=0.8, min_chars=80, root=None):
+    """Return (clusters, stats); clusters are dicts ranked by bytes duplicated."""
+    root = Path(root or PROJECT_ROOT)
+    # raw block text and normalised words -> index into unique
+    seen, index = {}, {}
+    unique = []        # (normalised words, text, [(file, line, bytes)])
+    stats = {"files": 0, "bytes": 0, "blocks": 0}
+
+    with profiling.span("scan"):
+        for path in find_markdown(paths, root):
+            try:
+                text = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"error reading {path}: {e}", file=sys.stderr)
+                continue
+            stats["files"] += 1
+            stats["bytes"] += len(text.encode("utf-8"))
+            name = _display(path, root)
+            for line, block in split_blocks(text):
+                if len(block) < min_chars:
+                    continue
+                i = seen.get(block)
+                if i is None:
+                    words = " ".join(WORD_RE.findall(block.lower()))
+                    if not words:
+                        continue
+                    i = index.get(words)
+                    if i is None:
+                        i = index[words] = len(unique)
+                        unique.append((words, block, []))
+                    seen[block] = i
+                stats["blocks"] += 1
+                unique[i][2].append((name, line, len(block.encode("utf-8"))))
+    stats["unique_blocks"] = len(unique)
+
+    with profiling.span("sketch", blocks=len(unique)):
+        vocabulary = {}
+        signatures = []
+        for words, _, _ in unique:
+            ids = [vocabulary.setdefault(w, len(vocabulary)) for w in words.split(" ")]
+            signatures.append(signature(shingles(ids)))
+
+    groups = _UnionFind(len(unique))
+    with profiling.span("lsh", bands=BANDS, rows=ROWS):
+        for band in range(BANDS):
+            lo, hi = band * ROWS, (band + 1) * ROWS
+            buckets = {}
+            for i, sig in enumerate(signatures):
+                first = buckets.setdefault(sig[lo:hi], i)
+                if first != i and estimate_similarity(signatures[first], sig) >= threshold:
+                    groups.union(first, i)
+
+    members = {}
+    for i in range(len(unique)):
+        members.setdefault(groups.find(i), []).append(i)
+
+    clusters = []
+    with profiling.span("rank"):
+        for head, ids in members.items():
+            copies = [c for i in ids for c in unique[i][2]]
+            if len(copies) < 2:
+                continue
+            total = sum(c[2] for c in copies)
+            largest = max(((unique[i][1], c[2]) for i in ids for c in unique[i][2]), key=lambda t: t[1])
+            knowledge = sorted({c[0] for c in copies if c[0].startswith("knowledge/")})
+            clusters.append({
+                "bytes_duplicated": total - largest[1],
+                "copies": len(copies),
+                "files": len({c[0] for c in copies}),
+                "variants": len(ids),
+                "similarity": round(min(estimate_similarity(signatures[head], signatures[i]) for i in ids), 3),
+                "knowledge": knowledge,
+                "text": largest[0],
+                "locations": [{"file": f, "line": line, "bytes": size} for f, line, size in copies],
+            })
+    clusters.sort(key=lambda c: (-c["bytes_duplicated"], c["locations"][0]["file"], c["locations"][0]["line"]))
+    stats["clusters"] = len(clusters)
+    stats["bytes_duplicated"] = sum(c["bytes_duplicated"] for c in clusters)
+    return clusters, stats
+
+
+def print_report(clusters, stats, top, threshold, locations=False):
+    """Print the top clusters and the totals."""
+    print(f"🔁 Near-duplicate blocks (similarity ≥ {threshold}), ranked by bytes duplicated\n")
+    for rank, c in enumerate(clusters[:top], 1):
+        first = c["locations"][0]
+        snippet = " ".join(c["text"].split())
+        snippet = snippet if len(snippet) <= 72 else snippet[:71] + "…"
+        print(f"{rank:>3}. {c['bytes_duplicated']:>9,} bytes  {c['copies']:>5} copies in {c['files']} files  "
+              f"({c['variants']} variant(s), ≥{c['similarity']:.2f})")
+        print(f"     {first['file']}:{first['line']}  \"{snippet}\"")
+        if c["knowledge"]:
+            print(f"     ↳ already in {', '.join(c['knowledge'])}: include it instead")
+        if locations:
+            for loc in c["locations"][1:]:
+                print(f"       {loc['file']}:{loc['line']}")
+    share = stats["bytes_duplicated"] / stats["bytes"] * 100 if stats["bytes"] else 0.0
+    print(f"\n📊 {stats['files']} files, {stats['bytes'] / 1e6:.1f} MB, {stats['blocks']} blocks "
+          f"({stats['unique_blocks']} distinct); {stats['bytes_duplicated']:,} bytes ({share:.1f}%) duplicated "
+          f"in {stats['clusters']} clusters")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report near-duplicate paragraphs in markdown files")
+    parser.add_argument("paths", nargs="*", default=list(DEFAULT_PATHS),
+                        help=f"Files or directories (default: {' '.join(DEFAULT_PATHS)})")
+    parser.add_argument("--threshold", type=float, default=0.8,
+                        help="Minimum estimated Jaccard similarity of shingles (default: 0.8)")
+    parser.add_argument("--min-chars", type=int, default=80, help="Ignore blocks shorter than this (default: 80)")
+    parser.add_argument("--top", type=int, default=20, help="Clusters to show (default: 20)")
+    parser.add_argument("--locations", action="store_true", help="List every copy of each cluster")
+    parser.add_argument("--format", choices=("text", "json"), default="text", help="Output format")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.configure(args)
+
+    started = time.perf_counter()
+    clusters, stats = dedup_report(args.paths, args.threshold, args.min_chars)
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+
+    if args.format == "json":
+        print(json.dumps({"stats": stats, "clusters": clusters[:args.top]}, indent=2))
+    else:
+        print_report(clusters, stats, args.top, args.threshold, args.locations)
+        print(f"⏱️  {stats['seconds']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
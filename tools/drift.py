@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Section-level drift between each agent and its parent template.
+
+Only lineage.yaml and the markdown are read. Each template is read once and
+shared by all of its children: worker processes receive the template texts
+when they start, and each renders the domain placeholders (as
+regenerate_agent.py does) and splits the result into sections once per
+(template, domain). Sections are matched by their path of normalised titles
+below the H1 (see outline.normalize_title), so "### 1. System of Thought
+(Cognitive v2)" in the template matches "### 1. System of Thought
+(Think-Act-Reflect)" in the agent.
+
+For every agent the report lists added, removed and modified sections and a
+similarity score: the size-weighted mean of per-section similarity, where an
+unchanged section scores 1, a modified one its line-level difflib ratio and
+an added or removed one 0. A freshly regenerated agent scores 1.0.
+
+Usage:
+    python tools/drift.py [AGENT ...] [--sections] [--format text|json]
+    python tools/drift.py --min-similarity 0.8    # exit 1 if any agent drifted further
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import yaml
+
+import profiling
+from models import build_model
+from outline import parse_headings
+from registry import PROJECT_ROOT, load_yaml
+from regenerate_agent import render_agent
+
+PREAMBLE = "(preamble)"
+TITLE = "(title)"
+
+# Set in each worker by _init_worker(): template id -> template text.
+_templates = {}
+# (template id, domain) -> rendered sections, per process.
+_rendered = {}
+
+
+def split_sections(text):
+    """Return {path: (title, first line, text)} for the sections of a document.
+
+    A section's text runs from its heading to its first subsection. The path
+    is the tuple of normalised titles below the H1; the H1 itself is TITLE and
+    text before the first heading is PREAMBLE.
+    """
+    lines = text.splitlines()
+    headings = parse_headings(text)
+    sections = {}
+    first = headings[0][3] if headings else len(lines) + 1
+    preamble = "\n".join(lines[:first - 1]).strip()
+    if preamble:
+        sections[(PREAMBLE,)] = (PREAMBLE, 1, preamble)
+
+    stack = []
+    for i, (level, title, key, line, _, _) in enumerate(headings):
+        own_end = headings[i + 1][3] - 1 if i + 1 < len(headings) else len(lines)
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        if level == 1:
+            path = (TITLE,)
+        else:
+            stack.append((level, key))
+            path = tuple(k for lv, k in stack if lv > 1)
+        n = 2
+        unique = path
+        while unique in sections:
+            unique = path[:-1] + (f"{path[-1]} #{n}",)
+            n += 1
+        sections[unique] = (title or TITLE, line, "\n".join(lines[line - 1:own_end]).strip())
+    return sections
+
+
+def _rendered_template(template_id, domain):
+    """Return a template's text with the domain placeholders filled in."""
+    text = _templates[template_id]
+    return render_agent(text, domain) if domain else text
+
+
+def _template_sections(template_id, domain):
+    """Return the sections of a template rendered for one domain."""
+    key = (template_id, domain)
+    sections = _rendered.get(key)
+    if sections is not None:
+        return sections
+    base = _rendered.get((template_id, None))
+    if base is None:
+        base = _rendered[(template_id, None)] = split_sections(_templates[template_id])
+    if not domain:
+        sections = base
+    elif any("{{" in title for title, _, _ in base.values()):
+        # A placeholder in a heading changes the section paths.
+        sections = split_sections(_rendered_template(template_id, domain))
+    else:
+        sections = {path: (title, line, render_agent(body, domain))
+                    for path, (title, line, body) in base.items()}
+    _rendered[key] = sections
+    return sections
+
+
+def _similarity(a, b):
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a.splitlines(), b.splitlines()).ratio()
+
+
+def compare(template_sections, agent_sections):
+    """Return (similarity, added, removed, modified) for two split documents.
+
+    added/removed/modified are lists of (path, title, line, similarity); lines
+    refer to the agent for added and modified sections, the template otherwise.
+    """
+    added, removed, modified = [], [], []
+    score = weight = 0.0
+    for path, (title, line, text) in template_sections.items():
+        other = agent_sections.get(path)
+        if other is None:
+            removed.append((path, title, line, 0.0))
+            weight += len(text) or 1
+            continue
+        size = max(len(text), len(other[2])) or 1
+        ratio = _similarity(text, other[2])
+        if ratio < 1.0:
+            modified.append((path, other[0], other[1], round(ratio, 3)))
+        score += ratio * size
+        weight += size
+    for path, (title, line, text) in agent_sections.items():
+        if path not in template_sections:
+            added.append((path, title, line, 0.0))
+            weight += len(text) or 1
+    return (score / weight if weight else 1.0), added, removed, modified
+
+
+def _init_worker(templates):
+    _templates.update(templates)
+
+
+def drift_agent(job):
+    """Compare one agent with its parent; job is (agent id, path, template id, domain)."""
+    agent_id, path, template_id, domain = job
+    try:
+        with profiling.span("compare", agent=agent_id):
+            text = Path(path).read_text(encoding="utf-8")
+            if text == _rendered_template(template_id, domain):
+                similarity, added, removed, modified = 1.0, [], [], []
+            else:
+                similarity, added, removed, modified = compare(
+                    _template_sections(template_id, domain), split_sections(text))
+    except (OSError, UnicodeDecodeError) as e:
+        return {"agent": agent_id, "template": template_id, "error": str(e)}
+    return {
+        "agent": agent_id,
+        "template": template_id,
+        "similarity": round(similarity, 4),
+        "added": [_section(s) for s in added],
+        "removed": [_section(s) for s in removed],
+        "modified": [_section(s) for s in modified],
+    }
+
+
+def _section(entry):
+    path, title, line, similarity = entry
+    return {"section": " › ".join(path), "title": title, "line": line, "similarity": similarity}
+
+
+def drift_report(agent_ids=None, jobs=0, root=None):
+    """Return one drift record per agent, least similar first."""
+    root = Path(root or PROJECT_ROOT)
+    # Versions, capabilities and swarms are not needed; leave them unparsed.
+    model = build_model({"lineage": load_yaml("lineage.yaml", root)}, root)
+    agents = [model.agent(a) for a in agent_ids] if agent_ids else list(model.agents.values())
+
+    records, jobs_list, templates = [], [], {}
+    with profiling.span("load", what="templates"):
+        for agent in agents:
+            template_id = agent.parent_template
+            if template_id not in templates:
+                try:
+                    templates[template_id] = model.template_path(template_id).read_text(encoding="utf-8")
+                except (ValueError, OSError, UnicodeDecodeError) as e:
+                    templates[template_id] = e
+            if isinstance(templates[template_id], Exception):
+                records.append({"agent": agent.id, "template": template_id,
+                                "error": f"parent template unavailable: {templates[template_id]}"})
+                continue
+            jobs_list.append((agent.id, str(root / agent.path), template_id, agent.domain))
+    templates = {t: text for t, text in templates.items() if isinstance(text, str)}
+
+    jobs = min(jobs or os.cpu_count() or 1, max(1, len(jobs_list)))
+    if jobs == 1:
+        _init_worker(templates)
+        records.extend(map(drift_agent, jobs_list))
+    else:
+        chunksize = max(1, min(256, len(jobs_list) // (jobs * 4)))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(templates,)) as pool:
+            records.extend(pool.map(drift_agent, jobs_list, chunksize=chunksize))
+    records.sort(key=lambda r: (r.get("similarity", -1.0), r["agent"]))
+    return records
+
+
+def print_report(records, sections=False):
+    """Print a human-readable drift table."""
+    width = max((len(r["agent"]) for r in records), default=5)
+    twidth = max((len(r["template"]) for r in records), default=8)
+    print(f"{'AGENT':<{width}}  {'TEMPLATE':<{twidth}}  {'SIMILARITY':>10}  {'+ADD':>4} {'-DEL':>4} {'~MOD':>4}")
+    for r in records:
+        if "error" in r:
+            print(f"{r['agent']:<{width}}  {r['template']:<{twidth}}  {'':>10}  ❌ {r['error']}")
+            continue
+        print(f"{r['agent']:<{width}}  {r['template']:<{twidth}}  {r['similarity']:>10.3f}  "
+              f"{len(r['added']):>4} {len(r['removed']):>4} {len(r['modified']):>4}")
+        if sections:
+            for sign, key in (("+", "added"), ("-", "removed"), ("~", "modified")):
+                for s in r[key]:
+                    ratio = f" ({s['similarity']:.2f})" if key == "modified" else ""
+                    print(f"    {sign} {s['section']}  line {s['line']}{ratio}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report how far agents have drifted from their parent templates")
+    parser.add_argument("agents", nargs="*", help="Agent ids (default: all)")
+    parser.add_argument("--sections", action="store_true", help="List the changed sections of each agent")
+    parser.add_argument("--format", choices=("text", "json"), default="text", help="Output format")
+    parser.add_argument("--min-similarity", type=float, metavar="X",
+                        help="Exit 1 if any agent scores below X (0-1)")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker processes (default: CPU count)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.configure(args)
+
+    started = time.perf_counter()
+    try:
+        records = drift_report(args.agents or None, args.jobs)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - started
+
+    errors = [r for r in records if "error" in r]
+    below = [r for r in records if args.min_similarity is not None
+             and r.get("similarity", 1.0) < args.min_similarity]
+    if args.format == "json":
+        print(json.dumps({"ok": not errors and not below, "agents": records}, indent=2))
+    else:
+        print_report(records, args.sections)
+        scored = [r["similarity"] for r in records if "error" not in r]
+        mean = sum(scored) / len(scored) if scored else 1.0
+        print(f"\n⏱️  {len(records)} agents in {elapsed:.2f}s, mean similarity {mean:.3f}")
+        if below:
+            print(f"❌ {len(below)} agent(s) below similarity {args.min_similarity}")
+    return 1 if errors or below else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Export the registry to a SQLite database for runtime queries.
+
+lineage, capabilities, versions and swarms are materialized into normalized,
+indexed tables, and the markdown under agents/, templates/ and knowledge/ is
+indexed in an FTS5 table (documents_fts) for full-text search. Read it with
+registry_db.RegistryDB.
+
+Re-runs are incremental. Each table group records the content hash of the
+data file(s) it came from and is only rewritten when that changes; markdown
+files are skipped by (mtime, size) and then by content hash, so only edited
+documents are re-indexed. Everything happens in one transaction, so readers
+see either the old or the new export.
+
+Usage:
+    python tools/export_sqlite.py [--output PATH] [--force]
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import yaml
+
+import profiling
+from registry import (PROJECT_ROOT, content_hash, file_digest, is_sharded, load_history, load_yaml,
+                      shard_filename)
+from registry_db import CAPABILITY_FIELDS, DEFAULT_DB, SCHEMA_VERSION
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+
+CREATE TABLE templates (
+    id TEXT PRIMARY KEY, path TEXT NOT NULL, description TEXT NOT NULL, category TEXT NOT NULL
+);
+CREATE TABLE agents (
+    id TEXT PRIMARY KEY, path TEXT NOT NULL, parent_template TEXT NOT NULL,
+    derivation_type TEXT NOT NULL, domain TEXT, metadata TEXT NOT NULL
+);
+CREATE INDEX agents_parent ON agents (parent_template);
+
+CREATE TABLE capabilities (
+    agent_id TEXT NOT NULL, field TEXT NOT NULL, position INTEGER NOT NULL, value TEXT NOT NULL,
+    PRIMARY KEY (agent_id, field, position)
+) WITHOUT ROWID;
+CREATE INDEX capabilities_value ON capabilities (field, value, agent_id);
+
+CREATE TABLE current_versions (agent_id TEXT PRIMARY KEY, current_version TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE versions (
+    agent_id TEXT NOT NULL, seq INTEGER NOT NULL, version TEXT NOT NULL, date TEXT NOT NULL,
+    changes TEXT NOT NULL, template_version TEXT NOT NULL,
+    PRIMARY KEY (agent_id, seq)
+) WITHOUT ROWID;
+
+CREATE TABLE swarms (name TEXT PRIMARY KEY, description TEXT NOT NULL, orchestrator TEXT NOT NULL);
+CREATE TABLE swarm_agents (
+    swarm TEXT NOT NULL, position INTEGER NOT NULL, agent_id TEXT NOT NULL,
+    PRIMARY KEY (swarm, position)
+) WITHOUT ROWID;
+CREATE INDEX swarm_agents_agent ON swarm_agents (agent_id);
+CREATE TABLE swarm_use_cases (
+    swarm TEXT NOT NULL, position INTEGER NOT NULL, use_case TEXT NOT NULL,
+    PRIMARY KEY (swarm, position)
+) WITHOUT ROWID;
+CREATE TABLE compatibility (relation TEXT NOT NULL, agent_a TEXT NOT NULL, agent_b TEXT NOT NULL);
+CREATE INDEX compatibility_a ON compatibility (agent_a);
+CREATE INDEX compatibility_b ON compatibility (agent_b);
+
+CREATE TABLE documents (
+    id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, kind TEXT NOT NULL, entity_id TEXT,
+    title TEXT NOT NULL, hash TEXT NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL
+);
+CREATE INDEX documents_entity ON documents (kind, entity_id);
+CREATE VIRTUAL TABLE documents_fts USING fts5(title, body, tokenize = 'porter unicode61', prefix = '2 3');
+"""
+
+# Which tables each data source fills.
+GROUPS = {
+    "lineage": ("templates", "agents"),
+    "capabilities": ("capabilities",),
+    "versions": ("current_versions", "versions"),
+    "swarms": ("swarms", "swarm_agents", "swarm_use_cases", "compatibility"),
+}
+DOCUMENT_GLOBS = (("agent", "agents", "*.md"), ("template", "templates", "**/*.md"),
+                  ("knowledge", "knowledge", "**/*.md"))
+
+
+def _dict(value):
+    return value if isinstance(value, dict) else {}
+
+
+def _list(value):
+    return value if isinstance(value, list) else []
+
+
+def source_hash(group, root):
+    """Content hash of the data a table group is built from (file hashes, not parsed data)."""
+    if group != "versions":
+        return file_digest(f"{group}.yaml", root)
+    head = file_digest("versions.yaml", root)
+    versions = load_yaml("versions.yaml", root)
+    if not is_sharded(versions):
+        return head
+    shards = [(str(agent_id), file_digest(shard_filename(agent_id), root))
+              for agent_id in _dict(versions.get("agents"))]
+    return content_hash(json.dumps([head, shards]))
+
+
+def _fill_lineage(conn, root):
+    lineage = _dict(load_yaml("lineage.yaml", root))
+    conn.executemany("INSERT OR REPLACE INTO templates VALUES (?, ?, ?, ?)", [
+        (str(t["id"]), str(t.get("path", "")), t.get("description") or "", str(t.get("category") or ""))
+        for t in map(_dict, _list(lineage.get("templates"))) if "id" in t
+    ])
+    rows = []
+    for item in map(_dict, _list(lineage.get("agents"))):
+        if "id" not in item:
+            continue
+        link, metadata = _dict(item.get("lineage")), _dict(item.get("metadata"))
+        domain = _dict(item.get("generation_parameters")).get("domain") or metadata.get("domain")
+        rows.append((str(item["id"]), str(item.get("path", "")), str(link.get("parent_template") or ""),
+                     str(link.get("derivation_type") or ""), domain,
+                     json.dumps(metadata, sort_keys=True, default=str)))
+    conn.executemany("INSERT OR REPLACE INTO agents VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+def _fill_capabilities(conn, root):
+    rows = []
+    for agent_id, caps in _dict(_dict(load_yaml("capabilities.yaml", root)).get("agents")).items():
+        for field in CAPABILITY_FIELDS:
+            rows.extend((str(agent_id), field, i, str(value))
+                        for i, value in enumerate(_list(_dict(caps).get(field))))
+    conn.executemany("INSERT OR REPLACE INTO capabilities VALUES (?, ?, ?, ?)", rows)
+
+
+def _fill_versions(conn, root):
+    versions = _dict(load_yaml("versions.yaml", root))
+    heads, rows = [], []
+    for agent_id, history in _dict(versions.get("agents")).items():
+        agent_id = str(agent_id)
+        heads.append((agent_id, str(_dict(history).get("current_version", ""))))
+        for seq, entry in enumerate(map(_dict, load_history(agent_id, root))):
+            rows.append((agent_id, seq, str(entry.get("version", "")), str(entry.get("date", "")),
+                         entry.get("changes") or "", str(entry.get("template_version") or "")))
+    conn.executemany("INSERT OR REPLACE INTO current_versions VALUES (?, ?)", heads)
+    conn.executemany("INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+def _fill_swarms(conn, root):
+    data = _dict(load_yaml("swarms.yaml", root))
+    swarms, members, use_cases = [], [], []
+    for swarm in map(_dict, _list(data.get("swarms"))):
+        if "name" not in swarm:
+            continue
+        name = str(swarm["name"])
+        swarms.append((name, swarm.get("description") or "", str(swarm.get("orchestrator") or "")))
+        members.extend((name, i, str(a)) for i, a in enumerate(_list(swarm.get("agents"))))
+        use_cases.extend((name, i, str(u)) for i, u in enumerate(_list(swarm.get("use_cases"))))
+    conn.executemany("INSERT OR REPLACE INTO swarms VALUES (?, ?, ?)", swarms)
+    conn.executemany("INSERT OR REPLACE INTO swarm_agents VALUES (?, ?, ?)", members)
+    conn.executemany("INSERT OR REPLACE INTO swarm_use_cases VALUES (?, ?, ?)", use_cases)
+    matrix = _dict(data.get("compatibility_matrix"))
+    conn.executemany("INSERT INTO compatibility VALUES (?, ?, ?)", [
+        (relation, str(pair[0]), str(pair[1]))
+        for relation in ("compatible", "conflicting")
+        for pair in _list(matrix.get(relation)) if isinstance(pair, list) and len(pair) == 2
+    ])
+
+
+FILLERS = {
+    "lineage": _fill_lineage,
+    "capabilities": _fill_capabilities,
+    "versions": _fill_versions,
+    "swarms": _fill_swarms,
+}
+
+
+def document_title(text, path):
+    """First top-level heading of a markdown document, else its file name."""
+    for line in text.splitlines():
+        if line.startswith("# "):
+            return line[2:].strip()
+    return path.stem
+
+
+def sync_documents(conn, root):
+    """Bring documents/documents_fts in line with the markdown on disk.
+
+    Returns (added, updated, removed) counts.
+    """
+    entities = {path: ("agent", agent_id) for agent_id, path in conn.execute("SELECT id, path FROM agents")}
+    entities.update({path: ("template", template_id)
+                     for template_id, path in conn.execute("SELECT id, path FROM templates")})
+    existing = {row[1]: row for row in conn.execute(
+        "SELECT id, path, entity_id, hash, mtime_ns, size FROM documents")}
+
+    added = updated = 0
+    seen = set()
+    for kind, directory, pattern in DOCUMENT_GLOBS:
+        for path in sorted((root / directory).glob(pattern)):
+            if not path.is_file():
+                continue
+            rel = path.relative_to(root).as_posix()
+            if rel in seen:
+                continue
+            seen.add(rel)
+            st = path.stat()
+            entity_id = entities.get(rel, (None, None))[1]
+            row = existing.get(rel)
+            if row and (row[4], row[5]) == (st.st_mtime_ns, st.st_size) and row[2] == entity_id:
+                continue
+            data = path.read_bytes()
+            digest = content_hash(data)
+            if row and row[3] == digest:
+                conn.execute("UPDATE documents SET entity_id = ?, mtime_ns = ?, size = ? WHERE id = ?",
+                             (entity_id, st.st_mtime_ns, st.st_size, row[0]))
+                continue
+            text = data.decode("utf-8", errors="replace")
+            title = document_title(text, path)
+            if row:
+                doc_id = row[0]
+                conn.execute("UPDATE documents SET kind = ?, entity_id = ?, title = ?, hash = ?, "
+                             "mtime_ns = ?, size = ? WHERE id = ?",
+                             (kind, entity_id, title, digest, st.st_mtime_ns, st.st_size, doc_id))
+                conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+                updated += 1
+            else:
+                doc_id = conn.execute(
+                    "INSERT INTO documents (path, kind, entity_id, title, hash, mtime_ns, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (rel, kind, entity_id, title, digest, st.st_mtime_ns, st.st_size)).lastrowid
+                added += 1
+            conn.execute("INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)",
+                         (doc_id, title, text))
+
+    removed = [row[0] for rel, row in existing.items() if rel not in seen]
+    conn.executemany("DELETE FROM documents WHERE id = ?", [(i,) for i in removed])
+    conn.executemany("DELETE FROM documents_fts WHERE rowid = ?", [(i,) for i in removed])
+    if added or updated or removed:
+        conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('optimize')")
+    return added, updated, len(removed)
+
+
+def _connect(output, force):
+    """Open the export, recreating it if forced or written with another schema."""
+    if output.exists() and not force:
+        conn = sqlite3.connect(output)
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return conn
+        except sqlite3.DatabaseError:
+            pass
+        conn.close()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.unlink(missing_ok=True)
+    conn = sqlite3.connect(output)
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    return conn
+
+
+def export(output=None, root=None, force=False):
+    """Create or update the SQLite export.
+
+    Returns {"groups": [table groups rewritten], "documents": (added, updated, removed)}.
+    """
+    root = Path(root or PROJECT_ROOT)
+    output = Path(output or DEFAULT_DB)
+    conn = _connect(output, force)
+    try:
+        stored = dict(conn.execute("SELECT key, value FROM meta"))
+        rebuilt = []
+        with conn:
+            for group, tables in GROUPS.items():
+                digest = source_hash(group, root)
+                if stored.get(f"source:{group}") == digest:
+                    continue
+                with profiling.span("write", group=group):
+                    for table in tables:
+                        conn.execute(f"DELETE FROM {table}")
+                    FILLERS[group](conn, root)
+                conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"source:{group}", digest))
+                rebuilt.append(group)
+            with profiling.span("write", group="documents"):
+                documents = sync_documents(conn, root)
+    finally:
+        conn.close()
+    return {"groups": rebuilt, "documents": documents}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the registry to SQLite with full-text search")
+    parser.add_argument("--output", help=f"Database path (default: {DEFAULT_DB})")
+    parser.add_argument("--force", action="store_true", help="Rebuild the database from scratch")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.configure(args)
+
+    started = time.perf_counter()
+    try:
+        result = export(args.output, force=args.force)
+    except (OSError, ValueError, sqlite3.Error, yaml.YAMLError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    added, updated, removed = result["documents"]
+    groups = ", ".join(result["groups"]) or "none"
+    print(f"✅ Exported to {args.output or DEFAULT_DB} in {time.perf_counter() - started:.2f}s")
+    print(f"   tables rewritten: {groups}; documents: {added} added, {updated} updated, {removed} removed")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Load-test the registry server (serve.py) and report sustained requests/second.
+
+Client processes each hold a number of keep-alive connections and send
+requests back to back for a fixed duration, cycling through a mix of API,
+markdown and docs URLs. With --spawn the server is started here, pinned to
+one CPU (where the OS allows it), so the result is the throughput of a
+single server core; run the clients on the remaining cores.
+
+Usage:
+    python tools/loadtest.py --spawn [--duration 10] [--clients 2] [--connections 32]
+    python tools/loadtest.py --url http://127.0.0.1:8420 --gzip --conditional
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from serve import DEFAULT_PORT
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_paths(base):
+    """A request mix built from what the server reports."""
+    with urllib.request.urlopen(f"{base}/api/agents") as r:
+        agents = [a["id"] for a in json.load(r)]
+    paths = ["/api/agents", "/api/swarms", "/index.html"]
+    for agent_id in agents[:20]:
+        paths += [f"/api/agents/{agent_id}", f"/agents/{agent_id}.md"]
+    if agents:
+        with urllib.request.urlopen(f"{base}/api/agents/{agents[0]}") as r:
+            caps = (json.load(r).get("capabilities") or {}).get("can_do") or []
+        paths += [f"/api/find?can={cap}" for cap in caps[:5]]
+    return paths
+
+
+def _etags(base, paths, gzip):
+    """Current ETag of each path, for conditional requests."""
+    etags = {}
+    for path in paths:
+        request = urllib.request.Request(base + path, headers={"Accept-Encoding": "gzip"} if gzip else {})
+        try:
+            with urllib.request.urlopen(request) as r:
+                etags[path] = r.headers.get("ETag")
+        except OSError:
+            pass
+    return etags
+
+
+async def _connection(host, port, requests, deadline, stats):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(requests[i % len(requests)])
+            i += 1
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head[9:12])
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line[:15].lower() == b"content-length:":
+                    length = int(line[15:])
+            if length:
+                await reader.readexactly(length)
+            stats["latencies"].append(time.perf_counter() - started)
+            stats["status"][status] = stats["status"].get(status, 0) + 1
+            stats["bytes"] += len(head) + length
+    finally:
+        writer.close()
+
+
+def run_client(host, port, requests, duration, connections):
+    """One client process: returns (request count, status counts, bytes, latency samples)."""
+    stats = {"latencies": [], "status": {}, "bytes": 0}
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(_connection(host, port, requests[i::connections] or requests, deadline, stats)
+                               for i in range(connections)))
+
+    asyncio.run(main())
+    latencies = stats["latencies"]
+    return len(latencies), stats["status"], stats["bytes"], latencies[::max(1, len(latencies) // 10000)]
+
+
+def build_requests(host, paths, gzip, etags):
+    requests = []
+    for path in paths:
+        lines = [f"GET {path} HTTP/1.1", f"Host: {host}"]
+        if gzip:
+            lines.append("Accept-Encoding: gzip")
+        if etags.get(path):
+            lines.append(f"If-None-Match: {etags[path]}")
+        requests.append(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    return requests
+
+
+def spawn_server(port, cpu):
+    """Start serve.py on one CPU and wait until it accepts connections."""
+    server = subprocess.Popen([sys.executable, os.path.join(TOOLS_DIR, "serve.py"), "--port", str(port),
+                               "--no-watch"], stdout=subprocess.DEVNULL)
+    if hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(server.pid, {cpu})
+        except OSError:
+            pass
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the registry server")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}", help="Server base URL")
+    parser.add_argument("--spawn", action="store_true", help="Start serve.py pinned to one CPU")
+    parser.add_argument("--cpu", type=int, default=0, help="CPU to pin the spawned server to")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (default: 10)")
+    parser.add_argument("--clients", type=int, default=2, help="Client processes (default: 2)")
+    parser.add_argument("--connections", type=int, default=32, help="Connections per client (default: 32)")
+    parser.add_argument("--gzip", action="store_true", help="Send Accept-Encoding: gzip")
+    parser.add_argument("--conditional", action="store_true", help="Send If-None-Match (expect 304s)")
+    parser.add_argument("--path", action="append", help="URL path to request (repeatable)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    server = spawn_server(port, args.cpu) if args.spawn else None
+    try:
+        base = f"http://{host}:{port}"
+        paths = args.path or default_paths(base)
+        etags = _etags(base, paths, args.gzip) if args.conditional else {}
+        requests = build_requests(host, paths, args.gzip, etags)
+        # Warm the server's response cache so the run measures steady state.
+        for path in paths:
+            urllib.request.urlopen(base + path).read()
+
+        with ProcessPoolExecutor(args.clients) as pool:
+            futures = [pool.submit(run_client, host, port, requests, args.duration, args.connections)
+                       for _ in range(args.clients)]
+            results = [f.result() for f in futures]
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    total = sum(r[0] for r in results)
+    statuses = {}
+    for r in results:
+        for status, count in r[1].items():
+            statuses[status] = statuses.get(status, 0) + count
+    samples = sorted(s for r in results for s in r[3])
+    report = {
+        "requests": total,
+        "duration": args.duration,
+        "requests_per_second": round(total / args.duration),
+        "megabytes_per_second": round(sum(r[2] for r in results) / args.duration / 1e6, 2),
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "latency_ms": {f"p{p}": round(percentile(samples, p / 100) * 1000, 2) for p in (50, 90, 99)},
+        "paths": len(paths),
+        "connections": args.clients * args.connections,
+        "gzip": args.gzip,
+        "conditional": args.conditional,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"🚀 {report['requests_per_second']} req/s sustained over {args.duration:.0f}s "
+              f"({total} requests, {report['connections']} connections, {len(paths)} URLs)")
+        print(f"   latency p50 {report['latency_ms']['p50']} ms, p90 {report['latency_ms']['p90']} ms, "
+              f"p99 {report['latency_ms']['p99']} ms; {report['megabytes_per_second']} MB/s")
+        print(f"   status: {', '.join(f'{k}: {v}' for k, v in report['status'].items())}")
+    return 0 if set(statuses) <= {200, 304} else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Typed, indexed in-memory model of the registry.
+
+load_model() turns the raw data/*.yaml dictionaries from registry.py into
+slotted objects with id -> object indexes built once, so lookups such as
+"template of agent X" are O(1) dictionary hits instead of list scans.
+Capability, tool and domain strings are interned, so the thousands of
+repeated values in a large registry share a single object each.
+
+The model is read-only and rebuilt only when an underlying file changes.
+With sharded version history, VersionHistory.entries is loaded from the
+agent's shard on first use, so building the model never reads the shards.
+
+Usage:
+    from models import load_model
+
+    model = load_model()
+    agent = model.agent("python-backend")
+    template = model.template(agent.parent_template)
+    children = model.children_of("backend-developer")
+"""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from profiling import span
+from registry import (
+    DATA_FILES, PROJECT_ROOT, file_digest, is_sharded, load_history, load_registry, load_yaml, shard_filename,
+)
+
+_intern = sys.intern
+
+
+def _strings(values):
+    """Return a tuple of interned strings from a YAML list (None-safe)."""
+    if not isinstance(values, (list, tuple)):
+        return ()
+    return tuple(_intern(str(v)) for v in values if v is not None)
+
+
+def _mapping(value):
+    return value if isinstance(value, dict) else {}
+
+
+@dataclass(slots=True, frozen=True)
+class Template:
+    id: str
+    path: str
+    description: str
+    category: str
+
+
+@dataclass(slots=True, frozen=True)
+class Agent:
+    id: str
+    path: str
+    parent_template: str
+    derivation_type: str
+    metadata: dict
+    generation_parameters: dict
+
+    @property
+    def domain(self):
+        """Domain from generation_parameters, falling back to metadata domain."""
+        return self.generation_parameters.get("domain") or self.metadata.get("domain")
+
+
+@dataclass(slots=True, frozen=True)
+class CapabilitySet:
+    agent_id: str
+    can_do: tuple
+    cannot_do: tuple
+    tools_required: tuple
+    domain_expertise: tuple
+
+
+@dataclass(slots=True, frozen=True)
+class VersionEntry:
+    version: str
+    date: str
+    changes: str
+    template_version: str
+
+
+def _version_entries(items):
+    return tuple(
+        VersionEntry(
+            version=str(entry.get("version", "")),
+            date=str(entry.get("date", "")),
+            changes=entry.get("changes") or "",
+            template_version=_intern(str(entry.get("template_version") or "")),
+        )
+        for entry in map(_mapping, items or ())
+    )
+
+
+class LazyEntries:
+    """An agent's VersionEntry tuple, read from its history shard when first used."""
+
+    __slots__ = ("agent_id", "root", "_raw", "_entries")
+
+    def __init__(self, agent_id, root):
+        self.agent_id = agent_id
+        self.root = root
+        self._raw = None
+        self._entries = ()
+
+    def _load(self):
+        raw = load_history(self.agent_id, self.root)
+        if raw is not self._raw:
+            self._raw, self._entries = raw, _version_entries(raw)
+        return self._entries
+
+    def digest(self):
+        """Content hash of the shard, without parsing it."""
+        return file_digest(shard_filename(self.agent_id), self.root)
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __repr__(self):
+        return f"LazyEntries({self.agent_id!r})"
+
+
+@dataclass(slots=True, frozen=True)
+class VersionHistory:
+    agent_id: str
+    current_version: str
+    entries: tuple  # of VersionEntry; LazyEntries when history is sharded
+
+
+@dataclass(slots=True, frozen=True)
+class Swarm:
+    name: str
+    description: str
+    agents: tuple
+    orchestrator: str
+    use_cases: tuple
+
+
+class Registry:
+    """All registry objects plus the id indexes over them."""
+
+    __slots__ = (
+        "root", "templates", "agents", "capabilities", "versions", "swarms",
+        "compatible", "conflicting", "_children", "_swarms_by_agent",
+    )
+
+    def __init__(self, root, templates, agents, capabilities, versions, swarms,
+                 compatible=(), conflicting=()):
+        self.root = root
+        self.templates = templates
+        self.agents = agents
+        self.capabilities = capabilities
+        self.versions = versions
+        self.swarms = swarms
+        self.compatible = compatible
+        self.conflicting = conflicting
+
+        self._children = {}
+        for agent in agents.values():
+            self._children.setdefault(agent.parent_template, []).append(agent)
+        self._swarms_by_agent = {}
+        for swarm in swarms.values():
+            for agent_id in swarm.agents:
+                self._swarms_by_agent.setdefault(agent_id, []).append(swarm)
+
+    def template(self, template_id):
+        """Return a Template by ID or raise ValueError."""
+        try:
+            return self.templates[template_id]
+        except KeyError:
+            raise ValueError(f"Template '{template_id}' not found") from None
+
+    def agent(self, agent_id):
+        """Return an Agent by ID or raise ValueError."""
+        try:
+            return self.agents[agent_id]
+        except KeyError:
+            raise ValueError(f"Agent '{agent_id}' not found in lineage.yaml") from None
+
+    def template_path(self, template_id):
+        """Return the absolute path of a template file."""
+        return self.root / self.template(template_id).path
+
+    def agent_path(self, agent_id):
+        """Return the absolute path of an agent file."""
+        return self.root / self.agent(agent_id).path
+
+    def children_of(self, template_id):
+        """Return agents derived from a template."""
+        return list(self._children.get(template_id, ()))
+
+    def swarms_with(self, agent_id):
+        """Return swarms that include an agent."""
+        return list(self._swarms_by_agent.get(agent_id, ()))
+
+    def current_version(self, agent_id, default="N/A"):
+        """Return an agent's current version string."""
+        history = self.versions.get(agent_id)
+        return history.current_version if history else default
+
+
+def build_model(raw, root=None):
+    """Build a Registry from the dictionaries returned by load_registry()."""
+    lineage = _mapping(raw.get("lineage"))
+
+    templates = {}
+    for item in lineage.get("templates") or ():
+        item = _mapping(item)
+        if "id" not in item:
+            continue
+        templates[item["id"]] = Template(
+            id=_intern(str(item["id"])),
+            path=str(item.get("path", "")),
+            description=item.get("description") or "",
+            category=_intern(str(item.get("category") or "")),
+        )
+
+    agents = {}
+    for item in lineage.get("agents") or ():
+        item = _mapping(item)
+        if "id" not in item:
+            continue
+        link = _mapping(item.get("lineage"))
+        agents[item["id"]] = Agent(
+            id=_intern(str(item["id"])),
+            path=str(item.get("path", "")),
+            parent_template=_intern(str(link.get("parent_template") or "")),
+            derivation_type=_intern(str(link.get("derivation_type") or "")),
+            metadata=_mapping(item.get("metadata")),
+            generation_parameters=_mapping(item.get("generation_parameters")),
+        )
+
+    capabilities = {}
+    for agent_id, caps in _mapping(_mapping(raw.get("capabilities")).get("agents")).items():
+        caps = _mapping(caps)
+        capabilities[agent_id] = CapabilitySet(
+            agent_id=_intern(str(agent_id)),
+            can_do=_strings(caps.get("can_do")),
+            cannot_do=_strings(caps.get("cannot_do")),
+            tools_required=_strings(caps.get("tools_required")),
+            domain_expertise=_strings(caps.get("domain_expertise")),
+        )
+
+    root = Path(root or PROJECT_ROOT)
+    versions = {}
+    sharded = is_sharded(raw.get("versions"))
+    for agent_id, history in _mapping(_mapping(raw.get("versions")).get("agents")).items():
+        history = _mapping(history)
+        if sharded:
+            entries = LazyEntries(_intern(str(agent_id)), root)
+        else:
+            entries = _version_entries(history.get("versions"))
+        versions[agent_id] = VersionHistory(
+            agent_id=_intern(str(agent_id)),
+            current_version=str(history.get("current_version", "")),
+            entries=entries,
+        )
+
+    swarms_data = _mapping(raw.get("swarms"))
+    swarms = {}
+    for item in swarms_data.get("swarms") or ():
+        item = _mapping(item)
+        if "name" not in item:
+            continue
+        swarms[item["name"]] = Swarm(
+            name=_intern(str(item["name"])),
+            description=item.get("description") or "",
+            agents=_strings(item.get("agents")),
+            orchestrator=_intern(str(item.get("orchestrator") or "")),
+            use_cases=_strings(item.get("use_cases")),
+        )
+
+    matrix = _mapping(swarms_data.get("compatibility_matrix"))
+    compatible = tuple(_strings(pair) for pair in matrix.get("compatible") or ())
+    conflicting = tuple(_strings(pair) for pair in matrix.get("conflicting") or ())
+
+    return Registry(root, templates, agents, capabilities, versions,
+                    swarms, compatible, conflicting)
+
+
+# (root, sections) -> (raw dicts the model was built from, model)
+_models = {}
+
+
+def load_model(root=None, sections=None):
+    """Load the registry model, rebuilding it only when a data file changed.
+
+    sections limits which data files are read (keys of DATA_FILES, e.g.
+    ("lineage",)); the others stay empty in the model, so a parse error in
+    a file a caller does not need cannot break it.
+    """
+    root = Path(root or PROJECT_ROOT)
+    if sections is None:
+        raw = tuple(load_registry(root).items())
+    else:
+        sections = tuple(sections)
+        raw = tuple((name, load_yaml(DATA_FILES[name], root)) for name in sections)
+    key = (root, sections)
+    cached = _models.get(key)
+    if cached and len(cached[0]) == len(raw) and all(
+        a[0] == b[0] and a[1] is b[1] for a, b in zip(cached[0], raw)
+    ):
+        return cached[1]
+    with span("load", what="model"):
+        model = build_model(dict(raw), root)
+    _models[key] = (raw, model)
+    return model
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Heading outline of markdown files, cached by content hash.
+
+parse_headings() scans a document once for ATX headings (`#` to `######`),
+skipping fenced code blocks, and returns them flat in document order with
+their normalised title, line span and a hash of each section's own text.
+Checks that only need the flat list use it directly; build_tree() nests it
+into Section objects. OutlineCache keeps parsed headings on disk
+(.agents-md/cache/outlines.pickle) keyed by the SHA-256 of each file, with a
+stat fast path, so an unchanged file is neither read nor parsed again.
+AGENTS_MD_NO_CACHE=1 bypasses it, as it does the registry snapshot.
+
+Section titles are compared with normalize_title(), which drops list
+numbering and a trailing parenthetical: "### 1. System of Thought (Cognitive
+v2)" and "### 2. System of Thought" are both "system of thought".
+
+Usage:
+    from outline import OutlineCache
+
+    cache = OutlineCache()
+    roots = cache.outline("agents/AGENTS.python-backend.md")
+    cache.save()
+
+    python tools/outline.py agents/AGENTS.python-backend.md [...]
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from registry import NO_CACHE_ENV, PROJECT_ROOT, atomic_write, cache_dir
+
+# Bump when parse_headings() output changes for the same text.
+OUTLINE_VERSION = 2
+HEADING_FIELDS = 6
+CACHE_NAME = "outlines.pickle"
+
+HEADING_RE = re.compile(r" {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+FENCE_RE = re.compile(r" {0,3}(`{3,}|~{3,})")
+NUMBERING_RE = re.compile(r"^\d+(?:\.\d+)*\.?\s+")
+PARENTHETICAL_RE = re.compile(r"\s*\([^)]*\)$")
+
+
+@dataclass(slots=True, frozen=True)
+class Section:
+    level: int
+    title: str
+    key: str           # normalize_title(title)
+    line: int          # 1-based line of the heading
+    end: int           # last line of the section, subsections included
+    digest: str        # SHA-256 of the section's own text, up to its first subsection
+    children: tuple
+
+    def walk(self):
+        """Yield this section and every section below it."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def child(self, title):
+        """The first direct subsection with this (normalised) title, or None."""
+        key = normalize_title(title)
+        return next((c for c in self.children if c.key == key), None)
+
+
+def normalize_title(title):
+    """Lower-case a heading title without its numbering or trailing parenthetical."""
+    title = NUMBERING_RE.sub("", title.strip())
+    title = PARENTHETICAL_RE.sub("", title)
+    return " ".join(title.split()).lower()
+
+
+def _digest(lines):
+    body = "\n".join(line.rstrip() for line in lines).strip()
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def parse_headings(text):
+    """Return ((level, title, key, line, end, digest), ...) for the headings of a document."""
+    lines = text.splitlines()
+    found = []
+    fence = None
+    for number, line in enumerate(lines, 1):
+        head = line.lstrip(" ")[:1]
+        if head not in ("#", "`", "~"):
+            continue
+        match = FENCE_RE.match(line)
+        if match:
+            marker = match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence) and not line.strip()[len(marker):]:
+                fence = None
+            continue
+        if fence is None and head == "#":
+            match = HEADING_RE.match(line)
+            if match:
+                found.append((len(match.group(1)), match.group(2) or "", number))
+
+    headings = []
+    for i, (level, title, number) in enumerate(found):
+        own_end = found[i + 1][2] - 1 if i + 1 < len(found) else len(lines)
+        end = next((n - 1 for lv, _, n in found[i + 1:] if lv <= level), len(lines))
+        headings.append((level, title, normalize_title(title), number, end, _digest(lines[number:own_end])))
+    return tuple(headings)
+
+
+def build_tree(headings):
+    """Nest flat headings into a tuple of root Sections."""
+    def build(start, parent_level):
+        sections = []
+        i = start
+        while i < len(headings) and headings[i][0] > parent_level:
+            level, title, key, line, end, digest = headings[i]
+            children, i = build(i + 1, level)
+            sections.append(Section(level, title, key, line, end, digest, children))
+        return tuple(sections), i
+
+    return build(0, 0)[0]
+
+
+def _well_formed(outlines):
+    """True if every cached outline is a tuple of heading tuples of the current shape."""
+    return isinstance(outlines, dict) and all(
+        isinstance(headings, tuple) and all(isinstance(h, tuple) and len(h) == HEADING_FIELDS for h in headings)
+        for headings in outlines.values()
+    )
+
+
+class OutlineCache:
+    """Parsed headings of markdown files under a root, persisted between runs."""
+
+    __slots__ = ("root", "path", "files", "outlines", "dirty")
+
+    def __init__(self, root=None):
+        self.root = Path(root or PROJECT_ROOT)
+        self.path = cache_dir(self.root) / CACHE_NAME
+        self.files, self.outlines = {}, {}
+        self.dirty = False
+        if os.environ.get(NO_CACHE_ENV):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                stored = pickle.load(f)
+            if stored.get("version") == OUTLINE_VERSION and _well_formed(stored["outlines"]):
+                self.files, self.outlines = stored["files"], stored["outlines"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError):
+            pass
+
+    def headings(self, rel_path):
+        """Flat headings of a file relative to root; OSError if it cannot be read."""
+        path = self.root / rel_path
+        st = os.stat(path)
+        sig = (st.st_mtime_ns, st.st_size)
+        known = self.files.get(rel_path)
+        if known and known[:2] == sig and known[2] in self.outlines:
+            return self.outlines[known[2]]
+
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        headings = self.outlines.get(digest)
+        if headings is None:
+            headings = parse_headings(raw.decode("utf-8", errors="replace"))
+            self.outlines[digest] = headings
+        self.files[rel_path] = (*sig, digest)
+        self.dirty = True
+        return headings
+
+    def outline(self, rel_path):
+        """Root sections of a file relative to root."""
+        return build_tree(self.headings(rel_path))
+
+    def save(self):
+        """Write the cache if it changed, dropping outlines no file refers to."""
+        if not self.dirty or os.environ.get(NO_CACHE_ENV):
+            return
+        live = {entry[2] for entry in self.files.values()}
+        self.outlines = {digest: h for digest, h in self.outlines.items() if digest in live}
+        payload = {"version": OUTLINE_VERSION, "files": self.files, "outlines": self.outlines}
+        try:
+            atomic_write(self.path, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            # Only an optimisation; a read-only checkout still works.
+            return
+        self.dirty = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the heading outline of markdown files")
+    parser.add_argument("files", nargs="+", help="Markdown files")
+    args = parser.parse_args()
+
+    status = 0
+    for name in args.files:
+        try:
+            headings = parse_headings(Path(name).read_text())
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ {name}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"📄 {name}")
+        for level, title, _, line, end, _ in headings:
+            print(f"  {'  ' * (level - 1)}{'#' * level} {title}  (lines {line}-{end})")
+    return status
+
+
+if __name__ == "__main__":
+    exit(main())
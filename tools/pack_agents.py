@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Pack every agent prompt and its metadata into one memory-mappable bundle.
+
+The bundle holds a hash-table index (agent id -> offset, length, SHA-256)
+followed by the agent markdown bodies and compact JSON metadata
+(lineage, capabilities, current version and history). agent_bundle.py maps
+it and serves any agent in O(1) without touching agents/ or data/. See
+agent_bundle.py for the layout.
+
+Output is deterministic: the same registry always produces the same bytes,
+and an unchanged bundle is not rewritten.
+
+Usage:
+    python tools/pack_agents.py [--output PATH]
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import yaml
+
+import profiling
+from agent_bundle import DEFAULT_BUNDLE, ENTRY, FORMAT_VERSION, HEADER, MAGIC, SLOT, slot_of
+from models import load_model
+from registry import PROJECT_ROOT, atomic_write
+
+
+def agent_metadata(model, agent):
+    """The metadata stored next to an agent's body."""
+    caps = model.capabilities.get(agent.id)
+    history = model.versions.get(agent.id)
+    return {
+        "id": agent.id,
+        "path": agent.path,
+        "parent_template": agent.parent_template,
+        "derivation_type": agent.derivation_type,
+        "domain": agent.domain,
+        "capabilities": {
+            "can_do": list(caps.can_do),
+            "cannot_do": list(caps.cannot_do),
+            "tools_required": list(caps.tools_required),
+            "domain_expertise": list(caps.domain_expertise),
+        } if caps else None,
+        "current_version": history.current_version if history else None,
+        "versions": [
+            {"version": e.version, "date": e.date, "changes": e.changes, "template_version": e.template_version}
+            for e in (history.entries if history else ())
+        ],
+    }
+
+
+def build_bundle(agents):
+    """Return bundle bytes for [(agent id, body bytes, metadata dict)]."""
+    count = len(agents)
+    slots = 1
+    while slots < count * 2:
+        slots *= 2
+
+    keys = [agent_id.encode("utf-8") for agent_id, _, _ in agents]
+    table = [0] * slots
+    for n, key in enumerate(keys):
+        slot = slot_of(key, slots)
+        while table[slot]:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = n + 1
+
+    entries_offset = HEADER.size + slots * SLOT.size
+    strings_offset = entries_offset + count * ENTRY.size
+    data_offset = strings_offset + sum(map(len, keys))
+
+    entries, strings, data = [], [], []
+    id_offset, blob_offset = strings_offset, data_offset
+    for key, (_, body, meta) in zip(keys, agents):
+        meta = json.dumps(meta, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+        body_offset, meta_offset = blob_offset, blob_offset + len(body)
+        entries.append(ENTRY.pack(id_offset, len(key), body_offset, len(body), meta_offset, len(meta),
+                                  hashlib.sha256(body).digest(), hashlib.sha256(meta).digest()))
+        strings.append(key)
+        data += (body, meta)
+        id_offset += len(key)
+        blob_offset += len(body) + len(meta)
+
+    index = b"".join([b"".join(SLOT.pack(n) for n in table), *entries, *strings])
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, count, slots, entries_offset, strings_offset,
+                         data_offset, hashlib.sha256(index).digest())
+    return b"".join([header, index, *data])
+
+
+def pack(output=None, root=None):
+    """Write the bundle for the registry at root. Returns (agent count, bytes, written)."""
+    root = Path(root or PROJECT_ROOT)
+    output = Path(output or DEFAULT_BUNDLE)
+    with profiling.span("load"):
+        model = load_model(root)
+        agents = []
+        for agent_id in sorted(model.agents):
+            agent = model.agents[agent_id]
+            try:
+                body = model.agent_path(agent_id).read_bytes()
+            except FileNotFoundError:
+                raise ValueError(f"Agent file missing: {agent.path}") from None
+            agents.append((agent_id, body, agent_metadata(model, agent)))
+
+    with profiling.span("render", agents=len(agents)):
+        data = build_bundle(agents)
+    with profiling.span("write", path=str(output)):
+        try:
+            unchanged = output.read_bytes() == data
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            atomic_write(output, data)
+    return len(agents), len(data), not unchanged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack agents into a memory-mappable bundle")
+    parser.add_argument("--output", help=f"Bundle path (default: {DEFAULT_BUNDLE})")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.configure(args)
+
+    started = time.perf_counter()
+    try:
+        count, size, written = pack(args.output)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    state = "Wrote" if written else "Unchanged:"
+    print(f"📦 {state} {args.output or DEFAULT_BUNDLE} ({count} agents, {size / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
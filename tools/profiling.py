@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Phase-level timing spans for the tools; off unless asked for.
+
+    from profiling import span
+
+    with span("render", page=rel):
+        html = template.render(...)
+
+With profiling off (the default) span() returns one shared no-op context
+manager, so an instrumented phase costs a function call. It is turned on by
+a tool's --profile PATH flag or, for invoke tasks and anything else that
+shells out, the AGENTS_MD_PROFILE=PATH environment variable. At exit every
+span is written to PATH:
+
+- PATH ending in .json: a Chrome trace-event file (chrome://tracing or
+  https://ui.perfetto.dev), with a counter track for peak RSS
+- anything else: JSON lines, one span per line, then one summary line
+
+Each span records the process's peak RSS when it ended, and a per-phase
+summary is printed to stderr.
+
+--cprofile (or AGENTS_MD_CPROFILE=1) additionally runs cProfile over each
+top-level phase on the main thread and dumps the hottest phase to
+PATH.<phase>.prof (`python -m pstats`, snakeviz). Work in worker threads is
+timed but not profiled; run a tool with --jobs 1 to profile it inline.
+
+Phases used across the tools: load (a model or cache), parse (a YAML file),
+lookup, render, write and validate (one data file).
+"""
+
+import os
+import sys
+import time
+
+PROFILE_ENV = "AGENTS_MD_PROFILE"
+CPROFILE_ENV = "AGENTS_MD_CPROFILE"
+
+_enabled = False
+_state = None
+# Imported by enable(): most runs never need it.
+threading = None
+
+
+def span(name, **args):
+    """Time the enclosed block as phase name; args are recorded with it."""
+    if not _enabled:
+        return _NULL
+    return _Span(name, args)
+
+
+def enabled():
+    return _enabled
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start", "stack", "nested", "profiler")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        local = _state["local"]
+        if not hasattr(local, "stack"):
+            local.stack = []
+        self.stack = local.stack
+        # A phase inside a phase of the same name is not counted twice in the summary.
+        self.nested = self.name in self.stack
+        self.stack.append(self.name)
+        self.profiler = None
+        if _state["cprofile"] and len(self.stack) == 1 and threading.current_thread() is threading.main_thread():
+            import cProfile
+
+            profilers = _state["profilers"]
+            if self.name not in profilers:
+                profilers[self.name] = cProfile.Profile()
+            self.profiler = profilers[self.name]
+            self.profiler.enable()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.stack.pop()
+        _state["events"].append((self.name, self.start, end - self.start, threading.get_ident(),
+                                 len(self.stack), self.nested, _peak_rss_mb(), self.args))
+        return False
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    return round(rss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def enable(path, cprofile=False):
+    """Start recording spans; they are written to path at exit."""
+    global _enabled, _state, threading
+    if _enabled:
+        return
+    import atexit
+    import threading
+
+    _state = {
+        "path": str(path),
+        "cprofile": cprofile,
+        "started": time.perf_counter_ns(),
+        "events": [],
+        "local": threading.local(),
+        "profilers": {},
+    }
+    _enabled = True
+    atexit.register(write)
+
+
+def add_arguments(parser):
+    """Add --profile and --cprofile to a tool's argument parser."""
+    parser.add_argument("--profile", metavar="PATH",
+                        help=f"Write phase timings to PATH (.json: Chrome trace, else JSON lines); env {PROFILE_ENV}")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="With --profile, also dump cProfile stats of the hottest phase")
+
+
+def configure(args=None):
+    """Enable profiling from parsed --profile/--cprofile or the environment."""
+    path = getattr(args, "profile", None) or os.environ.get(PROFILE_ENV)
+    if path:
+        enable(path, cprofile=bool(getattr(args, "cprofile", False) or os.environ.get(CPROFILE_ENV)))
+
+
+def summary():
+    """Per-phase count, total and max milliseconds, hottest first."""
+    phases = {}
+    for name, _, duration, _, _, nested, _, _ in _state["events"]:
+        count, total, longest = phases.get(name, (0, 0, 0))
+        phases[name] = (count + 1, total + (0 if nested else duration), max(longest, duration))
+    return {
+        name: {"count": count, "total_ms": round(total / 1e6, 3), "max_ms": round(longest / 1e6, 3)}
+        for name, (count, total, longest) in sorted(phases.items(), key=lambda item: -item[1][1])
+    }
+
+
+def _hottest_profiled():
+    totals = {}
+    for name, _, duration, _, depth, _, _, _ in _state["events"]:
+        if depth == 0 and name in _state["profilers"]:
+            totals[name] = totals.get(name, 0) + duration
+    return max(totals, key=totals.get) if totals else None
+
+
+def write():
+    """Write the recorded spans (and the cProfile dump) to the configured path."""
+    if not _enabled:
+        return
+    import json
+
+    path, started = _state["path"], _state["started"]
+    wall_ms = round((time.perf_counter_ns() - started) / 1e6, 3)
+    phases = summary()
+    totals = {"wall_ms": wall_ms, "peak_rss_mb": _peak_rss_mb(), "argv": sys.argv, "phases": phases}
+    pid = os.getpid()
+    if path.endswith(".json"):
+        events = []
+        for name, start, duration, tid, _, _, rss, args in _state["events"]:
+            ts = (start - started) / 1e3
+            events.append({"name": name, "ph": "X", "ts": ts, "dur": duration / 1e3,
+                           "pid": pid, "tid": tid, "args": args})
+            if rss is not None:
+                events.append({"name": "peak_rss_mb", "ph": "C", "ts": ts + duration / 1e3,
+                               "pid": pid, "args": {"peak_rss_mb": rss}})
+        payload = json.dumps({"traceEvents": events, "displayTimeUnit": "ms", "otherData": totals},
+                             default=str)
+    else:
+        lines = [json.dumps({"name": name, "start_ms": round((start - started) / 1e6, 3),
+                             "duration_ms": round(duration / 1e6, 3), "thread": tid, "depth": depth,
+                             "peak_rss_mb": rss, "args": args}, default=str)
+                 for name, start, duration, tid, depth, _, rss, args in _state["events"]]
+        lines.append(json.dumps({"summary": totals}, default=str))
+        payload = "\n".join(lines)
+    with open(path, "w") as f:
+        f.write(payload + "\n")
+
+    top = ", ".join(f"{name} {p['total_ms']:.0f} ms ×{p['count']}" for name, p in list(phases.items())[:5])
+    print(f"⏱️  Profile: {wall_ms:.0f} ms wall, peak RSS {totals['peak_rss_mb']} MB; {top or 'no spans'}",
+          file=sys.stderr)
+    print(f"📄 Trace written to {path}", file=sys.stderr)
+    hottest = _hottest_profiled()
+    if hottest:
+        prof_path = f"{path}.{hottest}.prof"
+        _state["profilers"][hottest].dump_stats(prof_path)
+        print(f"🔥 cProfile of hottest phase '{hottest}' written to {prof_path}", file=sys.stderr)
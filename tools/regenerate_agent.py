@@ -2,43 +2,141 @@
 """
 Regenerate an agent from its parent template.
 
+A build manifest (.agents-md/manifest.json) records, for every agent, the
+hash of its parent template, the domain parameter, the generator version and
+the hash of the file that was written. Agents whose inputs and output are
+unchanged are skipped; use --force to rebuild regardless and --dry-run to only
+list what would change.
+
 Usage:
-    python tools/regenerate_agent.py <agent_name> [--domain DOMAIN]
+    python tools/regenerate_agent.py <agent_name> [--domain DOMAIN] [--force] [--dry-run]
+    python tools/regenerate_agent.py --all [--jobs N] [--force] [--dry-run]
 """
 
 import argparse
-import shutil
-import yaml
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-PROJECT_ROOT = Path(__file__).parent.parent
+import yaml
 
+import profiling
+from backups import backup_file
+from models import load_model
+from registry import atomic_write, content_hash, state_dir
 
-def load_lineage():
-    """Load the lineage.yaml file."""
-    with open(PROJECT_ROOT / "data" / "lineage.yaml") as f:
-        return yaml.safe_load(f)
+PROJECT_ROOT = Path(__file__).parent.parent
+MANIFEST_FILE = state_dir(PROJECT_ROOT) / "manifest.json"
+
+# Bump whenever render_agent() output changes for the same inputs.
+GENERATOR_VERSION = "1"
 
 
 def find_agent_template(agent_id):
     """Find the parent template ID for an agent."""
-    lineage = load_lineage()
-    for agent in lineage.get("agents", []):
-        if agent["id"] == agent_id:
-            return agent["lineage"]["parent_template"]
-    raise ValueError(f"Agent '{agent_id}' not found in lineage.yaml")
+    return load_model(sections=("lineage",)).agent(agent_id).parent_template
 
 
 def find_template_path(template_id):
     """Find path for a template ID."""
-    lineage = load_lineage()
-    for template in lineage.get("templates", []):
-        if template["id"] == template_id:
-            return PROJECT_ROOT / template["path"]
-    raise ValueError(f"Template '{template_id}' not found")
+    return load_model(sections=("lineage",)).template_path(template_id)
+
+
+def agent_path_for(agent_name):
+    """Return the markdown path for an agent ID."""
+    return PROJECT_ROOT / "agents" / f"AGENTS.{agent_name}.md"
+
+
+def render_agent(template_content, domain=None):
+    """Substitute domain placeholders in template content."""
+    content = template_content
+    if domain:
+        content = content.replace("{{DOMAIN}}", domain.title())
+        content = content.replace("{{domain}}", domain)
+    return content
+
 
+def load_manifest():
+    """Load the regeneration manifest, or an empty one if absent or unreadable."""
+    try:
+        with open(MANIFEST_FILE) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("agents", {}) if isinstance(manifest, dict) else {}
+
+
+def save_manifest(entries):
+    """Atomically write the regeneration manifest."""
+    payload = json.dumps({"agents": entries}, indent=2, sort_keys=True) + "\n"
+    atomic_write(MANIFEST_FILE, payload)
+
+
+def agent_inputs(template_id, template_hash, domain):
+    """Return the manifest record of everything an agent is generated from."""
+    return {
+        "template": template_id,
+        "template_hash": template_hash,
+        "domain": domain,
+        "generator": GENERATOR_VERSION,
+    }
+
+
+def plan_agent(agent_name, inputs, template_content, entry):
+    """Decide whether an agent needs rebuilding.
 
-def regenerate_agent(agent_name, domain=None):
+    Returns (reason, content, output_hash). reason is None when the agent file
+    is already up to date; content is only rendered when it is needed.
+    """
+    agent_path = agent_path_for(agent_name)
+    with profiling.span("lookup", agent=agent_name):
+        if not agent_path.exists():
+            raise FileNotFoundError(f"Agent file {agent_path} does not exist. Use create_agent for new agents.")
+        current_hash = content_hash(agent_path.read_bytes())
+
+    if entry and entry.get("output_hash") == current_hash and all(
+        entry.get(key) == value for key, value in inputs.items()
+    ):
+        return None, None, current_hash
+
+    with profiling.span("render", agent=agent_name):
+        content = render_agent(template_content, inputs["domain"])
+        output_hash = content_hash(content)
+    if output_hash == current_hash:
+        return None, content, output_hash
+
+    if not entry:
+        reason = "not in manifest"
+    elif entry.get("generator") != inputs["generator"]:
+        reason = "generator changed"
+    elif entry.get("template") != inputs["template"] or entry.get("template_hash") != inputs["template_hash"]:
+        reason = "template changed"
+    elif entry.get("domain") != inputs["domain"]:
+        reason = "domain changed"
+    else:
+        reason = "agent modified"
+    return reason, content, output_hash
+
+
+def write_agent(agent_name, content):
+    """Back up the existing agent file and write new content.
+
+    Returns the backup index entry.
+    """
+    agent_path = agent_path_for(agent_name)
+    if not agent_path.exists():
+        raise FileNotFoundError(f"Agent file {agent_path} does not exist. Use create_agent for new agents.")
+
+    with profiling.span("write", agent=agent_name):
+        backup = backup_file(agent_name, agent_path)
+        # Never leave a truncated agent behind if a batch is interrupted.
+        atomic_write(agent_path, content)
+    return backup
+
+
+def regenerate_agent(agent_name, domain=None, force=False, dry_run=False):
     """Regenerate an agent file from its template."""
     print(f"🔄 Regenerating agent: {agent_name}...")
     
@@ -46,45 +144,153 @@ def regenerate_agent(agent_name, domain=None):
     try:
         template_id = find_agent_template(agent_name)
         template_path = find_template_path(template_id)
-    except ValueError as e:
+    except (ValueError, yaml.YAMLError) as e:
         print(f"❌ Error: {e}")
         exit(1)
     
-    agent_path = PROJECT_ROOT / "agents" / f"AGENTS.{agent_name}.md"
-    if not agent_path.exists():
-        print(f"❌ Error: Agent file {agent_path} does not exist. Use create_agent for new agents.")
-        exit(1)
-        
-    # 2. Backup
-    from datetime import datetime
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = agent_path.with_suffix(f".md.{timestamp}.bak")
-    shutil.copy2(agent_path, backup_path)
-    print(f"📦 Backed up existing agent to {backup_path.name}")
-    
-    # 3. Read Template
+    # 2. Read Template
     with open(template_path) as f:
-        content = f.read()
+        template_content = f.read()
         
-    # 4. Substitute
-    if domain:
-        content = content.replace("{{DOMAIN}}", domain.title())
-        content = content.replace("{{domain}}", domain)
+    # 3. Compare against the manifest
+    manifest = load_manifest()
+    inputs = agent_inputs(template_id, content_hash(template_content), domain)
+    try:
+        reason, content, output_hash = plan_agent(
+            agent_name, inputs, template_content, None if force else manifest.get(agent_name)
+        )
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
+        exit(1)
+    if force and reason is None:
+        reason = "forced"
+        content = content if content is not None else render_agent(template_content, domain)
+    
+    if reason is None:
+        if not dry_run:
+            manifest[agent_name] = {**inputs, "output_hash": output_hash}
+            save_manifest(manifest)
+        print(f"⏭️  {agent_name} is up to date")
+        return
+    if dry_run:
+        print(f"📝 Would regenerate {agent_name} ({reason})")
+        return
         
-    # 5. Write
-    with open(agent_path, "w") as f:
-        f.write(content)
+    # 4. Substitute, back up and write
+    backup = write_agent(agent_name, content)
+    print(f"📦 Backed up existing agent as {backup['hash'][:12]} ({backup['timestamp']})")
+    manifest[agent_name] = {**inputs, "output_hash": output_hash}
+    save_manifest(manifest)
         
-    print(f"✅ Successfully regenerated {agent_name} from template '{template_id}'")
+    print(f"✅ Successfully regenerated {agent_name} from template '{template_id}' ({reason})")
+
+
+def regenerate_all(jobs=None, force=False, dry_run=False, agent_ids=None):
+    """Regenerate every out-of-date agent in lineage.yaml across a thread pool.
+
+    Lineage is loaded once and each parent template is read once, however many
+    agents derive from it. Agents whose manifest entry matches their inputs
+    and current file are skipped; agent_ids limits the run to those agents.
+    Returns the number of agents that failed.
+    """
+    started = time.perf_counter()
+    with profiling.span("load"):
+        model = load_model(sections=("lineage",))
+        agents = [a for a in model.agents.values() if agent_ids is None or a.id in agent_ids]
+        manifest = load_manifest()
+
+        template_contents = {}
+        template_hashes = {}
+        for template_id in {agent.parent_template for agent in agents}:
+            if template_id in model.templates and model.template_path(template_id).exists():
+                path = model.template_path(template_id)
+                template_contents[template_id] = path.read_text()
+                template_hashes[template_id] = content_hash(template_contents[template_id])
+
+    def work(agent):
+        t0 = time.perf_counter()
+        agent_id = agent.id
+        template_id = agent.parent_template
+        record = None
+        try:
+            if template_id not in template_contents:
+                raise FileNotFoundError(f"Template file missing: {model.template_path(template_id)}")
+            template_content = template_contents[template_id]
+            inputs = agent_inputs(template_id, template_hashes[template_id], agent.domain)
+            reason, content, output_hash = plan_agent(
+                agent_id, inputs, template_content, None if force else manifest.get(agent_id)
+            )
+            if force and reason is None:
+                reason = "forced"
+                content = content if content is not None else render_agent(template_content, inputs["domain"])
+
+            if reason is None:
+                status, detail = "fresh", "up to date"
+            elif dry_run:
+                status, detail = "dirty", f"would regenerate ({reason})"
+            else:
+                write_agent(agent_id, content)
+                status, detail = "ok", f"from '{template_id}' ({reason})"
+            record = {**inputs, "output_hash": output_hash}
+        except (ValueError, OSError) as e:
+            status, detail = "failed", str(e)
+        return agent_id, status, detail, time.perf_counter() - t0, record
+
+    jobs = jobs or os.cpu_count() or 1
+    action = "Checking" if dry_run else "Regenerating"
+    print(f"🔄 {action} {len(agents)} agents with {jobs} workers...")
+    if jobs == 1:
+        # Inline, so a profile of the run covers the per-agent work itself.
+        results = list(map(work, agents))
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(work, agents))
+
+    icons = {"ok": "✅", "fresh": "⏭️ ", "dirty": "📝", "failed": "❌"}
+    width = max((len(r[0]) for r in results), default=0)
+    for agent_id, status, detail, elapsed, _ in results:
+        print(f"  {icons[status]} {agent_id:<{width}}  {elapsed * 1000:7.1f} ms  {detail}")
+
+    if not dry_run:
+        updated = dict(manifest)
+        for agent_id, status, _, _, record in results:
+            if status in ("ok", "fresh"):
+                updated[agent_id] = record
+        if updated != manifest:
+            with profiling.span("write", what="manifest"):
+                save_manifest(updated)
+
+    counts = {status: sum(1 for r in results if r[1] == status) for status in icons}
+    elapsed = time.perf_counter() - started
+    if dry_run:
+        summary = f"{counts['dirty']} would change, {counts['fresh']} up to date"
+    else:
+        summary = f"{counts['ok']} regenerated, {counts['fresh']} up to date"
+    print(f"\n⏱️  {summary}, {counts['failed']} failed in {elapsed:.3f}s")
+    return counts["failed"]
 
 
 def main():
     parser = argparse.ArgumentParser(description="Regenerate an agent from its template")
-    parser.add_argument("agent_name", help="Agent ID (e.g., rust-backend)")
+    parser.add_argument("agent_name", nargs="?", help="Agent ID (e.g., rust-backend)")
     parser.add_argument("--domain", help="Domain specialization (if template requires it)")
+    parser.add_argument("--all", action="store_true", help="Regenerate every agent in lineage.yaml")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker threads for --all (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the manifest says up to date")
+    parser.add_argument("--dry-run", action="store_true", help="List agents that would change without writing")
+    profiling.add_arguments(parser)
     
     args = parser.parse_args()
-    regenerate_agent(args.agent_name, args.domain)
+    profiling.configure(args)
+    if not args.all and not args.agent_name:
+        parser.error("agent_name is required unless --all is given")
+    try:
+        if args.all:
+            exit(1 if regenerate_all(args.jobs, args.force, args.dry_run) else 0)
+        regenerate_agent(args.agent_name, args.domain, args.force, args.dry_run)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error: {e}")
+        exit(1)
 
 
 if __name__ == "__main__":
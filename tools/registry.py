@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Shared loader for the registry data files in data/*.yaml.
+
+Every tool imports this module instead of calling yaml.safe_load itself:
+
+- Each file is parsed at most once per process and memoized.
+- The libyaml C loader is used when PyYAML was built with it.
+- Parsed files are stored in an on-disk snapshot (.agents-md/cache/) keyed by
+  the SHA-256 of each file's bytes, so a cold start only parses files whose
+  content actually changed.
+
+versions.yaml may use the sharded layout (layout: sharded): it then holds only
+each agent's current_version and template_version, and the full history of
+an agent lives in data/versions/<agent>.yaml, read by load_history() on
+demand. Readers that only need current versions never touch the shards.
+
+Returned objects are shared between callers and must be treated as read-only.
+Tools that rewrite a data file should parse it with parse_yaml() and call
+invalidate() after writing.
+
+Usage:
+    from registry import load_yaml, load_registry
+
+    lineage = load_yaml("lineage.yaml")
+    data = load_registry()   # {"lineage": ..., "capabilities": ..., ...}
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from profiling import span
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_FILES = {
+    "lineage": "lineage.yaml",
+    "capabilities": "capabilities.yaml",
+    "versions": "versions.yaml",
+    "swarms": "swarms.yaml",
+}
+
+# Bump when the snapshot layout or the parsed representation changes.
+SNAPSHOT_VERSION = 1
+SNAPSHOT_NAME = "registry.pickle"
+
+# Per-agent version history shards (data/versions/<agent>.yaml).
+VERSIONS_SHARD_DIR = "versions"
+
+# Set AGENTS_MD_NO_CACHE=1 to bypass the on-disk snapshot.
+NO_CACHE_ENV = "AGENTS_MD_NO_CACHE"
+
+# mkstemp creates 0600 files; atomic_write applies the usual umask instead.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# (root, filename) -> (stat signature, sha256, parsed data)
+_memo = {}
+# (root, filename) -> (stat signature, sha256) for files hashed but not parsed
+_digests = {}
+# root -> {"entries": {filename: (sha256, data)}, "dirty": bool}
+_snapshots = {}
+
+
+def state_dir(root=None):
+    """Return the directory used for local tool state (caches, backups)."""
+    return Path(root or PROJECT_ROOT) / ".agents-md"
+
+
+def cache_dir(root=None):
+    """Return the directory holding derived, disposable caches."""
+    return state_dir(root) / "cache"
+
+
+def content_hash(data):
+    """Return the hex SHA-256 digest of bytes or str."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+_safe_loader = None
+
+
+def yaml_loader():
+    """Return the fastest available PyYAML safe loader (the libyaml one if built).
+
+    PyYAML is imported on first use, so commands answered entirely from the
+    snapshot or other caches never pay for importing it.
+    """
+    global _safe_loader
+    if _safe_loader is None:
+        import yaml
+        _safe_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return _safe_loader
+
+
+def __getattr__(name):
+    # `from registry import SafeLoader` keeps working without an eager import.
+    if name == "SafeLoader":
+        return yaml_loader()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def parse_yaml(text):
+    """Parse YAML text with the fastest available safe loader."""
+    import yaml
+
+    return yaml.load(text, Loader=yaml_loader())
+
+
+def atomic_write(path, data):
+    """Write bytes or str to path via a temporary file and rename.
+
+    An existing file keeps its permissions; a new one gets the umask default.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _snapshot_enabled():
+    return not os.environ.get(NO_CACHE_ENV)
+
+
+def _snapshot(root):
+    """Return the in-memory view of the on-disk snapshot for root."""
+    snap = _snapshots.get(root)
+    if snap is not None:
+        return snap
+
+    entries = {}
+    if _snapshot_enabled():
+        try:
+            with span("load", file=SNAPSHOT_NAME), open(cache_dir(root) / SNAPSHOT_NAME, "rb") as f:
+                stored = pickle.load(f)
+            if stored.get("version") == SNAPSHOT_VERSION:
+                entries = stored["entries"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError):
+            entries = {}
+
+    snap = {"entries": entries, "dirty": False}
+    _snapshots[root] = snap
+    return snap
+
+
+def _flush_snapshot(root):
+    """Persist the snapshot for root if it gained new entries."""
+    snap = _snapshots.get(root)
+    if not snap or not snap["dirty"] or not _snapshot_enabled():
+        return
+    payload = pickle.dumps(
+        {"version": SNAPSHOT_VERSION, "entries": snap["entries"]},
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    try:
+        with span("write", file=SNAPSHOT_NAME):
+            atomic_write(cache_dir(root) / SNAPSHOT_NAME, payload)
+    except OSError:
+        # The snapshot is only an optimisation; a read-only checkout still works.
+        return
+    snap["dirty"] = False
+
+
+def _load(root, filename, snapshot=True):
+    path = root / "data" / filename
+    st = os.stat(path)
+    sig = (st.st_mtime_ns, st.st_size)
+
+    key = (root, filename)
+    cached = _memo.get(key)
+    if cached and cached[0] == sig:
+        return cached[2]
+
+    raw = path.read_bytes()
+    digest = content_hash(raw)
+    if cached and cached[1] == digest:
+        _memo[key] = (sig, digest, cached[2])
+        return cached[2]
+
+    if not snapshot:
+        with span("parse", file=filename):
+            data = parse_yaml(raw)
+        _memo[key] = (sig, digest, data)
+        return data
+
+    snap = _snapshot(root)
+    entry = snap["entries"].get(filename)
+    if entry and entry[0] == digest:
+        data = entry[1]
+    else:
+        with span("parse", file=filename):
+            data = parse_yaml(raw)
+        snap["entries"][filename] = (digest, data)
+        snap["dirty"] = True
+
+    _memo[key] = (sig, digest, data)
+    return data
+
+
+def load_yaml(filename, root=None):
+    """Load one data file (e.g. "lineage.yaml"), parsing it at most once."""
+    root = Path(root or PROJECT_ROOT)
+    data = _load(root, filename)
+    _flush_snapshot(root)
+    return data
+
+
+def load_registry(root=None):
+    """Load every data file and return them keyed by name (lineage, swarms, ...)."""
+    root = Path(root or PROJECT_ROOT)
+    data = {name: _load(root, filename) for name, filename in DATA_FILES.items()}
+    _flush_snapshot(root)
+    return data
+
+
+def digest(filename, root=None):
+    """Return the SHA-256 of a data file, loading it if necessary."""
+    root = Path(root or PROJECT_ROOT)
+    load_yaml(filename, root)
+    return _memo[(root, filename)][1]
+
+
+def file_digest(filename, root=None):
+    """Return the SHA-256 of a data file without parsing it (None if missing)."""
+    root = Path(root or PROJECT_ROOT)
+    key = (root, filename)
+    path = root / "data" / filename
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    sig = (st.st_mtime_ns, st.st_size)
+    for memo in (_memo, _digests):
+        cached = memo.get(key)
+        if cached and cached[0] == sig:
+            return cached[1]
+    digest = content_hash(path.read_bytes())
+    _digests[key] = (sig, digest)
+    return digest
+
+
+def is_sharded(versions):
+    """Return True if parsed versions.yaml data uses the sharded layout."""
+    return isinstance(versions, dict) and versions.get("layout") == "sharded"
+
+
+def shard_filename(agent_id):
+    """Return the data/-relative history shard file of an agent."""
+    return f"{VERSIONS_SHARD_DIR}/{agent_id}.yaml"
+
+
+def load_shard(agent_id, root=None):
+    """Load an agent's history shard, or None if it does not exist."""
+    root = Path(root or PROJECT_ROOT)
+    try:
+        return _load(root, shard_filename(agent_id), snapshot=False)
+    except FileNotFoundError:
+        return None
+
+
+def load_history(agent_id, root=None):
+    """Return an agent's raw list of version entries, in either layout."""
+    versions = load_yaml("versions.yaml", root)
+    if is_sharded(versions):
+        shard = load_shard(agent_id, root)
+        entries = shard.get("versions") if isinstance(shard, dict) else None
+    else:
+        history = ((versions or {}).get("agents") or {}).get(agent_id)
+        entries = history.get("versions") if isinstance(history, dict) else None
+    return entries if isinstance(entries, list) else []
+
+
+def invalidate(filename=None, root=None):
+    """Forget memoized data so the next load re-reads from disk."""
+    root = Path(root or PROJECT_ROOT)
+    for memo in (_memo, _digests):
+        for key in list(memo):
+            if key[0] == root and (filename is None or key[1] == filename):
+                del memo[key]
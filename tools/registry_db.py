@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Read API for the SQLite export written by export_sqlite.py.
+
+Services that embed the registry open the database read-only and query it
+directly: lookups are single indexed queries, and full-text search over
+agent, template and knowledge markdown uses the FTS5 table. Nothing here
+parses YAML or markdown, and only the standard library is needed.
+
+Usage:
+    from registry_db import RegistryDB
+
+    with RegistryDB() as db:
+        db.agent("python-backend")
+        db.find(can=["api_design"], tool=["pytest"])
+        db.search("retry backoff", kind="knowledge")
+
+    python tools/registry_db.py search "retry backoff" [--kind knowledge]
+    python tools/registry_db.py agent python-backend
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).parent.parent / ".agents-md" / "registry.sqlite"
+
+# Bump when the table layout changes; export_sqlite.py rebuilds on mismatch.
+SCHEMA_VERSION = 1
+
+CAPABILITY_FIELDS = ("can_do", "cannot_do", "tools_required", "domain_expertise")
+DOCUMENT_KINDS = ("agent", "template", "knowledge")
+# bm25() weights for the FTS columns (title, body).
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, the last as a prefix."""
+    terms = [f'"{t}"' for t in _TERM_RE.findall(text)]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class RegistryDB:
+    """Read-only queries over an exported registry database."""
+
+    __slots__ = ("path", "conn")
+
+    def __init__(self, path=None):
+        self.path = Path(path or DEFAULT_DB)
+        if not self.path.exists():
+            raise FileNotFoundError(f"{self.path} does not exist; run export_sqlite.py first")
+        self.conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True,
+                                    check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.conn.close()
+            raise ValueError(f"{self.path} has schema {version}, expected {SCHEMA_VERSION}; re-export it")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _all(self, sql, params=()):
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def _values(self, sql, params=()):
+        return [row[0] for row in self.conn.execute(sql, params)]
+
+    def agent(self, agent_id):
+        """Return an agent with its capabilities and current version, or None."""
+        row = self.conn.execute(
+            "SELECT a.*, v.current_version FROM agents a "
+            "LEFT JOIN current_versions v ON v.agent_id = a.id WHERE a.id = ?", (agent_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        agent = dict(row)
+        agent["metadata"] = json.loads(agent["metadata"] or "{}")
+        agent["capabilities"] = self.capabilities(agent_id)
+        return agent
+
+    def template(self, template_id):
+        """Return a template row as a dict, or None."""
+        row = self.conn.execute("SELECT * FROM templates WHERE id = ?", (template_id,)).fetchone()
+        return dict(row) if row else None
+
+    def agent_ids(self):
+        return self._values("SELECT id FROM agents ORDER BY id")
+
+    def capabilities(self, agent_id):
+        """Return {field: [values]} for an agent."""
+        caps = {field: [] for field in CAPABILITY_FIELDS}
+        for field, value in self.conn.execute(
+            "SELECT field, value FROM capabilities WHERE agent_id = ? ORDER BY field, position", (agent_id,)
+        ):
+            caps[field].append(value)
+        return caps
+
+    def current_version(self, agent_id, default=None):
+        row = self.conn.execute(
+            "SELECT current_version FROM current_versions WHERE agent_id = ?", (agent_id,)
+        ).fetchone()
+        return row[0] if row else default
+
+    def history(self, agent_id):
+        """Return an agent's version entries, oldest first."""
+        return self._all(
+            "SELECT version, date, changes, template_version FROM versions "
+            "WHERE agent_id = ? ORDER BY seq", (agent_id,)
+        )
+
+    def children_of(self, template_id):
+        return self._values("SELECT id FROM agents WHERE parent_template = ? ORDER BY id", (template_id,))
+
+    def swarm(self, name):
+        """Return a swarm with its agents and use cases, or None."""
+        row = self.conn.execute("SELECT * FROM swarms WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        swarm = dict(row)
+        swarm["agents"] = self._values(
+            "SELECT agent_id FROM swarm_agents WHERE swarm = ? ORDER BY position", (name,))
+        swarm["use_cases"] = self._values(
+            "SELECT use_case FROM swarm_use_cases WHERE swarm = ? ORDER BY position", (name,))
+        return swarm
+
+    def swarms_with(self, agent_id):
+        return self._values("SELECT DISTINCT swarm FROM swarm_agents WHERE agent_id = ? ORDER BY swarm",
+                            (agent_id,))
+
+    def find(self, can=(), cannot=(), without=(), tool=(), domain=()):
+        """Return ids of agents matching every capability condition (see capability_index.py)."""
+        lookup = "SELECT agent_id FROM capabilities WHERE field = ? AND value = ?"
+        parts, params = [], []
+        for field, values in (("can_do", can), ("cannot_do", cannot),
+                              ("tools_required", tool), ("domain_expertise", domain)):
+            for value in values:
+                parts.append(lookup)
+                params += (field, value)
+        sql = " INTERSECT ".join(parts) or "SELECT id FROM agents"
+        for value in without:
+            sql += f" EXCEPT {lookup}"
+            params += ("can_do", value)
+        return self._values(f"{sql} ORDER BY 1", params)
+
+    def search(self, query, kind=None, limit=20, raw=False):
+        """Full-text search over markdown; returns best matches first.
+
+        query is free text (all words must match, the last one as a prefix)
+        unless raw is true, in which case it is passed to FTS5 unchanged.
+        """
+        match = query if raw else fts_query(query)
+        if not match:
+            return []
+        sql = ("SELECT d.path, d.kind, d.entity_id, d.title, "
+               "snippet(documents_fts, 1, '[', ']', ' ... ', 12) AS snippet, "
+               "bm25(documents_fts, ?, ?) AS rank "
+               "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+               "WHERE documents_fts MATCH ?")
+        params = [TITLE_WEIGHT, BODY_WEIGHT, match]
+        if kind:
+            sql += " AND d.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        return self._all(sql, params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query an exported registry database")
+    parser.add_argument("--db", help=f"Database path (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    search = sub.add_parser("search", help="Full-text search over markdown")
+    search.add_argument("query")
+    search.add_argument("--kind", choices=DOCUMENT_KINDS)
+    search.add_argument("--limit", type=int, default=20)
+    agent = sub.add_parser("agent", help="Show one agent as JSON")
+    agent.add_argument("agent_id")
+    args = parser.parse_args()
+
+    try:
+        with RegistryDB(args.db) as db:
+            if args.command == "agent":
+                found = db.agent(args.agent_id)
+                if found is None:
+                    print(f"❌ Agent '{args.agent_id}' not found")
+                    return 1
+                found["history"] = db.history(args.agent_id)
+                found["swarms"] = db.swarms_with(args.agent_id)
+                print(json.dumps(found, indent=2))
+                return 0
+            results = db.search(args.query, kind=args.kind, limit=args.limit)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    for result in results:
+        print(f"{result['kind']:9} {result['path']}")
+        print(f"          {result['snippet']}")
+    print(f"\n🔎 {len(results)} result(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
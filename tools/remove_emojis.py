@@ -1,12 +1,30 @@
 #!/usr/bin/env python3
 """
-Remove emoji characters from text files in specified directories.
+Remove emoji characters from markdown files in specified directories.
+
+Files are scanned in parallel across a process pool. A byte-level prefilter
+rejects files that cannot contain an emoji (pure ASCII, or no UTF-8 lead
+sequence of a covered block) without decoding them; only candidates are
+decoded, and they are streamed in chunks so memory stays flat however large a
+file is. Rewrites go to a temporary file that atomically replaces the
+original.
+
+Usage:
+    python tools/remove_emojis.py agents templates knowledge [--jobs N]
+    python tools/remove_emojis.py agents --check     # exit 1 if any emoji is found
 """
 import os
 import re
 import argparse
+import codecs
+import mmap
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import profiling
+
 # Regex for emojis and various symbol blocks often used as emojis
 # This is a broad range to catch most common emojis while trying to preserve useful symbols.
 # Ranges covered:
@@ -30,43 +48,142 @@ EMOJI_PATTERN = re.compile(
     "]+", flags=re.UNICODE
 )
 
-def remove_emojis_from_file(file_path):
+# UTF-8 prefixes of every range above: U+1Fxxx starts F0 9F, U+2600-27BF
+# starts E2 98..9E, U+FE0F is EF B8 8F. No match means no emoji.
+EMOJI_BYTES = re.compile(rb"\xf0\x9f|\xe2[\x98-\x9e]|\xef\xb8\x8f")
+
+CHUNK_SIZE = 1 << 20
+
+
+def _candidate(file_path):
+    """Return (size, whether the file may contain an emoji) without decoding it."""
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0, False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return size, EMOJI_BYTES.search(data) is not None
+
+
+def _chunks(f):
+    """Yield decoded text from a binary file, CHUNK_SIZE bytes at a time."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        raw = f.read(CHUNK_SIZE)
+        text = decoder.decode(raw, final=not raw)
+        if text:
+            yield text
+        if not raw:
+            return
+
+
+def count_emojis(file_path):
+    """Count emoji runs in a file."""
+    with open(file_path, "rb") as f:
+        return sum(len(EMOJI_PATTERN.findall(text)) for text in _chunks(f))
+
+
+def rewrite_without_emojis(file_path):
+    """Stream a file through the emoji filter and atomically replace it if anything changed.
+
+    Returns the number of emoji runs removed.
+    """
+    path = Path(file_path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    removed = 0
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            
-        new_content = EMOJI_PATTERN.sub("", content)
-        
-        if content != new_content:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(new_content)
-            print(f"cleaned: {file_path}")
-            return True
-        return False
-    except Exception as e:
-        print(f"error processing {file_path}: {e}")
-        return False
+        with open(path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            for text in _chunks(src):
+                text, n = EMOJI_PATTERN.subn("", text)
+                removed += n
+                dst.write(text.encode("utf-8"))
+        if removed:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+            os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return removed
 
-def main():
-    parser = argparse.ArgumentParser(description="Remove emojis from markdown files")
-    parser.add_argument("directories", nargs="+", help="Directories to scan")
-    args = parser.parse_args()
-    
-    count = 0
-    for dirname in args.directories:
+
+def scan_file(file_path, check=False):
+    """Return (path, bytes scanned, emoji runs, prefiltered, error) for one file."""
+    try:
+        size, candidate = _candidate(file_path)
+        if not candidate:
+            return file_path, size, 0, True, None
+        with profiling.span("check" if check else "rewrite", file=str(file_path)):
+            found = count_emojis(file_path) if check else rewrite_without_emojis(file_path)
+        return file_path, size, found, False, None
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return file_path, 0, 0, False, str(e)
+
+
+def _scan_check(file_path):
+    return scan_file(file_path, check=True)
+
+
+def find_markdown(directories):
+    """Yield .md files under the given directories (or the files themselves)."""
+    for dirname in directories:
         path = Path(dirname)
         if not path.exists():
             print(f"Skipping non-existent directory: {dirname}")
             continue
-            
+        if path.is_file():
+            yield str(path)
+            continue
         for root, _, files in os.walk(path):
             for file in files:
                 if file.endswith(".md"):
-                    file_path = os.path.join(root, file)
-                    if remove_emojis_from_file(file_path):
-                        count += 1
-                        
-    print(f"\n✨ Cleaned emojis from {count} files.")
+                    yield os.path.join(root, file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove emojis from markdown files")
+    parser.add_argument("directories", nargs="+", help="Directories to scan")
+    parser.add_argument("--check", action="store_true", help="Only report files with emojis; exit 1 if any")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker processes (default: CPU count)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.configure(args)
+
+    started = time.perf_counter()
+    jobs = args.jobs or os.cpu_count() or 1
+    worker = _scan_check if args.check else scan_file
+    paths = list(find_markdown(args.directories))
+    if jobs == 1:
+        results = map(worker, paths)
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(worker, paths, chunksize=max(1, min(256, len(paths) // (jobs * 4))))
+
+    count = scanned = skipped = errors = 0
+    with profiling.span("scan", files=len(paths), jobs=jobs):
+        for file_path, size, found, prefiltered, error in results:
+            scanned += size
+            skipped += prefiltered
+            if error:
+                errors += 1
+                print(f"error processing {file_path}: {error}")
+            elif found:
+                count += 1
+                print(f"{'emojis' if args.check else 'cleaned'}: {file_path} ({found})")
+    if jobs != 1:
+        pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    rate = scanned / elapsed / 1e6 if elapsed else 0.0
+    print(f"\n⏱️  {len(paths)} files, {scanned / 1e6:.1f} MB in {elapsed:.2f}s ({rate:.0f} MB/s), "
+          f"{skipped} skipped by prefilter, {jobs} workers")
+    if args.check:
+        if count:
+            print(f"❌ Emojis found in {count} files.")
+        else:
+            print("✅ No emojis found.")
+        return 1 if count or errors else 0
+    print(f"✨ Cleaned emojis from {count} files.")
+    return 1 if errors else 0
 
 if __name__ == "__main__":
-    main()
+    exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Prebuilt, sharded full-text search index for the docs site.
+
+build_docs.py hands every page to build_index(), which tokenizes its title,
+keywords (capabilities, use cases, ...) and markdown body into weighted term
+scores and writes:
+
+    search/meta.json            shard and document-chunk file names
+    search/<xy>.<hash>.json     postings for every term starting with "xy"
+    search/docs-<n>.<hash>.json url/title/kind for a chunk of documents
+
+Postings are flat [doc gap, score, doc gap, score, ...] lists. The page script
+(SCRIPT below, served as assets/search.<hash>.js) fetches meta.json, then
+only the shards for the typed terms and the document chunks of the top
+results, so the browser never downloads the corpus. Shards and chunks are
+content-addressed and can be cached forever. Term scores per page are cached
+in .agents-md/cache/search-terms.pickle keyed by the page's content hash.
+
+Usage:
+    from search_index import build_index
+
+    files = build_index([(url, title, kind, {"title": ..., "keywords": ..., "body": ...})])
+"""
+
+import json
+import pickle
+import re
+from collections import Counter
+
+from registry import PROJECT_ROOT, atomic_write, cache_dir, content_hash
+
+# Bump when tokenization, scoring or the file layout changes.
+INDEX_VERSION = 1
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "an and are as at be by for from in is it of on or that the this to with you your".split()
+)
+FIELD_WEIGHTS = {"title": 10, "keywords": 5, "body": 1}
+# A term repeated throughout a long document should not drown out a title hit.
+TF_CAP = 10
+SHARD_PREFIX = 2
+DOC_CHUNK = 500
+SEARCH_DIR = "search"
+META_FILE = f"{SEARCH_DIR}/meta.json"
+
+
+def tokenize(text):
+    """Split text into lowercase alphanumeric search terms."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def term_scores(fields):
+    """Return {term: score} for a document's weighted fields."""
+    scores = {}
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for term, count in Counter(tokenize(text)).items():
+            scores[term] = scores.get(term, 0) + weight * min(count, TF_CAP)
+    return scores
+
+
+def _load_cache(root):
+    try:
+        with open(cache_dir(root) / "search-terms.pickle", "rb") as f:
+            stored = pickle.load(f)
+        if stored.get("version") == INDEX_VERSION:
+            return stored["terms"]
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError):
+        pass
+    return {}
+
+
+def _dump(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _addressed(stem, data):
+    return f"{SEARCH_DIR}/{stem}.{content_hash(data)[:12]}.json"
+
+
+def build_index(documents, root=None):
+    """Build the search files for [(url, title, kind, fields)].
+
+    Returns {path relative to dist/: bytes}.
+    """
+    root = root or PROJECT_ROOT
+    cached = _load_cache(root)
+    terms_by_key = {}
+    shards = {}
+    for doc_id, (_, _, _, fields) in enumerate(documents):
+        key = content_hash(_dump(fields))
+        scores = cached.get(key)
+        if scores is None:
+            scores = term_scores(fields)
+        terms_by_key[key] = scores
+        for term, score in scores.items():
+            shard = shards.setdefault(term[:SHARD_PREFIX], {})
+            postings = shard.get(term)
+            if postings is None:
+                shard[term] = [doc_id, score]
+            else:
+                postings += (doc_id, score)
+    if terms_by_key.keys() != cached.keys():
+        payload = {"version": INDEX_VERSION, "terms": terms_by_key}
+        try:
+            atomic_write(cache_dir(root) / "search-terms.pickle",
+                         pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            pass
+
+    files = {}
+    meta = {"version": INDEX_VERSION, "count": len(documents), "chunk": DOC_CHUNK,
+            "shards": {}, "docs": []}
+    for prefix in sorted(shards):
+        shard = shards[prefix]
+        for term, postings in shard.items():
+            # Postings were appended in doc order; store doc ids as gaps.
+            previous = 0
+            for i in range(0, len(postings), 2):
+                postings[i], previous = postings[i] - previous, postings[i]
+        data = _dump(shard)
+        path = _addressed(prefix, data)
+        files[path] = data
+        meta["shards"][prefix] = path
+    for start in range(0, len(documents), DOC_CHUNK):
+        chunk = [[url, title, kind] for url, title, kind, _ in documents[start:start + DOC_CHUNK]]
+        data = _dump(chunk)
+        path = _addressed(f"docs-{start // DOC_CHUNK}", data)
+        files[path] = data
+        meta["docs"].append(path)
+    files[META_FILE] = _dump(meta)
+    return files
+
+
+SCRIPT = """\
+(function () {
+  var form = document.getElementById("search");
+  if (!form || !window.fetch) return;
+  var root = form.getAttribute("data-root") || "";
+  var input = form.querySelector("input");
+  var out = document.getElementById("search-results");
+  var cache = {};
+  var latest = 0;
+  var timer = null;
+  var stopwords = %(stopwords)s;
+
+  function get(path) {
+    if (!cache[path]) {
+      cache[path] = fetch(root + path).then(function (r) { return r.json(); });
+    }
+    return cache[path];
+  }
+
+  function tokens(text) {
+    return (text.toLowerCase().match(/[a-z0-9]+/g) || []).filter(function (t) {
+      return t.length > 1 && stopwords.indexOf(t) < 0;
+    });
+  }
+
+  // {doc id: score} for a term; the last query term also matches as a prefix.
+  function hits(meta, token, prefix) {
+    var file = meta.shards[token.slice(0, %(prefix)d)];
+    if (!file) return Promise.resolve({});
+    return get(file).then(function (shard) {
+      var found = {};
+      Object.keys(shard).forEach(function (term) {
+        if (term !== token && !(prefix && term.lastIndexOf(token, 0) === 0)) return;
+        var list = shard[term], doc = 0;
+        for (var i = 0; i < list.length; i += 2) {
+          doc += list[i];
+          found[doc] = Math.max(found[doc] || 0, list[i + 1]);
+        }
+      });
+      return found;
+    });
+  }
+
+  function render(results) {
+    out.textContent = "";
+    results.forEach(function (r) {
+      var li = document.createElement("li");
+      var a = document.createElement("a");
+      a.href = root + r[0];
+      a.textContent = r[1];
+      var kind = document.createElement("span");
+      kind.className = "badge";
+      kind.textContent = r[2];
+      li.appendChild(a);
+      li.appendChild(kind);
+      out.appendChild(li);
+    });
+    if (!results.length && input.value.trim()) {
+      out.textContent = "No results";
+    }
+  }
+
+  function search(query) {
+    var seq = ++latest;
+    var terms = tokens(query);
+    if (!terms.length) { render([]); return; }
+    get("%(meta)s").then(function (meta) {
+      var lookups = terms.map(function (t, i) { return hits(meta, t, i === terms.length - 1); });
+      return Promise.all(lookups).then(function (lists) {
+        var scores = lists[0];
+        lists.slice(1).forEach(function (found) {
+          var both = {};
+          Object.keys(scores).forEach(function (doc) {
+            if (doc in found) both[doc] = scores[doc] + found[doc];
+          });
+          scores = both;
+        });
+        var top = Object.keys(scores).map(Number).sort(function (a, b) {
+          return scores[b] - scores[a] || a - b;
+        }).slice(0, 20);
+        var chunks = top.map(function (doc) { return meta.docs[Math.floor(doc / meta.chunk)]; });
+        return Promise.all(chunks.map(get)).then(function (loaded) {
+          return top.map(function (doc, i) { return loaded[i][doc %% meta.chunk]; });
+        });
+      });
+    }).then(function (results) {
+      if (seq === latest) render(results);
+    });
+  }
+
+  form.addEventListener("submit", function (e) { e.preventDefault(); search(input.value); });
+  input.addEventListener("input", function () {
+    clearTimeout(timer);
+    timer = setTimeout(function () { search(input.value); }, 80);
+  });
+})();
+""" % {"prefix": SHARD_PREFIX, "meta": META_FILE, "stopwords": json.dumps(sorted(STOPWORDS))}
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server for the registry and the built docs site.
+
+A single-threaded asyncio server (no dependencies beyond the registry's):
+
+    /api/agents                  agent list (id, template, version, domain)
+    /api/agents/<id>             lineage, capabilities, version history, swarms
+    /api/templates[/<id>]        templates, with derived agents
+    /api/swarms[/<name>]         swarms
+    /api/find?can=X&tool=Y...    capability query (can, cannot, without, tool, domain)
+    /agents/<id>.md              raw agent markdown
+    /templates/<id>.md           raw template markdown
+    /knowledge/<path>.md         raw knowledge markdown
+    anything else                static files from dist/ (see build_docs.py)
+
+Every response is rendered once and kept in memory together with its gzip
+variant (dist/'s precompressed .gz files are used as-is); the MAX_CACHED
+most recently used responses are kept. Responses carry
+strong ETags and answer If-None-Match with 304. A watcher thread (inotify,
+or polling; see watch.py) drops cached responses when the files they were
+built from change, so nothing is stat'ed per request.
+
+Usage:
+    python tools/serve.py [--host 127.0.0.1] [--port 8420] [--poll] [--no-watch]
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import mimetypes
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import yaml
+
+from capability_index import load_index
+from models import load_model
+from registry import PROJECT_ROOT, content_hash
+from watch import make_watcher
+
+DEFAULT_PORT = 8420
+SERVED_DIRS = ("data", "agents", "templates", "knowledge", "dist")
+# Marks responses built from the data files; any data/ change drops them.
+DATA = "data"
+MAX_HEADER = 16 * 1024
+# Least recently used responses are dropped beyond this many; query strings and
+# unknown ids are unbounded, the registry is not.
+MAX_CACHED = 4096
+MIN_GZIP = 256
+COMPRESSIBLE = ("text/", "application/json", "application/javascript", "image/svg+xml")
+# build_docs.py names assets and search shards <name>.<12 hex>.<ext>; they never change.
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[a-z]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+FIND_FIELDS = ("can", "cannot", "without", "tool", "domain")
+
+
+_date = [0, ""]
+
+
+def http_date():
+    """The current Date header value, formatted at most once per second."""
+    now = int(time.time())
+    if _date[0] != now:
+        _date[:] = now, formatdate(now, usegmt=True)
+    return _date[1]
+
+
+def accepts_gzip(value):
+    """True if an Accept-Encoding header allows gzip."""
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            try:
+                return not (q.startswith("q=") and float(q[2:]) == 0)
+            except ValueError:
+                return False
+    return False
+
+
+def etag_matches(header, etag):
+    """True if an If-None-Match header lists etag (weak comparison, as RFC 9110 requires)."""
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+class Response:
+    """A rendered response and its lazily built gzip variant."""
+
+    __slots__ = ("status", "content_type", "body", "etag", "cache_control", "deps", "_gz")
+
+    def __init__(self, status, content_type, body, deps, cache_control=REVALIDATE, gz=None):
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+        self.etag = f'"{content_hash(body)[:32]}"'
+        self.cache_control = cache_control
+        self.deps = frozenset(deps)
+        self._gz = gz
+
+    def variant(self, gzip_ok):
+        """Return (body, etag, content encoding or None)."""
+        if gzip_ok and len(self.body) >= MIN_GZIP and self.content_type.startswith(COMPRESSIBLE):
+            if self._gz is None:
+                self._gz = gzip.compress(self.body, compresslevel=6, mtime=0)
+            if len(self._gz) < len(self.body):
+                return self._gz, self.etag[:-1] + '-gz"', "gzip"
+        return self.body, self.etag, None
+
+
+def _json(obj, deps=(DATA,), status=200):
+    body = json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+    return Response(status, "application/json", body, deps)
+
+
+def _not_found(message="not found", deps=(DATA,)):
+    return _json({"error": message}, deps, status=404)
+
+
+class Registry:
+    """Builds responses from the registry and caches them until their inputs change."""
+
+    def __init__(self, root=None):
+        self.root = Path(root or PROJECT_ROOT)
+        self.dist = self.root / "dist"
+        self.cache = OrderedDict()
+        self._model = None
+        self._index = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = load_model(self.root)
+        return self._model
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = load_index(self.root)
+        return self._index
+
+    def invalidate(self, paths):
+        """Drop cached responses built from any of paths (None: everything)."""
+        if paths is None:
+            self.cache.clear()
+            self._model = self._index = None
+            return
+        paths = set(paths)
+        if any(p.startswith("data/") for p in paths):
+            paths.add(DATA)
+            self._model = self._index = None
+        for key, response in list(self.cache.items()):
+            if not response.deps.isdisjoint(paths):
+                del self.cache[key]
+
+    def get(self, target):
+        """Return the Response for a request target."""
+        response = self.cache.get(target)
+        if response is not None:
+            self.cache.move_to_end(target)
+            return response
+        response = self._build(target)
+        # Misses are only cached while the data files say they are misses.
+        if response.status == 200 or (response.status == 404 and DATA in response.deps):
+            self.cache[target] = response
+            if len(self.cache) > MAX_CACHED:
+                self.cache.popitem(last=False)
+        return response
+
+    def _build(self, target):
+        url = urlsplit(target)
+        path = unquote(url.path)
+        parts = [p for p in path.split("/") if p]
+        try:
+            if parts[:1] == ["api"]:
+                return self._api(parts[1:], parse_qs(url.query))
+            if len(parts) >= 2 and parts[0] in ("agents", "templates", "knowledge") and path.endswith(".md"):
+                return self._markdown(parts[0], "/".join(parts[1:])[:-len(".md")])
+            return self._static(path)
+        except (OSError, yaml.YAMLError) as e:
+            return _json({"error": str(e)}, deps=(), status=500)
+        except Exception as e:
+            # A malformed but parseable data file; keep serving other requests.
+            print(f"❌ Error building {target}:", file=sys.stderr)
+            traceback.print_exc()
+            return _json({"error": f"{type(e).__name__}: {e}"}, deps=(), status=500)
+
+    def _api(self, parts, query):
+        model = self.model
+        if len(parts) > 2:
+            return _not_found()
+        kind, key = (parts + [None, None])[:2]
+        if kind is None:
+            return _json({"endpoints": ["/api/agents", "/api/templates", "/api/swarms", "/api/find"]})
+        if kind == "agents" and key is None:
+            return _json([
+                {"id": a.id, "parent_template": a.parent_template, "derivation_type": a.derivation_type,
+                 "current_version": model.current_version(a.id, None), "domain": a.domain}
+                for a in model.agents.values()
+            ])
+        if kind == "agents":
+            agent = model.agents.get(key)
+            if agent is None:
+                return _not_found(f"agent '{key}' not found")
+            caps = model.capabilities.get(key)
+            history = model.versions.get(key)
+            return _json({
+                "id": agent.id, "path": agent.path, "parent_template": agent.parent_template,
+                "derivation_type": agent.derivation_type, "domain": agent.domain,
+                "metadata": agent.metadata,
+                "capabilities": {
+                    "can_do": caps.can_do, "cannot_do": caps.cannot_do,
+                    "tools_required": caps.tools_required, "domain_expertise": caps.domain_expertise,
+                } if caps else None,
+                "current_version": history.current_version if history else None,
+                "versions": [
+                    {"version": e.version, "date": e.date, "changes": e.changes,
+                     "template_version": e.template_version}
+                    for e in (history.entries if history else ())
+                ],
+                "swarms": [s.name for s in model.swarms_with(key)],
+            })
+        if kind == "templates" and key is None:
+            return _json([{"id": t.id, "category": t.category, "description": t.description}
+                          for t in model.templates.values()])
+        if kind == "templates":
+            template = model.templates.get(key)
+            if template is None:
+                return _not_found(f"template '{key}' not found")
+            return _json({"id": template.id, "path": template.path, "category": template.category,
+                          "description": template.description,
+                          "agents": [a.id for a in model.children_of(key)]})
+        if kind == "swarms" and key is None:
+            return _json([{"name": s.name, "description": s.description, "agents": s.agents}
+                          for s in model.swarms.values()])
+        if kind == "swarms":
+            swarm = model.swarms.get(key)
+            if swarm is None:
+                return _not_found(f"swarm '{key}' not found")
+            return _json({"name": swarm.name, "description": swarm.description, "agents": swarm.agents,
+                          "orchestrator": swarm.orchestrator, "use_cases": swarm.use_cases})
+        if kind == "find" and key is None:
+            terms = {field: query.get(field, ()) for field in FIND_FIELDS}
+            matches = self.index.query(terms["can"], terms["cannot"], terms["without"],
+                                       terms["tool"], terms["domain"])
+            return _json({"query": terms, "agents": matches})
+        return _not_found()
+
+    def _markdown(self, kind, name):
+        model = self.model
+        if kind == "agents":
+            entity = model.agents.get(name)
+        elif kind == "templates":
+            entity = model.templates.get(name)
+        else:
+            entity = None
+        if entity is not None:
+            rel = entity.path
+        elif kind == "knowledge":
+            rel = f"knowledge/{name}.md"
+        else:
+            return _not_found(f"{kind[:-1]} '{name}' not found")
+        path = (self.root / rel).resolve()
+        if not path.is_relative_to(self.root.resolve() / kind) or not path.is_file():
+            return _not_found(deps=())
+        return Response(200, "text/markdown; charset=utf-8", path.read_bytes(), (rel, DATA))
+
+    def _static(self, path):
+        rel = path.lstrip("/")
+        file = (self.dist / rel).resolve()
+        dist = self.dist.resolve()
+        if not file.is_relative_to(dist):
+            return _not_found(deps=())
+        if file.is_dir():
+            file = file / "index.html"
+            rel = f"{rel.rstrip('/')}/index.html".lstrip("/")
+        try:
+            body = file.read_bytes()
+        except OSError:
+            return _not_found(deps=())
+        try:
+            gz = file.with_name(file.name + ".gz").read_bytes()
+        except OSError:
+            gz = None
+        content_type = mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        cache_control = IMMUTABLE if HASHED_NAME_RE.search(file.name) else REVALIDATE
+        deps = (f"dist/{rel}", f"dist/{rel}.gz")
+        return Response(200, content_type, body, deps, cache_control, gz)
+
+
+class HTTPProtocol(asyncio.Protocol):
+    """Minimal HTTP/1.1 with keep-alive and pipelining; GET and HEAD only."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.transport = None
+        self.buffer = b""
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.buffer += data
+        while True:
+            end = self.buffer.find(b"\r\n\r\n")
+            if end < 0:
+                if len(self.buffer) > MAX_HEADER:
+                    self._error(431)
+                return
+            head, self.buffer = self.buffer[:end], self.buffer[end + 4:]
+            if not self._handle(head):
+                return
+
+    def _error(self, status):
+        body = f"{status} {REASONS[status]}\n".encode()
+        self.transport.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: text/plain\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        self.transport.close()
+        self.buffer = b""
+
+    def _handle(self, head):
+        """Answer one request; return False once the connection is closing."""
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ")
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except ValueError:
+            self._error(400)
+            return False
+        if method not in ("GET", "HEAD"):
+            self._error(405)
+            return False
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        response = self.registry.get(target)
+        body, etag, encoding = response.variant(accepts_gzip(headers.get("accept-encoding", "")))
+        status = response.status
+        inm = headers.get("if-none-match")
+        if inm and status == 200 and etag_matches(inm, etag):
+            status, body = 304, b""
+        out = [
+            f"HTTP/1.1 {status} {REASONS[status]}",
+            f"Date: {http_date()}",
+            f"ETag: {etag}",
+            f"Cache-Control: {response.cache_control}",
+            "Vary: Accept-Encoding",
+        ]
+        if status != 304:
+            out += [f"Content-Type: {response.content_type}", f"Content-Length: {len(body)}"]
+            if encoding:
+                out.append(f"Content-Encoding: {encoding}")
+        if not keep_alive:
+            out.append("Connection: close")
+        self.transport.write("\r\n".join(out).encode("latin-1") + b"\r\n\r\n"
+                             + (body if method == "GET" else b""))
+        if not keep_alive:
+            self.transport.close()
+            return False
+        return True
+
+
+def _watch(registry, loop, poll, stop):
+    """Watcher thread: forward changed paths to the event loop."""
+    watcher = make_watcher(registry.root, poll, dirs=SERVED_DIRS)
+    try:
+        while not stop.is_set():
+            changed = watcher.read(1.0)
+            if changed is not None:
+                changed = {p for p in changed if not os.path.basename(p).startswith(".")}
+            if changed is None or changed:
+                loop.call_soon_threadsafe(registry.invalidate, changed)
+    finally:
+        watcher.close()
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, root=None, watch=True, poll=False):
+    """Run the server until cancelled."""
+    registry = Registry(root)
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: HTTPProtocol(registry), host, port, reuse_address=True)
+    stop = threading.Event()
+    if watch:
+        threading.Thread(target=_watch, args=(registry, loop, poll, stop), daemon=True).start()
+    bound = server.sockets[0].getsockname()
+    print(f"🌐 Serving {registry.root} on http://{bound[0]}:{bound[1]}/ "
+          f"({'watching for changes' if watch else 'not watching'}). Ctrl-C to stop.", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the registry and docs over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--poll", action="store_true", help="Poll for changes instead of using inotify")
+    parser.add_argument("--no-watch", action="store_true", help="Never invalidate cached responses")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, watch=not args.no_watch, poll=args.poll))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped.")
+    except OSError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Show repository statistics: counts, agents by template and version, swarms.
+
+Usage:
+    python tools/stats.py
+"""
+
+from pathlib import Path
+
+from models import load_model
+from registry import PROJECT_ROOT
+
+
+def print_stats(root=None):
+    """Print the statistics tables for the registry at root."""
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.table import Table
+
+    root = Path(root or PROJECT_ROOT)
+    console = Console()
+
+    # Load data
+    model = load_model(root)
+
+    # Header
+    console.print("\n[bold cyan]🤖 Agent Knowledge System Statistics[/bold cyan]\n", justify="center")
+
+    # Overview stats
+    overview = Table(show_header=False, box=None)
+    overview.add_column("Metric", style="cyan")
+    overview.add_column("Value", justify="right", style="green bold")
+
+    n_templates = len(model.templates)
+    n_agents = len(model.agents)
+    n_knowledge = len(list((root / "knowledge").glob("*.md")))
+    n_swarms = len(model.swarms)
+
+    overview.add_row("📋 Templates", str(n_templates))
+    overview.add_row("🤖 Agents", str(n_agents))
+    overview.add_row("📚 Knowledge Docs", str(n_knowledge))
+    overview.add_row("🌐 Swarms", str(n_swarms))
+
+    console.print(Panel(overview, title="[bold]Overview[/bold]", border_style="cyan"))
+
+    # Agents by category
+    agents_table = Table(title="[bold]Agents by Category[/bold]", show_lines=True)
+    agents_table.add_column("Agent", style="cyan")
+    agents_table.add_column("Template", style="yellow")
+    agents_table.add_column("Version", justify="center", style="green")
+
+    for agent in model.agents.values():
+        ver = model.current_version(agent.id)
+        agents_table.add_row(agent.id, agent.parent_template, ver)
+
+    console.print("\n", agents_table)
+
+    # Swarms
+    swarms_table = Table(title="[bold]Pre-defined Swarms[/bold]", show_lines=True)
+    swarms_table.add_column("Swarm", style="cyan")
+    swarms_table.add_column("Agents", style="yellow")
+    swarms_table.add_column("Use Cases", style="magenta")
+
+    for swarm in model.swarms.values():
+        agents = ", ".join(swarm.agents)
+        use_cases = ", ".join(swarm.use_cases[:2])  # First 2
+        swarms_table.add_row(swarm.name, agents, use_cases)
+
+    console.print("\n", swarms_table)
+    console.print()
+
+
+def main():
+    print_stats()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
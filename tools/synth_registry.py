@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic registry of realistic shape at any scale.
+
+Writes templates, agents rendered from them, the four data files, deep
+version histories, swarms with a compatibility matrix and a nested
+knowledge tree into an output directory. By default the current tools/ are
+copied alongside, so every tool can be run against the synthetic registry
+exactly as in a checkout (the tools locate the registry from their own
+path). The output is deterministic for a given seed and passes validation.
+
+Used by bench.py; also handy for trying a change at 10k agents by hand.
+
+Usage:
+    python tools/synth_registry.py OUTPUT --agents 1000 [--templates N] [--versions N]
+                                   [--knowledge N] [--seed S] [--no-tools]
+"""
+
+import argparse
+import json
+import random
+import shutil
+import time
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+
+CATEGORIES = ("software-development", "documentation", "management", "security", "data")
+DERIVATION_TYPES = ("implementation", "specialization", "specialized_branch")
+DOMAINS = (
+    "python", "golang", "rust", "typescript", "java", "kotlin", "swift", "terraform", "kubernetes",
+    "aws", "gcp", "azure", "postgres", "kafka", "spark", "react", "vue", "django", "fastapi", "graphql",
+)
+ROLES = (
+    "backend developer", "frontend developer", "devops engineer", "security auditor", "test engineer",
+    "api designer", "data scientist", "technical writer", "site reliability engineer", "architect",
+)
+WORDS = (
+    "design", "review", "latency", "throughput", "contract", "schema", "deploy", "rollback", "observe",
+    "trace", "cache", "index", "migrate", "audit", "threat", "model", "test", "document", "refactor",
+    "profile", "queue", "retry", "budget", "incident", "runbook", "release", "pipeline", "token",
+)
+EMOJI = ("🚀", "✅", "⚠️", "🔒", "📊", "🧠")
+
+
+def _sentence(rng, words=12):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _bullets(rng, n, emoji=False):
+    lines = []
+    for _ in range(n):
+        mark = f"{rng.choice(EMOJI)} " if emoji and rng.random() < 0.2 else ""
+        lines.append(f"- {mark}**{rng.choice(WORDS).title()}**: {_sentence(rng, rng.randint(6, 16))}")
+    return "\n".join(lines)
+
+
+def template_markdown(rng, role, sections):
+    """A template in the house layout, with domain placeholders."""
+    parts = [
+        f"# {{{{DOMAIN}}}} {role.title()} Agent",
+        f"You are an expert {role.title()} specializing in {{{{DOMAIN}}}}. {_sentence(rng, 20)}",
+        "## Cognitive Architecture",
+        "### 1. System of Thought (Cognitive v2)",
+        _bullets(rng, 4),
+        "### 2. Artifact Protocol",
+        _bullets(rng, 3),
+        "## Core Principles",
+    ]
+    for i in range(sections):
+        parts += [f"### {i + 1}. {rng.choice(WORDS).title()} and {rng.choice(WORDS).title()}",
+                  _bullets(rng, rng.randint(3, 7), emoji=True)]
+    parts += [
+        "## {{DOMAIN}} Specific Guidelines",
+        _bullets(rng, 4),
+        "```{{domain}}\n# example for {{domain}}\nrun --" + rng.choice(WORDS) + "\n```",
+    ]
+    return "\n\n".join(parts) + "\n"
+
+
+def knowledge_markdown(rng, title, sections):
+    parts = [f"# {title}", _sentence(rng, 30)]
+    for i in range(sections):
+        parts += [f"## {i + 1}. {rng.choice(WORDS).title()}", _sentence(rng, 40), _bullets(rng, 5, emoji=True)]
+        if rng.random() < 0.3:
+            parts.append(f"```yaml\n{rng.choice(WORDS)}: {rng.randint(1, 100)}\n```")
+    return "\n\n".join(parts) + "\n"
+
+
+def _q(value):
+    """A YAML double-quoted scalar (JSON strings are valid YAML)."""
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _render(template, domain):
+    return template.replace("{{DOMAIN}}", domain.title()).replace("{{domain}}", domain)
+
+
+def _vocab(prefix, n):
+    return [f"{prefix}_{i}" for i in range(n)]
+
+
+def generate(output, agents=1000, templates=None, versions=8, knowledge=None, seed=0, tools=True):
+    """Write a synthetic registry to output. Returns a summary of its size."""
+    rng = random.Random(seed)
+    out = Path(output)
+    n_templates = templates or max(4, agents // 25)
+    n_knowledge = knowledge if knowledge is not None else max(10, agents // 10)
+    for sub in ("agents", "data", "templates", "knowledge"):
+        (out / sub).mkdir(parents=True, exist_ok=True)
+
+    lineage = ["format_version: 1.0", "last_updated: 2025-12-14", "", "templates:"]
+    template_ids, template_text = [], {}
+    for i in range(n_templates):
+        role = ROLES[i % len(ROLES)]
+        template_id = f"{role.replace(' ', '-')}-{i}"
+        category = CATEGORIES[i % len(CATEGORIES)]
+        path = f"templates/{category}/{template_id}.md"
+        template_text[template_id] = template_markdown(rng, role, rng.randint(3, 8))
+        (out / path).parent.mkdir(parents=True, exist_ok=True)
+        (out / path).write_text(template_text[template_id])
+        template_ids.append(template_id)
+        lineage += [f"  - id: {template_id}", f"    path: {path}", f"    description: Generic {role.title()}",
+                    f"    category: {category}", ""]
+
+    caps_vocab = {
+        "can_do": _vocab("can", max(50, agents // 4)),
+        "cannot_do": _vocab("cannot", 40),
+        "tools_required": _vocab("tool", 60),
+    }
+    capabilities = ["format_version: 1.0", "", "agents:"]
+    history = ["format_version: 1.0", "", "agents:"]
+    lineage.append("agents:")
+    agent_ids = []
+    for i in range(agents):
+        parent = rng.choice(template_ids)
+        domain = DOMAINS[i % len(DOMAINS)]
+        agent_id = f"{domain}-{parent}-{i}"
+        path = f"agents/AGENTS.{agent_id}.md"
+        (out / path).write_text(_render(template_text[parent], domain))
+        agent_ids.append(agent_id)
+        lineage += [f"  - id: {agent_id}", f"    path: {path}", "    lineage:",
+                    f"      parent_template: {parent}",
+                    f"      derivation_type: {rng.choice(DERIVATION_TYPES)}",
+                    "    metadata:", f"      stack: [{domain}, {rng.choice(WORDS)}]",
+                    "      cognitive_architecture: true",
+                    "    generation_parameters:", f"      domain: {domain}", ""]
+
+        capabilities.append(f"  {agent_id}:")
+        for field, vocab in caps_vocab.items():
+            capabilities.append(f"    {field}:")
+            capabilities += [f"      - {value}" for value in rng.sample(vocab, rng.randint(3, 8))]
+        capabilities += ["    domain_expertise:", f"      - {domain}", ""]
+
+        depth = rng.randint(1, versions * 2 - 1) if versions > 1 else 1
+        entries = [f"1.{n}.0" for n in range(depth)]
+        history += [f"  {agent_id}:", f"    current_version: {entries[-1]}", "    versions:"]
+        for n, version in enumerate(entries):
+            history += [f"      - version: {version}", f"        date: 2025-{1 + n % 12:02d}-{1 + n % 28:02d}",
+                        f"        changes: {_q(_sentence(rng, 8))}",
+                        f"        template_version: {parent}@1.{n}"]
+        history.append("")
+
+    swarms = ["format_version: 1.0", "", "swarms:"]
+    for i in range(max(1, agents // 20)):
+        members = rng.sample(agent_ids, min(len(agent_ids), rng.randint(2, 6)))
+        swarms += [f"  - name: swarm-{i}", f"    description: {_q(_sentence(rng, 6))}", "    agents:"]
+        swarms += [f"      - {m}" for m in members]
+        swarms += [f"    orchestrator: {rng.choice(template_ids)}", "    use_cases:",
+                   f"      - {rng.choice(WORDS)}_{rng.choice(WORDS)}", ""]
+    swarms.append("compatibility_matrix:")
+    for kind, n in (("compatible", agents // 10), ("conflicting", agents // 50)):
+        swarms.append(f"  {kind}:")
+        if len(agent_ids) > 1:
+            swarms += [f"    - [{', '.join(rng.sample(agent_ids, 2))}]" for _ in range(max(1, n))]
+
+    for name, lines in (("lineage", lineage), ("capabilities", capabilities),
+                        ("versions", history), ("swarms", swarms)):
+        (out / "data" / f"{name}.yaml").write_text("\n".join(lines).rstrip() + "\n")
+
+    for i in range(n_knowledge):
+        area, topic = WORDS[i % 7], WORDS[(i // 7) % len(WORDS)]
+        path = out / "knowledge" / area / topic / f"{rng.choice(WORDS)}-{i}.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(knowledge_markdown(rng, f"{area.title()} {topic.title()} {i}", rng.randint(3, 10)))
+
+    if tools:
+        (out / "tools").mkdir(exist_ok=True)
+        for source in TOOLS_DIR.glob("*.py"):
+            shutil.copy2(source, out / "tools" / source.name)
+
+    return {
+        "agents": agents,
+        "templates": n_templates,
+        "versions": sum(line.startswith("      - version:") for line in history),
+        "knowledge": n_knowledge,
+        "swarms": max(1, agents // 20),
+        "seed": seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic registry")
+    parser.add_argument("output", help="Directory to write (created if missing)")
+    parser.add_argument("--agents", type=int, default=1000, help="Number of agents (default: 1000)")
+    parser.add_argument("--templates", type=int, help="Number of templates (default: agents / 25, at least 4)")
+    parser.add_argument("--versions", type=int, default=8, help="Mean history depth per agent (default: 8)")
+    parser.add_argument("--knowledge", type=int, help="Knowledge documents (default: agents / 10, at least 10)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--no-tools", action="store_true", help="Do not copy tools/ into the output")
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    if output.exists() and any(output.iterdir()):
+        print(f"❌ Error: {output} is not empty")
+        return 1
+    started = time.perf_counter()
+    summary = generate(output, args.agents, args.templates, args.versions, args.knowledge, args.seed,
+                       tools=not args.no_tools)
+    print(f"🧪 Generated {summary['agents']} agents, {summary['templates']} templates, "
+          f"{summary['versions']} versions and {summary['knowledge']} knowledge docs in {output} "
+          f"({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
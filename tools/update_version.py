@@ -1,60 +1,358 @@
 #!/usr/bin/env python3
 """
-Update the version history for an agent.
+Update the version history for one or more agents.
+
+versions.yaml is edited in place: each agent's current_version line is
+rewritten and the new entry is inserted after its last version, so comments,
+quoting and layout elsewhere in the file are untouched. With the sharded
+layout (see versions_layout.py) the entry goes into the agent's shard and
+the head index's current_version/template_version lines are updated.
+
+A batch is applied under an advisory lock (.agents-md/versions.lock) and
+written atomically, so concurrent runs updating different agents do not
+overwrite each other; if any update in a batch is invalid, nothing is written.
+
+template_version is filled in as "<parent template>@<version>", using the
+agent's parent template from lineage.yaml and the newest version of that
+template already recorded in versions.yaml.
 
 Usage:
     python tools/update_version.py <agent_name> <new_version> <change_description>
+    python tools/update_version.py --entry AGENT VERSION CHANGES [--entry ...]
+    python tools/update_version.py --batch updates.yaml
 
 Example:
     python tools/update_version.py python-backend 1.2.0 "Added async support"
+
+A batch file is a YAML (or JSON) list of mappings with agent, version,
+changes and optionally template_version and date; "-" reads it from stdin.
+Each value is a single scalar: write multi-line changes as one string
+(e.g. a `|` block), not a list.
 """
 
 import argparse
-import yaml
-from pathlib import Path
+import fcntl
+import json
+import re
+import sys
+from contextlib import contextmanager
 from datetime import date
+from pathlib import Path
+
+import yaml
+
+import profiling
+from models import load_model
+from registry import (
+    SafeLoader, atomic_write, invalidate, is_sharded, parse_yaml, shard_filename, state_dir,
+)
 
 PROJECT_ROOT = Path(__file__).parent.parent
 VERSIONS_FILE = PROJECT_ROOT / "data" / "versions.yaml"
+LOCK_FILE = state_dir(PROJECT_ROOT) / "versions.lock"
+
+TEMPLATE_VERSION_RE = re.compile(r"^([A-Za-z0-9_.-]+)@(\d+(?:\.\d+)*)$")
+ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+DEFAULT_TEMPLATE_VERSION = "1.0"
+# Keys of a version entry; each holds one scalar (see the versions.yaml schema).
+ENTRY_FIELDS = ("agent", "version", "date", "changes", "template_version")
+
+
+@contextmanager
+def versions_lock():
+    """Hold an exclusive advisory lock on versions.yaml for a read-modify-write."""
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def latest_template_versions(data):
+    """Return {template id: newest version string} recorded in versions.yaml.
+
+    With sharded history, the head index's per-agent template_version is used.
+    """
+    latest = {}
+    for history in (data.get("agents") or {}).values():
+        history = history or {}
+        for entry in history.get("versions") or [history]:
+            match = TEMPLATE_VERSION_RE.match(str((entry or {}).get("template_version", "")))
+            if not match:
+                continue
+            template_id, version = match.groups()
+            key = tuple(int(part) for part in version.split("."))
+            if template_id not in latest or key > latest[template_id][0]:
+                latest[template_id] = (key, version)
+    return {template_id: version for template_id, (_, version) in latest.items()}
+
+
+def template_version_for(agent_name, model, latest):
+    """Return "<parent template>@<version>" for an agent."""
+    template_id = model.agent(agent_name).parent_template
+    return f"{template_id}@{latest.get(template_id, DEFAULT_TEMPLATE_VERSION)}"
+
+
+def yaml_scalar(value):
+    """Render a string as a YAML scalar, quoting only when a plain scalar would not round-trip."""
+    value = str(value)
+    try:
+        if value and parse_yaml(value) == value and "\n" not in value:
+            return value
+    except yaml.YAMLError:
+        pass
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _mapping_value(node, key):
+    for key_node, value_node in node.value:
+        if key_node.value == key:
+            return key_node, value_node
+    return None, None
+
+
+def _last_line(node):
+    """Return the index of the line after the last line of a node's content."""
+    while not isinstance(node, yaml.ScalarNode):
+        if isinstance(node, yaml.MappingNode) and node.value:
+            node = node.value[-1][1]
+        elif isinstance(node, yaml.SequenceNode) and node.value:
+            node = node.value[-1]
+        else:
+            break
+    end = node.end_mark
+    # Block scalars end at column 0 of the following line.
+    return end.line if end.column == 0 else end.line + 1
+
+
+def render_entry(entry, dash, indent):
+    """Render one version entry as block-mapping lines in the file's house style."""
+    lines = []
+    for i, (key, value) in enumerate(entry.items()):
+        if isinstance(value, (dict, list)):
+            raise ValueError(f"Version entry field '{key}' must be a single value, got {value!r}")
+        value = str(value)
+        if key == "changes":
+            rendered = json.dumps(value, ensure_ascii=False)
+        elif key == "date" and ISO_DATE_RE.match(value):
+            rendered = value  # a YAML date, as in the rest of the file
+        else:
+            rendered = yaml_scalar(value)
+        lines.append(f"{dash if i == 0 else indent}{key}: {rendered}\n")
+    return lines
+
+
+def _set_scalar(lines, node, value):
+    """Edit replacing a single-line scalar node's value, keeping any trailing comment."""
+    line_no = node.start_mark.line
+    line = lines[line_no]
+    prefix = line[:node.start_mark.column]
+    suffix = line[node.end_mark.column:] if node.end_mark.line == line_no else ""
+    return line_no, 1, [f"{prefix}{yaml_scalar(value)}{suffix.rstrip()}\n"]
+
+
+def _append_entries(lines, versions, entries, owner):
+    """Edit inserting entries after the last item of a block sequence node."""
+    if not isinstance(versions, yaml.SequenceNode) or not versions.value:
+        raise ValueError(f"'{owner}' needs a non-empty versions list")
+    if versions.flow_style:
+        raise ValueError(f"'{owner}' versions is a flow-style list; cannot edit in place")
+    first = versions.value[0]
+    dash = lines[first.start_mark.line][:first.start_mark.column]
+    indent = " " * first.start_mark.column
+    block = []
+    for entry in entries:
+        block.extend(render_entry(entry, dash, indent))
+    return _last_line(versions), 0, block
+
+
+def _agent_node(root, agent_name):
+    if not isinstance(root, yaml.MappingNode):
+        raise ValueError("versions.yaml is not a mapping")
+    _, agents = _mapping_value(root, "agents")
+    if not isinstance(agents, yaml.MappingNode):
+        raise ValueError("versions.yaml has no 'agents' mapping")
+    _, history = _mapping_value(agents, agent_name)
+    if not isinstance(history, yaml.MappingNode):
+        raise ValueError(f"Agent '{agent_name}' not found in versions.yaml")
+    return history
+
+
+def plan_edits(text, updates):
+    """Return [(line index, lines to remove, new lines)] for a flat versions.yaml."""
+    root = yaml.compose(text, Loader=SafeLoader)
+    lines = text.splitlines(keepends=True)
+    edits = []
+    for agent_name, entries in updates.items():
+        history = _agent_node(root, agent_name)
+        _, current = _mapping_value(history, "current_version")
+        if current is None:
+            raise ValueError(f"'{agent_name}' has no current_version")
+        edits.append(_set_scalar(lines, current, entries[-1]["version"]))
+        _, versions = _mapping_value(history, "versions")
+        edits.append(_append_entries(lines, versions, entries, agent_name))
+    return edits
+
+
+def plan_head_edits(text, updates):
+    """Return edits to current_version/template_version in a sharded head index."""
+    root = yaml.compose(text, Loader=SafeLoader)
+    lines = text.splitlines(keepends=True)
+    edits = []
+    for agent_name, entries in updates.items():
+        history = _agent_node(root, agent_name)
+        _, current = _mapping_value(history, "current_version")
+        if current is None:
+            raise ValueError(f"'{agent_name}' has no current_version")
+        edits.append(_set_scalar(lines, current, entries[-1]["version"]))
+        key, template = _mapping_value(history, "template_version")
+        if template is not None:
+            edits.append(_set_scalar(lines, template, entries[-1]["template_version"]))
+        else:
+            line = lines[current.start_mark.line]
+            indent = line[:len(line) - len(line.lstrip())]
+            value = yaml_scalar(entries[-1]["template_version"])
+            edits.append((current.start_mark.line + 1, 0, [f"{indent}template_version: {value}\n"]))
+    return edits
+
+
+def plan_shard_edits(text, agent_name, entries):
+    """Return edits appending entries to an agent's history shard."""
+    root = yaml.compose(text, Loader=SafeLoader)
+    if not isinstance(root, yaml.MappingNode):
+        raise ValueError(f"History shard of '{agent_name}' is not a mapping")
+    _, versions = _mapping_value(root, "versions")
+    return [_append_entries(text.splitlines(keepends=True), versions, entries, agent_name)]
+
+
+def apply_edits(text, edits):
+    """Apply line edits from the bottom of the file up so line numbers stay valid."""
+    lines = text.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    for line_no, remove, new_lines in sorted(edits, key=lambda e: e[0], reverse=True):
+        lines[line_no:line_no + remove] = new_lines
+    return "".join(lines)
+
+
+def update_versions(updates):
+    """Append version entries for many agents in one locked, atomic edit.
+
+    updates is a list of mappings with agent, version, changes and optionally
+    template_version and date. Returns the entries written. With sharded
+    history, each agent's shard is appended to and the head index updated
+    last.
+    """
+    model = load_model()
+    today = str(date.today())
+    with versions_lock():
+        with profiling.span("load", file="versions.yaml"):
+            text = VERSIONS_FILE.read_text()
+            data = parse_yaml(text) or {}
+            latest = latest_template_versions(data)
+        by_agent = {}
+        written = []
+        for update in updates:
+            missing = [key for key in ("agent", "version", "changes") if not update.get(key)]
+            if missing:
+                raise ValueError(f"Update {update!r} is missing {', '.join(missing)}")
+            structured = [key for key in ENTRY_FIELDS if isinstance(update.get(key), (dict, list))]
+            if structured:
+                raise ValueError(f"Update for '{update['agent']}': {', '.join(structured)} must be a single "
+                                 f"value, not a list or mapping (write multi-line changes as one string)")
+            agent_name = str(update["agent"])
+            entry = {
+                "version": str(update["version"]),
+                "date": str(update.get("date") or today),
+                "changes": str(update["changes"]),
+                "template_version": str(
+                    update.get("template_version") or template_version_for(agent_name, model, latest)
+                ),
+            }
+            by_agent.setdefault(agent_name, []).append(entry)
+            written.append((agent_name, entry))
+
+        if not is_sharded(data):
+            with profiling.span("render", file="versions.yaml"):
+                new_text = apply_edits(text, plan_edits(text, by_agent))
+            with profiling.span("validate", file="versions.yaml"):
+                parse_yaml(new_text)  # never write a file that no longer parses
+            with profiling.span("write", file="versions.yaml"):
+                atomic_write(VERSIONS_FILE, new_text)
+        else:
+            with profiling.span("render", file="versions.yaml"):
+                new_head = apply_edits(text, plan_head_edits(text, by_agent))
+            with profiling.span("validate", file="versions.yaml"):
+                parse_yaml(new_head)
+            shards = {}
+            for agent_name, entries in by_agent.items():
+                shard_path = VERSIONS_FILE.parent / shard_filename(agent_name)
+                with profiling.span("render", file=shard_filename(agent_name)):
+                    try:
+                        shard_text = shard_path.read_text()
+                    except FileNotFoundError:
+                        raise ValueError(f"History shard missing: data/{shard_filename(agent_name)}") from None
+                    shards[shard_path] = apply_edits(shard_text, plan_shard_edits(shard_text, agent_name, entries))
+                with profiling.span("validate", file=shard_filename(agent_name)):
+                    parse_yaml(shards[shard_path])
+            with profiling.span("write", files=len(shards) + 1):
+                for shard_path, shard_text in shards.items():
+                    atomic_write(shard_path, shard_text)
+                atomic_write(VERSIONS_FILE, new_head)
+            for agent_name in by_agent:
+                invalidate(shard_filename(agent_name))
+    invalidate("versions.yaml")
+    return written
 
 
 def update_version(agent_name, new_version, changes):
     """Add a new version entry for an agent."""
-    with open(VERSIONS_FILE) as f:
-        data = yaml.safe_load(f)
-    
-    if agent_name not in data["agents"]:
-        raise ValueError(f"Agent '{agent_name}' not found in versions.yaml")
-    
-    # Create new version entry
-    new_entry = {
-        "version": new_version,
-        "date": str(date.today()),
-        "changes": changes,
-        "template_version": "unknown"  # User should update this manually
-    }
-    
-    # Add to versions list
-    data["agents"][agent_name]["versions"].append(new_entry)
-    data["agents"][agent_name]["current_version"] = new_version
-    
-    # Write back
-    with open(VERSIONS_FILE, "w") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
-    
-    print(f"✅ Updated {agent_name} to version {new_version}")
-    print(f"📝 Don't forget to update 'template_version' in versions.yaml if applicable")
+    (_, entry), = update_versions([{"agent": agent_name, "version": new_version, "changes": changes}])
+    print(f"✅ Updated {agent_name} to version {new_version} ({entry['template_version']})")
+
+
+def load_batch(path):
+    """Read a list of updates from a YAML/JSON file, or stdin for "-"."""
+    text = sys.stdin.read() if path == "-" else Path(path).read_text()
+    updates = parse_yaml(text)
+    if not isinstance(updates, list) or not all(isinstance(u, dict) for u in updates):
+        raise ValueError("Batch file must be a list of mappings (agent, version, changes)")
+    return updates
 
 
 def main():
     parser = argparse.ArgumentParser(description="Update agent version history")
-    parser.add_argument("agent_name", help="Agent name (e.g., python-backend)")
-    parser.add_argument("new_version", help="New version (e.g., 1.2.0)")
-    parser.add_argument("changes", help="Description of changes")
-    
+    parser.add_argument("agent_name", nargs="?", help="Agent name (e.g., python-backend)")
+    parser.add_argument("new_version", nargs="?", help="New version (e.g., 1.2.0)")
+    parser.add_argument("changes", nargs="?", help="Description of changes")
+    parser.add_argument("--entry", nargs=3, action="append", default=[],
+                        metavar=("AGENT", "VERSION", "CHANGES"), help="Add one update (repeatable)")
+    parser.add_argument("--batch", help="YAML/JSON list of updates, or - for stdin")
+    profiling.add_arguments(parser)
+
     args = parser.parse_args()
-    update_version(args.agent_name, args.new_version, args.changes)
+    profiling.configure(args)
+    updates = [{"agent": a, "version": v, "changes": c} for a, v, c in args.entry]
+    if args.agent_name:
+        if not (args.new_version and args.changes):
+            parser.error("agent_name, new_version and changes go together")
+        updates.insert(0, {"agent": args.agent_name, "version": args.new_version, "changes": args.changes})
+    try:
+        if args.batch:
+            updates.extend(load_batch(args.batch))
+        if not updates:
+            parser.error("nothing to update")
+        written = update_versions(updates)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    for agent_name, entry in written:
+        print(f"✅ Updated {agent_name} to version {entry['version']} ({entry['template_version']})")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    exit(main())
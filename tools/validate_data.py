@@ -2,148 +2,889 @@
 """
 Validate all data YAML files for consistency and correctness.
 
+Each data file has a schema, compiled once into a tree of checker closures.
+Every file is walked a single time. The walk checks field types, required
+fields, enums and semver. It also records the ids each file defines and the
+ids it references, and those are resolved across files at the end. All errors
+are collected with their file, line and YAML path rather than stopping at the
+first failing category.
+
+When versions.yaml uses the sharded layout, its head index is checked and
+each in-scope agent's history shard (data/versions/<agent>.yaml) is walked
+in place of the inline history; shards without an agent are reported.
+
+With --changed (or --since REV) only the entities affected by files changed
+since HEAD (or REV) are checked; see changes.py for how the affected set is
+derived. If REV was valid, the result is the same as a full run.
+
+The markdown of every template and agent in lineage.yaml is checked too,
+from heading outlines cached by outline.py: one H1 title, no skipped heading
+levels, the H2 sections REQUIRED_SECTIONS lists for the template's category,
+and a Cognitive Architecture section (with its System of Thought and
+Artifact Protocol parts) exactly when metadata says cognitive_architecture.
+
+A full run keeps each data file's walk and the markdown results in
+.agents-md/cache/validation.pickle, keyed by the files they read (stat
+signature, then SHA-256). An unchanged registry is revalidated without
+parsing any YAML or markdown; only cross-file references are resolved
+again. AGENTS_MD_NO_CACHE=1 bypasses it.
+
 Usage:
-    python tools/validate_data.py
+    python tools/validate_data.py [--format text|json] [--changed | --since REV]
 """
 
-import yaml
+import argparse
+import json
+import os
+import pickle
+import re
+import sys
 from pathlib import Path
-from collections import defaultdict
 
-PROJECT_ROOT = Path(__file__).parent.parent
+import yaml
+
+import profiling
+from outline import OutlineCache, normalize_title
+from registry import (DATA_FILES, NO_CACHE_ENV, PROJECT_ROOT, VERSIONS_SHARD_DIR, SafeLoader, atomic_write,
+                      cache_dir, content_hash, is_sharded, load_shard, load_yaml, shard_filename)
+
 DATA_DIR = PROJECT_ROOT / "data"
 
+DERIVATION_TYPES = ("implementation", "specialization", "specialized_branch")
+SEMVER_RE = re.compile(r"^\d+\.\d+\.\d+(?:-[0-9A-Za-z.-]+)?(?:\+[0-9A-Za-z.-]+)?$")
+TEMPLATE_VERSION_RE = re.compile(r"^([A-Za-z0-9_.-]+)@(\d+(?:\.\d+)*)$")
+ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# H2 sections that templates of a category, and agents derived from them, must have.
+# Agents that are not plain implementations of their template only get warnings.
+REQUIRED_SECTIONS = {
+    "documentation": ("Core Principles",),
+    "management": ("Core Principles",),
+    "software-development": ("Core Principles",),
+}
+COGNITIVE_SECTION = "Cognitive Architecture"
+COGNITIVE_PARTS = ("System of Thought", "Artifact Protocol")
+
+# Bump whenever a check's result changes for the same input files.
+RESULTS_VERSION = 1
+RESULTS_NAME = "validation.pickle"
+
+# Human-readable names for cross-file reference kinds.
+KIND_LABELS = {
+    "template": "template",
+    "agent": "agent",
+    "capabilities": "capability definition",
+    "versions": "version history",
+    "swarm": "swarm",
+}
+# Which data file defines each reference kind.
+KIND_SOURCES = {
+    "template": "lineage.yaml",
+    "agent": "lineage.yaml",
+    "capabilities": "capabilities.yaml",
+    "versions": "versions.yaml",
+    "swarm": "swarms.yaml",
+}
+
+
+class Context:
+    """Mutable state for one validation run."""
+
+    __slots__ = ("root", "file", "errors", "defines", "refs", "paths", "failed", "scope", "reads", "sharded")
+
+    def __init__(self, root, scope=None):
+        self.root = root
+        self.file = None
+        self.errors = []
+        self.defines = {kind: {} for kind in KIND_SOURCES}
+        self.refs = []
+        self.paths = []
+        self.failed = set()
+        # None, or {"agent": ids, "template": ids, "swarm": names} to check
+        self.scope = scope
+        # data/-relative files read besides the one being walked (history shards)
+        self.reads = set()
+        self.sharded = False
+
+    def error(self, path, message, severity="error", line=None):
+        self.errors.append({
+            "file": self.file, "line": line, "path": path,
+            "message": message, "severity": severity,
+        })
+
+    def syntax_error(self, filename, e):
+        mark = getattr(e, "problem_mark", None)
+        problem = getattr(e, "problem", None) or str(e)
+        self.errors.append({
+            "file": filename, "line": mark.line + 1 if mark else None,
+            "path": "", "message": f"YAML syntax error: {problem}", "severity": "error",
+        })
+
+    def define(self, kind, value, path):
+        """Record an id definition, reporting duplicates."""
+        seen = self.defines[kind]
+        if value in seen:
+            self.error(path, f"duplicate {KIND_LABELS[kind]} id '{value}'")
+        else:
+            seen[value] = (self.file, path)
+
+
+class Entity:
+    """Marks a collection whose elements can be checked selectively.
+
+    When a scope is active, only elements whose key (kind) is in scope are
+    walked; the rest only have their id recorded (field `key` defines
+    `defines`) so cross-file references still resolve exactly as in a full run.
+    """
+
+    __slots__ = ("kind", "key", "defines")
+
+    def __init__(self, kind, key=None, defines=None):
+        self.kind = kind
+        self.key = key
+        self.defines = defines
+
+    def in_scope(self, element, scope):
+        wanted = scope.get(self.kind, ())
+        if self.key is None:
+            # A list of ids (e.g. a compatibility pair): in scope if any member is.
+            return isinstance(element, list) and any(
+                isinstance(v, str) and v in wanted for v in element
+            )
+        key = element.get(self.key) if isinstance(element, dict) else None
+        return isinstance(key, str) and key in wanted
+
+    def record(self, element, path, ctx):
+        if not self.defines or not isinstance(element, dict):
+            return
+        key = element.get(self.key)
+        if isinstance(key, str):
+            ctx.define(self.defines, key, path + (self.key,))
+
+
+# ---------------------------------------------------------------------------
+# Schema combinators. Each returns a checker: check(value, path, ctx).
+# ---------------------------------------------------------------------------
+
+_MISSING = object()
+
+
+def _type_name(value):
+    return "null" if value is None else type(value).__name__
+
+
+def string(enum=None, defines=None, ref=None, exists=False, check=None):
+    """A string, optionally an enum, an id definition, a reference or a file path."""
+    allowed = frozenset(enum) if enum else None
+
+    def checker(value, path, ctx):
+        if not isinstance(value, str):
+            ctx.error(path, f"expected string, got {_type_name(value)}")
+            return
+        if allowed is not None and value not in allowed:
+            ctx.error(path, f"'{value}' is not one of: {', '.join(enum)}")
+        if defines:
+            ctx.define(defines, value, path)
+        if ref:
+            ctx.refs.append((ref, value, ctx.file, path))
+        if exists:
+            ctx.paths.append((value, ctx.file, path))
+        if check:
+            check(value, path, ctx)
+
+    # Lists of unconstrained strings are checked inline by list_of().
+    checker.plain = not (enum or defines or ref or exists or check)
+    return checker
+
+
+def number():
+    def checker(value, path, ctx):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            ctx.error(path, f"expected number, got {_type_name(value)}")
+    return checker
+
+
+def boolean():
+    def checker(value, path, ctx):
+        if not isinstance(value, bool):
+            ctx.error(path, f"expected boolean, got {_type_name(value)}")
+    return checker
+
+
+def date_like():
+    """A YAML date or an ISO YYYY-MM-DD string."""
+    import datetime
+
+    def checker(value, path, ctx):
+        if isinstance(value, datetime.date):
+            return
+        if isinstance(value, str) and ISO_DATE_RE.match(value):
+            return
+        ctx.error(path, f"expected date (YYYY-MM-DD), got {value!r}")
+    return checker
+
+
+def semver():
+    def checker(value, path, ctx):
+        if not isinstance(value, str) or not SEMVER_RE.match(value):
+            ctx.error(path, f"expected semantic version (MAJOR.MINOR.PATCH), got {value!r}")
+    return checker
+
+
+def list_of(item, min_items=0, exact=None, entity=None):
+    plain = getattr(item, "plain", False)
+
+    def checker(value, path, ctx):
+        if not isinstance(value, list):
+            ctx.error(path, f"expected list, got {_type_name(value)}")
+            return
+        if exact is not None and len(value) != exact:
+            ctx.error(path, f"expected exactly {exact} items, got {len(value)}")
+        elif len(value) < min_items:
+            ctx.error(path, f"expected at least {min_items} item(s)")
+        if plain:
+            for i, element in enumerate(value):
+                if not isinstance(element, str):
+                    ctx.error(path + (i,), f"expected string, got {_type_name(element)}")
+            return
+        scope = ctx.scope if entity is not None else None
+        for i, element in enumerate(value):
+            if scope is not None and not entity.in_scope(element, scope):
+                entity.record(element, path + (i,), ctx)
+                continue
+            item(element, path + (i,), ctx)
+    return checker
+
+
+def mapping(fields, required=(), post=None):
+    """A mapping with known fields; unknown fields are allowed."""
+    items = tuple(fields.items())
+    required_keys = frozenset(required)
+
+    def checker(value, path, ctx):
+        if not isinstance(value, dict):
+            ctx.error(path, f"expected mapping, got {_type_name(value)}")
+            return
+        if not required_keys <= value.keys():
+            for name in required:
+                if name not in value:
+                    ctx.error(path, f"missing required field '{name}'")
+        for name, check in items:
+            field = value.get(name, _MISSING)
+            if field is not _MISSING:
+                check(field, path + (name,), ctx)
+        if post:
+            post(value, path, ctx)
+    return checker
+
+
+def dict_of(item, key_defines=None, key_ref=None, scope_kind=None):
+    """A mapping from ids to values of one schema."""
+    def checker(value, path, ctx):
+        if not isinstance(value, dict):
+            ctx.error(path, f"expected mapping, got {_type_name(value)}")
+            return
+        defined = ctx.defines[key_defines] if key_defines else None
+        wanted = ctx.scope.get(scope_kind, ()) if ctx.scope is not None and scope_kind else None
+        for key, element in value.items():
+            key_path = path + (key,)
+            if defined is not None:
+                defined[key] = (ctx.file, key_path)
+            if wanted is not None and key not in wanted:
+                continue
+            if key_ref:
+                ctx.refs.append((key_ref, key, ctx.file, key_path))
+            item(element, key_path, ctx)
+    return checker
+
+
+# ---------------------------------------------------------------------------
+# Per-file schemas
+# ---------------------------------------------------------------------------
+
+def _check_template_version(value, path, ctx):
+    if value == "unknown":
+        ctx.error(path, "template_version is 'unknown'", severity="warning")
+        return
+    match = TEMPLATE_VERSION_RE.match(value)
+    if not match:
+        ctx.error(path, f"expected '<template>@<version>', got {value!r}")
+        return
+    ctx.refs.append(("template", match.group(1), ctx.file, path))
+
+
+def _check_current_version(history, path, ctx):
+    current = history.get("current_version")
+    entries = history.get("versions")
+    if not isinstance(current, str) or not isinstance(entries, list):
+        return
+    listed = [e.get("version") for e in entries if isinstance(e, dict)]
+    if current not in listed:
+        ctx.error(path + ("current_version",), f"current_version {current} has no entry in versions")
+
+
+def _check_shard(shard_schema):
+    """Post-check for a head index entry: walk the agent's history shard."""
+    def post(head, path, ctx):
+        agent_id = path[-1]
+        filename = shard_filename(agent_id)
+        ctx.reads.add(filename)
+        try:
+            shard = load_shard(agent_id, ctx.root)
+        except OSError as e:
+            ctx.error(path, f"cannot read data/{filename}: {e.strerror or e}")
+            return
+        except yaml.YAMLError as e:
+            ctx.syntax_error(filename, e)
+            return
+        if shard is None:
+            ctx.error(path, f"history shard missing: data/{filename}")
+            return
+
+        head_file, ctx.file = ctx.file, filename
+        shard_schema(shard, (), ctx)
+        if isinstance(shard, dict) and shard.get("agent", agent_id) != agent_id:
+            ctx.error(("agent",), f"shard belongs to '{shard.get('agent')}', expected '{agent_id}'")
+        ctx.file = head_file
+
+        entries = shard.get("versions") if isinstance(shard, dict) else None
+        if not isinstance(entries, list) or not entries:
+            return
+        _check_current_version({"current_version": head.get("current_version"), "versions": entries},
+                               path, ctx)
+        latest = entries[-1].get("template_version") if isinstance(entries[-1], dict) else None
+        if head.get("template_version") != latest:
+            ctx.error(path + ("template_version",),
+                      f"template_version {head.get('template_version')!r} does not match "
+                      f"the latest entry in data/{filename} ({latest!r})")
+    return post
+
+
+def _by_layout(flat, sharded):
+    """Check versions.yaml with the schema of its layout."""
+    def checker(value, path, ctx):
+        (sharded if is_sharded(value) else flat)(value, path, ctx)
+    return checker
+
 
-def load_yaml(filename):
-    """Load a YAML file from data directory."""
-    with open(DATA_DIR / filename) as f:
-        return yaml.safe_load(f)
-
-
-def validate_lineage():
-    """Validate lineage.yaml."""
-    print("🔍 Validating lineage.yaml...")
-    lineage = load_yaml("lineage.yaml")
-    
-    errors = []
-    
-    # Check all templates exist
-    for template in lineage["templates"]:
-        path = PROJECT_ROOT / template["path"]
-        if not path.exists():
-            errors.append(f"Template file missing: {path}")
-    
-    # Check all agents exist
-    for agent in lineage["agents"]:
-        path = PROJECT_ROOT / agent["path"]
-        if not path.exists():
-            errors.append(f"Agent file missing: {path}")
-    
-    if errors:
-        for err in errors:
-            print(f"  ❌ {err}")
-        return False
-    
-    print(f"  ✅ {len(lineage['templates'])} templates, {len(lineage['agents'])} agents validated")
-    return True
-
-
-def validate_capabilities():
-    """Validate capabilities.yaml."""
-    print("🔍 Validating capabilities.yaml...")
-    capabilities = load_yaml("capabilities.yaml")
-    lineage = load_yaml("lineage.yaml")
-    
-    agent_ids = {agent["id"] for agent in lineage["agents"]}
-    capability_ids = set(capabilities["agents"].keys())
-    
-    missing = agent_ids - capability_ids
-    extra = capability_ids - agent_ids
-    
-    errors = []
-    if missing:
-        errors.append(f"Missing capability definitions: {missing}")
-    if extra:
-        errors.append(f"Extra capability definitions: {extra}")
-    
-    if errors:
-        for err in errors:
-            print(f"  ❌ {err}")
-        return False
-    
-    print(f"  ✅ All {len(agent_ids)} agents have capability definitions")
-    return True
-
-
-def validate_versions():
-    """Validate versions.yaml."""
-    print("🔍 Validating versions.yaml...")
-    versions = load_yaml("versions.yaml")
-    lineage = load_yaml("lineage.yaml")
-    
-    agent_ids = {agent["id"] for agent in lineage["agents"]}
-    version_ids = set(versions["agents"].keys())
-    
-    missing = agent_ids - version_ids
-    extra = version_ids - agent_ids
-    
-    errors = []
-    if missing:
-        errors.append(f"Missing version history: {missing}")
-    if extra:
-        errors.append(f"Extra version history: {extra}")
-    
-    if errors:
-        for err in errors:
-            print(f"  ❌ {err}")
-        return False
-    
-    print(f"  ✅ All {len(agent_ids)} agents have version history")
-    return True
-
-
-def validate_swarms():
-    """Validate swarms.yaml."""
-    print("🔍 Validating swarms.yaml...")
-    swarms = load_yaml("swarms.yaml")
-    lineage = load_yaml("lineage.yaml")
-    
-    agent_ids = {agent["id"] for agent in lineage["agents"]}
-    
-    errors = []
-    for swarm in swarms["swarms"]:
-        for agent_id in swarm["agents"]:
-            if agent_id not in agent_ids:
-                errors.append(f"Swarm '{swarm['name']}' references unknown agent: {agent_id}")
-    
-    if errors:
-        for err in errors:
-            print(f"  ❌ {err}")
-        return False
-    
-    print(f"  ✅ All {len(swarms['swarms'])} swarms are valid")
-    return True
-
-
-def main():
+def compile_schemas():
+    """Build the checker for every data file."""
+    string_list = list_of(string())
+    agent_pair = list_of(string(ref="agent"), exact=2)
+    agent_pairs = list_of(agent_pair, entity=Entity("agent"))
+
+    lineage = mapping({
+        "format_version": number(),
+        "last_updated": date_like(),
+        "templates": list_of(mapping({
+            "id": string(defines="template"),
+            "path": string(exists=True),
+            "description": string(),
+            "category": string(),
+        }, required=("id", "path")), entity=Entity("template", "id", "template")),
+        "agents": list_of(mapping({
+            "id": string(defines="agent"),
+            "path": string(exists=True),
+            "lineage": mapping({
+                "parent_template": string(ref="template"),
+                "derivation_type": string(enum=DERIVATION_TYPES),
+            }, required=("parent_template", "derivation_type")),
+            "metadata": mapping({
+                "cognitive_architecture": boolean(),
+                "domain": string(),
+            }),
+            "generation_parameters": mapping({"domain": string()}),
+        }, required=("id", "path", "lineage")), entity=Entity("agent", "id", "agent")),
+    }, required=("templates", "agents"))
+
+    capabilities = mapping({
+        "format_version": number(),
+        "agents": dict_of(mapping({
+            "can_do": string_list,
+            "cannot_do": string_list,
+            "tools_required": string_list,
+            "domain_expertise": string_list,
+        }, required=("can_do",)), key_defines="capabilities", key_ref="agent", scope_kind="agent"),
+    }, required=("agents",))
+
+    layout = string(enum=("flat", "sharded"))
+    version_entries = list_of(mapping({
+        "version": semver(),
+        "date": date_like(),
+        "changes": string(),
+        "template_version": string(check=_check_template_version),
+    }, required=("version", "date", "changes")), min_items=1)
+    flat_versions = mapping({
+        "format_version": number(),
+        "layout": layout,
+        "agents": dict_of(mapping({
+            "current_version": semver(),
+            "versions": version_entries,
+        }, required=("current_version", "versions"), post=_check_current_version),
+            key_defines="versions", key_ref="agent", scope_kind="agent"),
+    }, required=("agents",))
+    shard = mapping({
+        "agent": string(),
+        "versions": version_entries,
+    }, required=("versions",))
+    sharded_versions = mapping({
+        "format_version": number(),
+        "layout": layout,
+        "agents": dict_of(mapping({
+            "current_version": semver(),
+            "template_version": string(check=_check_template_version),
+        }, required=("current_version",), post=_check_shard(shard)),
+            key_defines="versions", key_ref="agent", scope_kind="agent"),
+    }, required=("agents",))
+    versions = _by_layout(flat_versions, sharded_versions)
+
+    swarms = mapping({
+        "format_version": number(),
+        "swarms": list_of(mapping({
+            "name": string(defines="swarm"),
+            "description": string(),
+            "agents": list_of(string(ref="agent"), min_items=1),
+            "orchestrator": string(ref="template"),
+            "use_cases": string_list,
+        }, required=("name", "agents")), entity=Entity("swarm", "name", "swarm")),
+        "compatibility_matrix": mapping({
+            "compatible": agent_pairs,
+            "conflicting": agent_pairs,
+        }),
+    }, required=("swarms",))
+
+    return {
+        "lineage.yaml": lineage,
+        "capabilities.yaml": capabilities,
+        "versions.yaml": versions,
+        "swarms.yaml": swarms,
+    }
+
+
+_schemas = None
+
+
+def schemas():
+    """Return the compiled schemas, compiling them on first use."""
+    global _schemas
+    if _schemas is None:
+        _schemas = compile_schemas()
+    return _schemas
+
+
+# ---------------------------------------------------------------------------
+# Running and reporting
+# ---------------------------------------------------------------------------
+
+def format_path(path):
+    """Render a path tuple as e.g. agents[3].lineage.parent_template."""
+    out = ""
+    for part in path:
+        if isinstance(part, int):
+            out += f"[{part}]"
+        else:
+            out += f".{part}" if out else str(part)
+    return out
+
+
+def _node_line(node, path):
+    """Return the 1-based line of the deepest node reachable along path."""
+    line = node.start_mark.line + 1
+    for part in path:
+        if isinstance(node, yaml.MappingNode):
+            for key_node, value_node in node.value:
+                if key_node.value == str(part):
+                    line = key_node.start_mark.line + 1
+                    node = value_node
+                    break
+            else:
+                return line
+        elif isinstance(node, yaml.SequenceNode) and isinstance(part, int) and part < len(node.value):
+            node = node.value[part]
+            line = node.start_mark.line + 1
+        else:
+            return line
+    return line
+
+
+def _attach_lines(errors, root):
+    """Fill in line numbers, composing each affected file's node tree once."""
+    pending = {}
+    for err in errors:
+        if err["line"] is None and err["file"]:
+            pending.setdefault(err["file"], []).append(err)
+    for filename, file_errors in pending.items():
+        try:
+            node = yaml.compose((root / "data" / filename).read_bytes(), Loader=SafeLoader)
+        except (OSError, yaml.YAMLError):
+            continue
+        if node is None:
+            continue
+        for err in file_errors:
+            err["line"] = _node_line(node, err.pop("_path", ()))
+
+
+def _check_outline(ctx, headings, required, strict, cognitive):
+    """Check one markdown file's flat headings; cognitive is None for templates."""
+    if not headings:
+        ctx.error("", "no headings")
+        return
+    titles = [line for level, _, _, line, _, _ in headings if level == 1]
+    if headings[0][0] != 1:
+        ctx.error("", "does not start with an H1 title", line=headings[0][3])
+    elif len(titles) > 1:
+        ctx.error("", f"{len(titles)} H1 headings, expected one title", severity="warning", line=titles[1])
+    for before, (level, title, _, line, _, _) in zip(headings, headings[1:]):
+        if level > before[0] + 1:
+            ctx.error("", f"heading level jumps from H{before[0]} to H{level} at '{title}'",
+                      severity="warning", line=line)
+
+    h2 = {}
+    for heading in headings:
+        if heading[0] == 2:
+            h2.setdefault(heading[2], heading)
+    for title in required:
+        if normalize_title(title) not in h2:
+            ctx.error("", f"missing required section '## {title}'", severity="error" if strict else "warning")
+
+    architecture = h2.get(normalize_title(COGNITIVE_SECTION))
+    if architecture is not None:
+        _, _, _, start, end, _ = architecture
+        parts = {key for level, _, key, line, _, _ in headings if level == 3 and start < line <= end}
+        for part in COGNITIVE_PARTS:
+            if normalize_title(part) not in parts:
+                ctx.error("", f"'## {COGNITIVE_SECTION}' has no '{part}' subsection", line=start)
+    if cognitive and architecture is None:
+        ctx.error("", f"lineage.yaml sets cognitive_architecture: true but there is no "
+                      f"'## {COGNITIVE_SECTION}' section")
+    elif cognitive is False and architecture is not None:
+        ctx.error("", f"has a '## {COGNITIVE_SECTION}' section but lineage.yaml does not set "
+                      f"cognitive_architecture: true", severity="warning", line=architecture[3])
+
+
+def _check_structure(ctx, root, scope):
+    """Check the heading structure of every template and agent in lineage.yaml.
+
+    Returns {root-relative path: (mtime_ns, size, sha256) or None if missing}
+    for the markdown files that were checked.
+    """
+    lineage = load_yaml("lineage.yaml", root)
+    checked = {}
+    if not isinstance(lineage, dict):
+        return checked
+    templates = {t["id"]: t for t in lineage.get("templates") or ()
+                 if isinstance(t, dict) and isinstance(t.get("id"), str)}
+    cache = OutlineCache(root)
+
+    def check(kind, entity_id, rel_path, category, strict, cognitive):
+        if not isinstance(rel_path, str) or (scope is not None and entity_id not in scope.get(kind, ())):
+            return
+        try:
+            headings = cache.headings(rel_path)
+        except OSError:
+            checked[rel_path] = None
+            return  # reported as a missing file
+        checked[rel_path] = cache.files[rel_path]
+        ctx.file = rel_path
+        required = REQUIRED_SECTIONS.get(category, ()) if isinstance(category, str) else ()
+        _check_outline(ctx, headings, required, strict, cognitive)
+
+    for template in templates.values():
+        check("template", template["id"], template.get("path"), template.get("category"), True, None)
+    for agent in lineage.get("agents") or ():
+        if not isinstance(agent, dict) or not isinstance(agent.get("id"), str):
+            continue
+        origin = agent.get("lineage") if isinstance(agent.get("lineage"), dict) else {}
+        parent = templates.get(origin.get("parent_template"), {})
+        metadata = agent.get("metadata") if isinstance(agent.get("metadata"), dict) else {}
+        check("agent", agent["id"], agent.get("path"), parent.get("category"),
+              origin.get("derivation_type") == "implementation", metadata.get("cognitive_architecture") is True)
+    cache.save()
+    return checked
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ResultCache:
+    """Results of a full run's steps, each reused while the files it read are unchanged.
+
+    An entry is stored with {root-relative path: (mtime_ns, size, sha256)} of
+    its inputs (None for a file that did not exist); a file whose stat
+    signature moved is hashed before the entry is given up.
+    """
+
+    __slots__ = ("root", "path", "entries", "dirty")
+
+    def __init__(self, root):
+        self.root = root
+        self.path = cache_dir(root) / RESULTS_NAME
+        self.entries = {}
+        self.dirty = False
+        if os.environ.get(NO_CACHE_ENV):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                stored = pickle.load(f)
+            if stored.get("version") == RESULTS_VERSION and isinstance(stored["entries"], dict):
+                self.entries = stored["entries"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError):
+            pass
+
+    def stamp(self, rel_path):
+        """Current (mtime_ns, size, sha256) of a file, or None if it does not exist."""
+        path = self.root / rel_path
+        sig = _signature(path)
+        if sig is None:
+            return None
+        try:
+            return (*sig, content_hash(path.read_bytes()))
+        except FileNotFoundError:
+            return None
+
+    def get(self, name):
+        """The stored result for name, or None if any of its inputs changed."""
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        inputs, result = entry
+        for rel_path, stamp in inputs.items():
+            sig = _signature(self.root / rel_path)
+            if stamp is None or sig is None:
+                if stamp != sig:
+                    return None
+            elif sig != stamp[:2]:
+                current = self.stamp(rel_path)
+                if current is None or current[2] != stamp[2]:
+                    return None
+                inputs[rel_path] = current
+                self.dirty = True
+        return result
+
+    def put(self, name, inputs, result):
+        """Store a result with the stamps of the files it read ({path: stamp})."""
+        self.entries[name] = (dict(inputs), result)
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty or os.environ.get(NO_CACHE_ENV):
+            return
+        payload = {"version": RESULTS_VERSION, "entries": self.entries}
+        try:
+            atomic_write(self.path, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            # Only an optimisation; a read-only checkout still works.
+            return
+        self.dirty = False
+
+
+def _check_references(ctx, walked, root, scope):
+    """Cross-file resolution: ids, agent coverage, orphan shards and paths."""
+    ok = set(walked)
+    for kind, value, filename, path in ctx.refs:
+        if KIND_SOURCES[kind] in ok and value not in ctx.defines[kind]:
+            ctx.file = filename
+            ctx.error(path, f"unknown {KIND_LABELS[kind]} '{value}'")
+
+    if "lineage.yaml" in ok:
+        for coverage in ("capabilities", "versions"):
+            if KIND_SOURCES[coverage] not in ok:
+                continue
+            defined = ctx.defines[coverage]
+            for agent_id, (filename, path) in ctx.defines["agent"].items():
+                if scope is not None and agent_id not in scope.get("agent", ()):
+                    continue
+                if agent_id not in defined:
+                    ctx.file = filename
+                    ctx.error(path, f"agent '{agent_id}' has no {KIND_LABELS[coverage]} "
+                                    f"in {KIND_SOURCES[coverage]}")
+
+    if scope is None and "versions.yaml" in ok and ctx.sharded:
+        shard_dir = root / "data" / VERSIONS_SHARD_DIR
+        for path in sorted(shard_dir.glob("*.yaml")) if shard_dir.is_dir() else ():
+            if path.stem not in ctx.defines["versions"]:
+                ctx.file = shard_filename(path.stem)
+                ctx.error((), f"history shard of unknown agent '{path.stem}'", severity="warning")
+
+    root_str = str(root)
+    for rel_path, filename, path in ctx.paths:
+        if not os.path.exists(os.path.join(root_str, rel_path)):
+            ctx.file = filename
+            ctx.error(path, f"file missing: {rel_path}")
+
+
+def _walk_result(ctx, filename, mark):
+    """What walking filename added to ctx, from mark = (errors, refs, paths) counts on."""
+    return {
+        "errors": [dict(e) for e in ctx.errors[mark[0]:]],
+        "refs": ctx.refs[mark[1]:],
+        "paths": ctx.paths[mark[2]:],
+        "defines": {kind: dict(ctx.defines[kind]) for kind, source in KIND_SOURCES.items() if source == filename},
+        "sharded": ctx.sharded if filename == "versions.yaml" else False,
+    }
+
+
+def _restore_walk(ctx, filename, stored):
+    ctx.errors.extend(dict(e) for e in stored["errors"])
+    ctx.refs.extend(stored["refs"])
+    ctx.paths.extend(stored["paths"])
+    for kind, defined in stored["defines"].items():
+        ctx.defines[kind].update(defined)
+    if filename == "versions.yaml":
+        ctx.sharded = stored["sharded"]
+
+
+def validate(root=None, files=None, scope=None):
+    """Validate the registry and return a list of error dicts.
+
+    Each error has file, line, path, message and severity ("error" or
+    "warning"). files limits which data files are walked; references into
+    files that were not walked are not checked. scope, if given, is a dict
+    of {"agent": ids, "template": ids, "swarm": names}; only those entities
+    (and compatibility pairs touching scoped agents) are checked, while ids
+    are still collected from every entry so references resolve as in a full run.
+    """
+    root = Path(root or PROJECT_ROOT)
+    ctx = Context(root, scope)
+    # Scoped runs are cheap already, and their results depend on the scope.
+    results = ResultCache(root) if scope is None else None
+    walked = []
+
+    for filename in files or DATA_FILES.values():
+        ctx.file = filename
+        stored = results.get(filename) if results else None
+        if stored is not None:
+            with profiling.span("validate", file=filename, cached=True):
+                _restore_walk(ctx, filename, stored)
+            walked.append(filename)
+            continue
+        try:
+            data = load_yaml(filename, root)
+        except OSError as e:
+            ctx.failed.add(filename)
+            ctx.error((), f"cannot read file: {e.strerror or e}")
+            continue
+        except yaml.YAMLError as e:
+            ctx.failed.add(filename)
+            ctx.syntax_error(filename, e)
+            continue
+        mark = (len(ctx.errors), len(ctx.refs), len(ctx.paths))
+        ctx.reads = set()
+        if filename == "versions.yaml":
+            ctx.sharded = is_sharded(data)
+        with profiling.span("validate", file=filename):
+            schemas()[filename](data, (), ctx)
+        walked.append(filename)
+        if results:
+            inputs = {f"data/{f}": results.stamp(f"data/{f}") for f in (filename, *ctx.reads)}
+            results.put(filename, inputs, _walk_result(ctx, filename, mark))
+
+    with profiling.span("validate", file="(references)"):
+        _check_references(ctx, walked, root, scope)
+    if "lineage.yaml" in walked:
+        stored = results.get("(markdown)") if results else None
+        with profiling.span("validate", file="(markdown)", cached=stored is not None):
+            if stored is not None:
+                ctx.errors.extend(dict(e) for e in stored)
+            else:
+                mark = len(ctx.errors)
+                checked = _check_structure(ctx, root, scope)
+                if results:
+                    checked["data/lineage.yaml"] = results.stamp("data/lineage.yaml")
+                    results.put("(markdown)", checked, [dict(e) for e in ctx.errors[mark:]])
+    if results:
+        results.save()
+
+    for err in ctx.errors:
+        if not isinstance(err["path"], str):
+            err["_path"] = err["path"]
+            err["path"] = format_path(err["path"])
+    with profiling.span("lookup", what="error lines"):
+        _attach_lines(ctx.errors, root)
+    for err in ctx.errors:
+        err.pop("_path", None)
+    ctx.errors.sort(key=lambda e: (e["file"] or "", e["line"] or 0, e["path"]))
+    return ctx.errors
+
+
+def print_report(errors, files):
+    """Print a human-readable report grouped by data file."""
     print("=" * 60)
     print("Agent Data Validation")
     print("=" * 60)
-    
-    results = [
-        validate_lineage(),
-        validate_capabilities(),
-        validate_versions(),
-        validate_swarms()
-    ]
-    
+
+    by_file = {}
+    for err in errors:
+        by_file.setdefault(err["file"], []).append(err)
+    # Errors can also come from files outside the list (history shards).
+    for filename in list(files) + sorted(set(by_file) - set(files), key=str):
+        print(f"🔍 Validating {filename}...")
+        file_errors = by_file.get(filename, [])
+        if not file_errors:
+            print("  ✅ OK")
+        for err in file_errors:
+            icon = "❌" if err["severity"] == "error" else "⚠️ "
+            where = f"{filename}:{err['line']}" if err["line"] else filename
+            path = f" {err['path']}:" if err["path"] else ""
+            print(f"  {icon} {where}{path} {err['message']}")
+
+    n_errors = sum(1 for e in errors if e["severity"] == "error")
+    n_warnings = len(errors) - n_errors
     print("\n" + "=" * 60)
-    if all(results):
-        print("✅ All validations passed!")
-        return 0
+    if n_errors:
+        print(f"❌ Validation failed: {n_errors} error(s), {n_warnings} warning(s). Please fix the errors above.")
+    else:
+        suffix = f" ({n_warnings} warning(s))" if n_warnings else ""
+        print(f"✅ All validations passed!{suffix}")
+
+
+def changed_scope(rev, root=None):
+    """Return the validation scope for files changed since rev."""
+    from changes import affected_scope, git_changed_paths, load_at_revision
+
+    paths = git_changed_paths(rev, root)
+    scope, _ = affected_scope(paths, old_data=lambda f: load_at_revision(f, rev, root), root=root)
+    return scope
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate data YAML files")
+    parser.add_argument("--format", choices=("text", "json"), default="text", help="Output format")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--changed", action="store_true", help="Only check what changed since HEAD")
+    group.add_argument("--since", metavar="REV", help="Only check what changed since REV")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.configure(args)
+
+    files = list(DATA_FILES.values())
+    scope = None
+    if args.changed or args.since:
+        try:
+            scope = changed_scope(args.since or "HEAD")
+        except (RuntimeError, OSError) as e:
+            print(f"❌ Error: {e}", file=sys.stderr)
+            return 2
+    errors = validate(scope=scope)
+    failed = any(e["severity"] == "error" for e in errors)
+
+    if args.format == "json":
+        report = {"ok": not failed, "errors": errors}
+        if scope is not None:
+            report["scope"] = {kind: sorted(ids) for kind, ids in scope.items()}
+        json.dump(report, sys.stdout, indent=2)
+        print()
     else:
-        print("❌ Validation failed. Please fix the errors above.")
-        return 1
+        if scope is not None:
+            counts = ", ".join(f"{len(ids)} {kind}(s)" for kind, ids in scope.items())
+            print(f"🔎 Changed-only validation: {counts}")
+        print_report(errors, files)
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Convert data/versions.yaml between the flat and the sharded layout.
+
+flat     versions.yaml holds every agent's current_version and full history.
+sharded  versions.yaml is a small head index (layout: sharded) with each
+         agent's current_version and latest template_version; the history
+         of each agent lives in data/versions/<agent>.yaml.
+
+Every reader (registry.load_history, models, the validator, update_version)
+handles both layouts, so tools that only need current versions stay as fast
+however long the history grows. Conversion runs under the versions.yaml lock;
+shard files are written before the head index is switched over. Comments in
+the file being converted are not carried over.
+
+Usage:
+    python tools/versions_layout.py shard
+    python tools/versions_layout.py unshard
+    python tools/versions_layout.py status
+"""
+
+import argparse
+
+from registry import VERSIONS_SHARD_DIR, atomic_write, invalidate, is_sharded, parse_yaml, shard_filename
+from update_version import VERSIONS_FILE, render_entry, versions_lock, yaml_scalar
+
+
+def _check_id(agent_id):
+    agent_id = str(agent_id)
+    if not agent_id or "/" in agent_id or "\\" in agent_id or agent_id.startswith("."):
+        raise ValueError(f"Agent id {agent_id!r} cannot be used as a shard file name")
+    return agent_id
+
+
+def _header(data):
+    return f"format_version: {data.get('format_version', 1.0)}\n"
+
+
+def shard_versions():
+    """Split a flat versions.yaml into a head index plus one history shard per agent."""
+    with versions_lock():
+        data = parse_yaml(VERSIONS_FILE.read_text()) or {}
+        if is_sharded(data):
+            raise ValueError("versions.yaml is already sharded")
+        agents = data.get("agents") or {}
+
+        shards = {}
+        head = [_header(data), "layout: sharded\n", "\n", "agents:\n"]
+        for agent_id, history in agents.items():
+            agent_id = _check_id(agent_id)
+            history = history or {}
+            entries = history.get("versions") or []
+            body = [f"agent: {yaml_scalar(agent_id)}\n", "versions:\n"]
+            for entry in entries:
+                body.extend(render_entry(entry, "  - ", "    "))
+            shards[agent_id] = "".join(body)
+
+            head.append(f"  {agent_id}:\n")
+            head.append(f"    current_version: {yaml_scalar(history.get('current_version', ''))}\n")
+            template_version = entries[-1].get("template_version") if entries else None
+            if template_version:
+                head.append(f"    template_version: {yaml_scalar(template_version)}\n")
+            head.append("\n")
+
+        for agent_id, text in shards.items():
+            atomic_write(VERSIONS_FILE.parent / shard_filename(agent_id), text)
+        atomic_write(VERSIONS_FILE, "".join(head).rstrip("\n") + "\n")
+    invalidate()
+    return len(shards)
+
+
+def unshard_versions():
+    """Merge the history shards back into a flat versions.yaml and remove them."""
+    with versions_lock():
+        data = parse_yaml(VERSIONS_FILE.read_text()) or {}
+        if not is_sharded(data):
+            raise ValueError("versions.yaml is not sharded")
+        agents = data.get("agents") or {}
+
+        out = [_header(data), "\n", "agents:\n"]
+        paths = []
+        for agent_id, head in agents.items():
+            agent_id = _check_id(agent_id)
+            path = VERSIONS_FILE.parent / shard_filename(agent_id)
+            try:
+                shard = parse_yaml(path.read_text()) or {}
+            except FileNotFoundError:
+                raise ValueError(f"History shard missing: data/{shard_filename(agent_id)}") from None
+            paths.append(path)
+            out.append(f"  {agent_id}:\n")
+            out.append(f"    current_version: {yaml_scalar((head or {}).get('current_version', ''))}\n")
+            out.append("    versions:\n")
+            for entry in shard.get("versions") or ():
+                out.extend(render_entry(entry, "      - ", "        "))
+            out.append("\n")
+
+        atomic_write(VERSIONS_FILE, "".join(out).rstrip("\n") + "\n")
+        for path in paths:
+            path.unlink()
+        shard_dir = VERSIONS_FILE.parent / VERSIONS_SHARD_DIR
+        if shard_dir.is_dir() and not any(shard_dir.iterdir()):
+            shard_dir.rmdir()
+    invalidate()
+    return len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Switch versions.yaml between flat and sharded layout")
+    parser.add_argument("command", choices=("shard", "unshard", "status"))
+    args = parser.parse_args()
+
+    try:
+        if args.command == "status":
+            data = parse_yaml(VERSIONS_FILE.read_text()) or {}
+            layout = "sharded" if is_sharded(data) else "flat"
+            print(f"📦 versions.yaml layout: {layout} ({len(data.get('agents') or {})} agents)")
+        elif args.command == "shard":
+            count = shard_versions()
+            print(f"✅ Split version history into {count} shards under data/{VERSIONS_SHARD_DIR}/")
+        else:
+            count = unshard_versions()
+            print(f"✅ Merged {count} history shards back into data/versions.yaml")
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
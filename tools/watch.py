@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Watch the registry and incrementally revalidate, regenerate and rebuild docs.
+
+A long-lived process that keeps the parsed registry in memory and watches
+data/, templates/, agents/ and knowledge/ via inotify (Linux, through ctypes)
+or, where inotify is unavailable, by polling file modification times. Bursts
+of changes are debounced into one batch. For each batch:
+
+1. validate  - only the entities affected by the changed files (see changes.py)
+2. regenerate - only agents whose template or lineage entry changed; editing an
+                agent file by hand never triggers a regeneration
+3. docs       - re-render the documentation pages whose inputs changed
+
+An agent is held back while validation reports an error in its own file, its
+template or its lineage.yaml entry; other agents still regenerate. Docs wait
+until the batch validates cleanly. Held-back work is carried into the next
+batch rather than dropped.
+
+Each batch reports per-step and total latency.
+
+Usage:
+    python tools/watch.py [--poll] [--debounce SECONDS] [--no-regenerate] [--no-docs]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import time
+from pathlib import Path
+
+import yaml
+
+from changes import affected_scope, diff_data_file
+from models import load_model
+from registry import DATA_FILES, PROJECT_ROOT, VERSIONS_SHARD_DIR, content_hash, invalidate, load_yaml
+
+WATCHED_DIRS = ("data", "templates", "agents", "knowledge")
+WATCHED_SUFFIXES = (".md", ".yaml")
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+# A validation error path inside one lineage.yaml entry, e.g. agents[3].path
+ENTRY_RE = re.compile(r"(agents|templates)\[(\d+)\]")
+
+
+def is_relevant(rel_path):
+    """Ignore temp files, editor swap files and anything that is not .md/.yaml."""
+    name = os.path.basename(rel_path)
+    return not name.startswith(".") and name.endswith(WATCHED_SUFFIXES)
+
+
+class InotifyWatcher:
+    """Recursive directory watcher on top of the inotify syscalls."""
+
+    def __init__(self, root, dirs):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.libc = libc
+        self.root = Path(root)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        for name in dirs:
+            if (self.root / name).is_dir():
+                self._add_tree(self.root / name)
+
+    def _add(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.dirs[wd] = Path(directory)
+
+    def _add_tree(self, top):
+        self._add(top)
+        for dirpath, dirnames, _ in os.walk(top):
+            for dirname in dirnames:
+                self._add(Path(dirpath) / dirname)
+
+    def read(self, timeout):
+        """Wait up to timeout seconds; return changed repo-relative paths (None on overflow)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path)
+                continue
+            changed.add(path.relative_to(self.root).as_posix())
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback watcher comparing (mtime, size) snapshots."""
+
+    def __init__(self, root, dirs, interval=0.5):
+        self.root = Path(root)
+        self.dirs = dirs
+        self.interval = interval
+        self.state = self._scan()
+
+    def _scan(self):
+        state = {}
+        for name in self.dirs:
+            for dirpath, _, filenames in os.walk(self.root / name):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+                    state[rel] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def read(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        new = self._scan()
+        old, self.state = self.state, new
+        return {p for p in old.keys() | new.keys() if old.get(p) != new.get(p)}
+
+    def close(self):
+        pass
+
+
+def make_watcher(root, force_poll=False, dirs=WATCHED_DIRS):
+    """Return an inotify watcher, or a polling one if inotify is unavailable."""
+    if not force_poll:
+        try:
+            return InotifyWatcher(root, dirs)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, dirs)
+
+
+def collect_batch(watcher, debounce):
+    """Block until something changes, then gather events until quiet for debounce seconds.
+
+    Returns (paths, time of the first event); paths is None after an inotify
+    queue overflow, meaning "assume everything changed".
+    """
+    paths = set()
+    first = None
+    while True:
+        got = watcher.read(debounce if first else 1.0)
+        if got is None:
+            return None, first or time.perf_counter()
+        got = {p for p in got if is_relevant(p)}
+        if got:
+            first = first or time.perf_counter()
+            paths |= got
+        elif first:
+            return paths, first
+
+
+class Session:
+    """In-memory registry state and the per-batch pipeline."""
+
+    def __init__(self, root, regenerate=True, docs=True, jobs=None):
+        self.root = Path(root)
+        self.regenerate = regenerate
+        self.docs = docs
+        self.jobs = jobs
+        self.previous = self._snapshot()
+        self.written = {}
+        # Work held back by validation errors, retried with the next batch.
+        self.pending_agents = set()
+        self.pending_paths = set()
+        self.pending_docs = False
+
+    def _snapshot(self):
+        """Parsed data files by filename; files that do not parse are left out."""
+        snapshot = {}
+        for filename in DATA_FILES.values():
+            try:
+                snapshot[filename] = load_yaml(filename, self.root)
+            except (OSError, yaml.YAMLError):
+                pass
+        return snapshot
+
+    def handle(self, paths, started):
+        """Run the pipeline for a batch of changed paths."""
+        import validate_data
+
+        timings = []
+        paths = self._drop_own_writes(paths)
+        if paths is not None and not paths:
+            return
+        if paths is None:
+            invalidate(root=self.root)
+            paths = {f"data/{f}" for f in DATA_FILES.values()}
+            old_data = None
+        else:
+            old_data = self.previous.get
+        print(f"\n🔔 {len(paths)} change(s): {', '.join(sorted(paths)[:5])}{' ...' if len(paths) > 5 else ''}")
+        # Paths whose regeneration targets could not be worked out last time.
+        paths |= self.pending_paths
+        self.pending_paths = set()
+
+        t0 = time.perf_counter()
+        scope, changed_data = affected_scope(paths, old_data=old_data, root=self.root)
+        model = self._lineage_model()
+        if model is not None:
+            # Held-back agents are rechecked until they validate.
+            held = {a for a in self.pending_agents if a in model.agents}
+            scope["agent"] |= held
+            scope["template"] |= {model.agents[a].parent_template for a in held} & set(model.templates)
+        errors = validate_data.validate(self.root, scope=scope)
+        failed = [e for e in errors if e["severity"] == "error"]
+        for err in errors:
+            icon = "❌" if err["severity"] == "error" else "⚠️ "
+            where = f"{err['file']}:{err['line']}" if err["line"] else err["file"]
+            print(f"  {icon} {where} {err['path']} {err['message']}")
+        n_checked = sum(len(ids) for ids in scope.values())
+        print(f"  🔍 validated {n_checked} entities: {len(failed)} error(s)")
+        timings.append(("validate", time.perf_counter() - t0))
+
+        # A data file that does not parse keeps its last good version, so the
+        # next batch is diffed against that rather than against nothing.
+        fresh = self._snapshot()
+        current = {**self.previous, **fresh}
+        regenerated = False
+        if self.regenerate:
+            t0 = time.perf_counter()
+            if model is None or "lineage.yaml" not in fresh:
+                # Without lineage there is no telling which agents to rebuild.
+                self.pending_paths = set(paths)
+                ready = set()
+            else:
+                targets = self.pending_agents | self._regeneration_targets(
+                    model, paths, changed_data, old_data, current)
+                self.pending_agents = self._held_back(failed, targets, model, fresh["lineage.yaml"])
+                ready = targets - self.pending_agents
+            if self.pending_agents or self.pending_paths:
+                print(f"  ⏸️  holding back {len(self.pending_agents)} agent(s) and {len(self.pending_paths)} "
+                      f"change(s) until their errors are fixed")
+            if ready:
+                import regenerate_agent
+                regenerate_agent.regenerate_all(jobs=self.jobs, agent_ids=ready)
+                self._remember_writes(ready)
+                regenerated = True
+            timings.append(("regenerate", time.perf_counter() - t0))
+
+        if self.docs:
+            self.pending_docs = self.pending_docs or regenerated or self._touches_docs(paths)
+            if self.pending_docs and not failed:
+                t0 = time.perf_counter()
+                import build_docs
+                build_docs.build_site()
+                self.pending_docs = False
+                timings.append(("docs", time.perf_counter() - t0))
+
+        self.previous = current
+        total = time.perf_counter() - started
+        steps = ", ".join(f"{name} {elapsed * 1000:.0f} ms" for name, elapsed in timings)
+        print(f"⏱️  {total * 1000:.0f} ms from first event ({steps})")
+
+    def _lineage_model(self):
+        """The model built from lineage.yaml alone, or None if it does not load."""
+        try:
+            return load_model(self.root, sections=("lineage",))
+        except (OSError, ValueError, yaml.YAMLError):
+            return None
+
+    def _remember_writes(self, agent_ids):
+        """Record what regeneration wrote so the echo events are not a new batch."""
+        model = load_model(self.root, sections=("lineage",))
+        for agent_id in agent_ids:
+            path = model.agent_path(agent_id)
+            try:
+                self.written[model.agents[agent_id].path] = content_hash(path.read_bytes())
+            except OSError:
+                pass
+
+    def _drop_own_writes(self, paths):
+        """Remove paths whose content is exactly what this process last wrote."""
+        if paths is None or not self.written:
+            return paths
+        kept = set()
+        for path in paths:
+            expected = self.written.pop(path, None)
+            try:
+                unchanged = expected and content_hash((self.root / path).read_bytes()) == expected
+            except OSError:
+                unchanged = False
+            if not unchanged:
+                kept.add(path)
+        return kept
+
+    def _touches_docs(self, paths):
+        """True if any path is read by build_docs: data, lineage markdown or knowledge docs."""
+        model = self._lineage_model()
+        if model is None:
+            return True
+        entity_paths = {t.path for t in model.templates.values()}
+        entity_paths.update(a.path for a in model.agents.values())
+        data_paths = {f"data/{f}" for f in DATA_FILES.values()}
+        for path in paths:
+            if path in data_paths or path in entity_paths:
+                return True
+            if path.startswith(f"data/{VERSIONS_SHARD_DIR}/") or (
+                    path.startswith("knowledge/") and path.endswith(".md")):
+                return True
+        return False
+
+    def _regeneration_targets(self, model, paths, changed_data, old_data, current):
+        """Agents whose generation inputs (template, lineage entry) changed."""
+        targets = set()
+        templates = {t.path: t.id for t in model.templates.values()}
+        for path in paths:
+            if path in templates:
+                targets.update(agent.id for agent in model.children_of(templates[path]))
+        if "lineage.yaml" in changed_data:
+            old = old_data("lineage.yaml") if old_data else None
+            diff = diff_data_file("lineage.yaml", old, current.get("lineage.yaml"))
+            targets |= diff["agent"]
+            for template_id in diff["template"]:
+                targets.update(agent.id for agent in model.children_of(template_id))
+        return {agent_id for agent_id in targets if agent_id in model.agents}
+
+    def _held_back(self, failed, targets, model, lineage):
+        """Targets with an error in their own file, their template or their lineage.yaml entry."""
+        if not failed or not targets:
+            return set()
+        entries = {}
+        for kind, section in (("agent", "agents"), ("template", "templates")):
+            items = lineage.get(section) if isinstance(lineage, dict) else None
+            for i, item in enumerate(items if isinstance(items, list) else ()):
+                if isinstance(item, dict) and isinstance(item.get("id"), str):
+                    entries[f"{section}[{i}]"] = (kind, item["id"])
+        bad = {"agent": set(), "template": set()}
+        by_path = {t.path: ("template", t.id) for t in model.templates.values()}
+        by_path.update({a.path: ("agent", a.id) for a in model.agents.values()})
+        for err in failed:
+            if err["file"] == "lineage.yaml":
+                match = ENTRY_RE.match(err["path"])
+                hit = entries.get(match.group(0)) if match else None
+                if hit is None:
+                    # Not tied to one entry (e.g. a syntax error): trust nothing.
+                    return set(targets)
+            else:
+                hit = by_path.get(err["file"])
+            if hit:
+                bad[hit[0]].add(hit[1])
+        return {agent_id for agent_id in targets
+                if agent_id in bad["agent"] or model.agents[agent_id].parent_template in bad["template"]}
+
+
+def watch(root=None, poll=False, debounce=0.2, regenerate=True, docs=True, jobs=None):
+    """Run the watch loop until interrupted."""
+    root = Path(root or PROJECT_ROOT)
+    watcher = make_watcher(root, poll)
+    session = Session(root, regenerate, docs, jobs)
+    backend = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"👀 Watching {', '.join(WATCHED_DIRS)} ({backend}, debounce {debounce * 1000:.0f} ms). Ctrl-C to stop.")
+    try:
+        while True:
+            paths, started = collect_batch(watcher, debounce)
+            session.handle(paths, started)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch and incrementally rebuild the registry")
+    parser.add_argument("--poll", action="store_true", help="Force the polling backend")
+    parser.add_argument("--debounce", type=float, default=0.2, help="Quiet period in seconds (default: 0.2)")
+    parser.add_argument("--no-regenerate", action="store_true", help="Do not regenerate agents")
+    parser.add_argument("--no-docs", action="store_true", help="Do not rebuild docs")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker threads for regeneration")
+    args = parser.parse_args()
+    watch(poll=args.poll, debounce=args.debounce, regenerate=not args.no_regenerate,
+          docs=not args.no_docs, jobs=args.jobs or None)
+
+
+if __name__ == "__main__":
+    main()